@@ -0,0 +1,274 @@
+"""
+Outbound frame writer for the chat WebSocket.
+
+Sending one ``{"type": "token"}`` frame per engine token makes JSON encoding
+and one socket write per token dominate at high token rates. `OutboundWriter`
+coalesces consecutive tokens into a single frame within a small window
+(``window_ms`` since the first pending token, or ``max_bytes`` of text), and
+flushes them before any structured message (status, error...) and at the end
+of each response, so ordering is preserved and nothing waits on the window.
+
+Pending tokens are kept JSON-escaped, so a batch becomes a frame by plain
+string concatenation. `token_json` accepts bodies that are already escaped
+(the raw pass-through path reuses the engine's own encoding).
+
+Frames are written by a per-connection sender task from a bounded buffer, so
+the producer (the loop draining the engine session) never waits on a slow
+client. While the client lags, new tokens are merged into the token frame
+still waiting at the tail of the buffer instead of adding frames. If the
+buffer goes over ``buffer_bytes`` or one write stays blocked longer than
+``stall_timeout``, the client is a slow consumer: the socket is closed and
+the producer gets `SlowConsumerError` so it can abort the engine session.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_FRAME = '{"type": "token", "content": "%s"}'
+
+SLOW_CONSUMER_CLOSE_CODE = 1013   # "Try Again Later"
+_CLOSE_TIMEOUT = 5.0              # seconds to wait for a slow consumer's socket to close
+
+# Aggregated over every connection since startup (GET /api/ws/stats)
+_totals: Dict[str, float] = {
+    "connections": 0,
+    "active": 0,
+    "slow_consumer_disconnects": 0,
+    "merged_tokens": 0,
+    "buffer_high_water_bytes": 0,
+    "buffer_high_water_frames": 0,
+}
+
+
+class SlowConsumerError(Exception):
+    """Raised to the producer once the client was disconnected for not reading fast enough."""
+    pass
+
+
+class OutboundWriter:
+    """Per-connection writer that batches token frames and buffers them for a sender task.
+
+    Args:
+        send_text:     Coroutine that writes one text frame (``websocket.send_text``).
+        window_ms:     Longest a token may wait for others to join its frame (0 = no coalescing).
+        max_bytes:     Pending escaped text size that triggers an immediate flush.
+        buffer_bytes:  Unsent bytes that mark the client as a slow consumer (0 = unbounded).
+        stall_timeout: Seconds one write may block before the client is a slow consumer (0 = never).
+        close:         Coroutine ``close(code, reason)`` used to drop a slow consumer.
+    """
+
+    def __init__(
+        self,
+        send_text: Callable[[str], Awaitable[None]],
+        window_ms: float = 10.0,
+        max_bytes: int = 256,
+        buffer_bytes: int = 0,
+        stall_timeout: float = 0.0,
+        close: Optional[Callable[..., Awaitable[None]]] = None,
+    ):
+        self._send_text = send_text
+        self._close = close
+        self.window = max(0.0, window_ms) / 1000
+        self.max_bytes = max(1, max_bytes)
+        self.buffer_bytes = buffer_bytes
+        self.stall_timeout = stall_timeout
+        self._pending: List[str] = []
+        self._pending_bytes = 0
+        self._timer: Optional[asyncio.Task] = None
+        # Unsent frames: ["tokens", [bodies]] (still mergeable) or ["frame", text]
+        self._buffer: Deque[list] = deque()
+        self._buffered_bytes = 0
+        self._ready = asyncio.Event()
+        self._idle = asyncio.Event()      # set while nothing is buffered or being written
+        self._idle.set()
+        self._sender: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Task] = None   # closes the socket of a dropped slow consumer
+        self._sending_since: Optional[float] = None
+        self._failed: Optional[SlowConsumerError] = None
+        self._stats = {
+            "tokens": 0, "frames": 0, "token_frames": 0, "merged_tokens": 0,
+            "buffer_high_water_bytes": 0, "buffer_high_water_frames": 0,
+        }
+        _totals["connections"] += 1
+        _totals["active"] += 1
+
+    @property
+    def slow_consumer(self) -> bool:
+        return self._failed is not None
+
+    async def token(self, text: str) -> None:
+        """Queues a text token; it is sent once the window elapses or the batch is full."""
+        if text:
+            await self.token_json(json.dumps(text)[1:-1])
+
+    async def token_json(self, body: str) -> None:
+        """Like `token`, for content that is already a JSON-escaped string body (no quotes)."""
+        self._check()
+        if not body:
+            return
+        self._stats["tokens"] += 1
+        self._pending.append(body)
+        self._pending_bytes += len(body)
+        if self.window == 0 or self._pending_bytes >= self.max_bytes:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_window())
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        """Sends a structured message right away, after any pending tokens."""
+        await self.flush()
+        frame = json.dumps(message)
+        self._enqueue(["frame", frame], len(frame))
+
+    async def flush(self) -> None:
+        """Hands the pending tokens to the sender as one frame (end of response, before control frames)."""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        self._check()
+        if not self._pending:
+            return
+        bodies, size = self._pending, self._pending_bytes
+        self._pending = []
+        self._pending_bytes = 0
+        tail = self._buffer[-1] if self._buffer else None
+        if tail is not None and tail[0] == "tokens":
+            # The client is behind: grow the waiting frame instead of adding one
+            tail[1].extend(bodies)
+            self._stats["merged_tokens"] += len(bodies)
+            _totals["merged_tokens"] += len(bodies)
+            self._buffered_bytes += size
+            self._check_limits()
+            return
+        self._enqueue(["tokens", bodies], size)
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Flushes what is left and waits (bounded) for the sender; call once the connection is done."""
+        try:
+            if not self.slow_consumer:
+                await self.flush()
+                if self._sender is not None:
+                    await asyncio.wait_for(self._idle.wait(), timeout)
+        except Exception as e:
+            logger.debug(f"Final flush failed (connection closed?): {e}")
+        finally:
+            await self._stop_sender()
+            _totals["active"] -= 1
+
+    # ------------------------------------------------------------------
+    # Buffer and sender
+    # ------------------------------------------------------------------
+    def _enqueue(self, item: list, size: int) -> None:
+        self._buffer.append(item)
+        self._buffered_bytes += size
+        self._idle.clear()
+        self._check_limits()
+        if self._sender is None:
+            self._sender = asyncio.create_task(self._send_loop())
+        self._ready.set()
+
+    def _check_limits(self) -> None:
+        frames = len(self._buffer)
+        stats = self._stats
+        stats["buffer_high_water_bytes"] = max(stats["buffer_high_water_bytes"], self._buffered_bytes)
+        stats["buffer_high_water_frames"] = max(stats["buffer_high_water_frames"], frames)
+        _totals["buffer_high_water_bytes"] = max(_totals["buffer_high_water_bytes"], self._buffered_bytes)
+        _totals["buffer_high_water_frames"] = max(_totals["buffer_high_water_frames"], frames)
+
+        if self.buffer_bytes and self._buffered_bytes > self.buffer_bytes:
+            self._drop_slow_consumer(f"{self._buffered_bytes} bytes unsent")
+        elif (self.stall_timeout and self._sending_since is not None
+              and time.monotonic() - self._sending_since > self.stall_timeout):
+            self._drop_slow_consumer(f"write blocked for over {self.stall_timeout}s")
+
+    def _drop_slow_consumer(self, reason: str) -> None:
+        logger.warning(f"Slow WebSocket consumer ({reason}); disconnecting")
+        self._failed = SlowConsumerError(f"Slow consumer: {reason}")
+        _totals["slow_consumer_disconnects"] += 1
+        self._buffer.clear()
+        self._buffered_bytes = 0
+        if self._sender is not None:
+            self._sender.cancel()
+        if self._close is not None and self._closing is None:
+            self._closing = asyncio.create_task(self._close_quietly())
+        raise self._failed
+
+    async def _close_quietly(self) -> None:
+        try:
+            await self._close(code=SLOW_CONSUMER_CLOSE_CODE, reason="Slow consumer")
+        except Exception as e:
+            logger.debug(f"Closing slow consumer failed: {e}")
+
+    def _check(self) -> None:
+        if self._failed is not None:
+            raise self._failed
+
+    async def _send_loop(self) -> None:
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self._buffer:
+                kind, content = self._buffer.popleft()
+                if kind == "tokens":
+                    body = "".join(content)
+                    self._buffered_bytes -= len(body)
+                    frame = _TOKEN_FRAME % body
+                else:
+                    frame = content
+                    self._buffered_bytes -= len(frame)
+                self._sending_since = time.monotonic()
+                try:
+                    await self._send_text(frame)
+                except Exception as e:
+                    logger.debug(f"WebSocket send failed (connection closed?): {e}")
+                    self._buffer.clear()
+                    self._buffered_bytes = 0
+                    self._idle.set()
+                    return
+                finally:
+                    self._sending_since = None
+                self._stats["frames"] += 1
+                if kind == "tokens":
+                    self._stats["token_frames"] += 1
+            self._idle.set()
+
+    async def _stop_sender(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._sender is not None:
+            self._sender.cancel()
+            await asyncio.gather(self._sender, return_exceptions=True)
+            self._sender = None
+        if self._closing is not None:
+            # The socket of a slow consumer may not close cleanly: don't wait on it forever
+            done, _ = await asyncio.wait({self._closing}, timeout=_CLOSE_TIMEOUT)
+            if not done:
+                self._closing.cancel()
+                await asyncio.gather(self._closing, return_exceptions=True)
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.window)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.debug(f"Timed flush failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tokens written, frames sent, tokens per token frame and buffer high-water marks."""
+        token_frames = self._stats["token_frames"]
+        return {
+            **self._stats,
+            "tokens_per_frame": self._stats["tokens"] / token_frames if token_frames else 0.0,
+            "buffered_bytes": self._buffered_bytes,
+            "slow_consumer": self.slow_consumer,
+        }
+
+
+def get_outbound_stats() -> Dict[str, Any]:
+    """Connection counts, slow-consumer disconnects and buffer high-water marks since startup."""
+    return dict(_totals)
@@ -5,8 +5,12 @@ This module handles persistent bi-directional communication with client
 applications, allowing real-time token streaming, mid-session control 
 messages (e.g., model switching), and context management over a single connection.
 """
+import asyncio
+from typing import Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from src.core.config import settings
 from src.core.services import jota_controller, memory_manager, inference_client
+from src.api.chat.outbound import OutboundWriter, SlowConsumerError
 import json as _json
 import logging
 
@@ -25,6 +29,17 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
     4. Recover database context and inject it.
     5. Listen to text inputs and control streams via JSON envelopes.
 
+    Token frames are coalesced per connection (see OutboundWriter). Clients may
+    tune the window with the ``coalesce_ms`` / ``coalesce_bytes`` query params
+    (``coalesce_ms=0`` sends one frame per token). Frames go through a bounded
+    send buffer: a client that falls too far behind is disconnected and its
+    engine session aborted instead of stalling the engine stream.
+
+    Answers stream in a background task while the socket keeps being read, so
+    a ``{"type": "cancel"}`` envelope (or a new prompt) interrupts the answer
+    in flight: the engine session is aborted, the partial is saved with
+    INTERRUPTED_MARKER and ``{"type": "cancelled"}`` is sent back.
+
     Args:
         websocket: The active WebSocket connection.
         user_id: The ID of the connecting user.
@@ -65,6 +80,23 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
         await websocket.close(code=1011, reason="Inference Engine not connected")
         return
     
+    try:
+        window_ms = float(websocket.query_params.get("coalesce_ms", settings.WS_COALESCE_MS))
+        max_bytes = int(websocket.query_params.get("coalesce_bytes", settings.WS_COALESCE_BYTES))
+    except ValueError:
+        window_ms, max_bytes = settings.WS_COALESCE_MS, settings.WS_COALESCE_BYTES
+    writer = OutboundWriter(
+        websocket.send_text,
+        window_ms=window_ms,
+        max_bytes=max_bytes,
+        buffer_bytes=settings.WS_SEND_BUFFER_BYTES,
+        stall_timeout=settings.WS_SEND_STALL_TIMEOUT,
+        close=websocket.close,
+    )
+    session_id = None
+    responding: Optional[asyncio.Task] = None    # answer being streamed
+    receiving: Optional[asyncio.Task] = None     # pending websocket.receive_text()
+
     try:
         # 2. Conversation Management
         conversation_id = websocket.query_params.get("conversation_id")
@@ -103,8 +135,58 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
         log_prefix = f"[Conv: {conversation_id}][Sess: {session_id}]"
         logger.info(f"{log_prefix} Session ready. Waiting for messages...")
 
+        async def stream_response(payload: dict) -> None:
+            # 6. Stream tokens back (coalesced; flushed before status frames and at the end)
+            if settings.WS_RAW_PASSTHROUGH and jota_controller.is_tool_free(client_id):
+                # No tools for this client: engine token payloads go out as they came
+                async for body in jota_controller.handle_input_raw(payload):
+                    await writer.token_json(body)
+                await writer.flush()
+                return
+
+            async for token in jota_controller.handle_input(payload):
+                if isinstance(token, dict):
+                    # Structured control message (e.g. status indicator)
+                    await writer.send(token)
+                else:
+                    # Plain text content token
+                    await writer.token(token)
+            await writer.flush()
+
+        async def cancel_response() -> bool:
+            """Stops the answer in flight (if any); its partial is saved with INTERRUPTED_MARKER."""
+            nonlocal responding
+            task, responding = responding, None
+            if task is None:
+                return False
+            if task.done():
+                task.result()   # already finished: just surface its failure, if any
+                return False
+            logger.info(f"{log_prefix} Cancelling response in flight")
+            if not await inference_client.interrupt_session(session_id):
+                task.cancel()   # not streaming (model load, tool call...): nothing to save yet
+            done, _ = await asyncio.wait({task}, timeout=settings.WS_CANCEL_GRACE)
+            if not done:
+                logger.warning(f"{log_prefix} Cancelled response did not stop in time; cutting it")
+                task.cancel()
+                await inference_client.abort_session(session_id)
+            await asyncio.gather(task, return_exceptions=True)
+            return True
+
+        # The answer streams in its own task so the client can keep talking:
+        # a {"type": "cancel"} envelope or a new prompt stops it right away.
         while True:
-            data = await websocket.receive_text()
+            if receiving is None:
+                receiving = asyncio.create_task(websocket.receive_text())
+            waiting = {receiving, responding} if responding else {receiving}
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            if responding in done:
+                task, responding = responding, None
+                task.result()   # surfaces SlowConsumerError and unexpected failures
+                continue
+
+            data = receiving.result()
+            receiving = None
             logger.info(f"{log_prefix} Received via WS: {data}")
 
             # -- Control message: JSON envelope with "type" field --
@@ -114,47 +196,59 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
                 if isinstance(ctrl, dict) and "type" in ctrl:
                     msg_type = ctrl["type"]
 
+                    if msg_type == "cancel":
+                        cancelled = await cancel_response()
+                        await writer.send({"type": "cancelled", "interrupted": cancelled})
+                        continue
+
                     if msg_type == "switch_model":
                         new_model = ctrl.get("model_id", "").strip()
                         if not new_model:
-                            await websocket.send_text(_json.dumps({
+                            await writer.send({
                                 "type": "error",
                                 "message": "switch_model requires a non-empty model_id"
-                            }))
+                            })
                             continue
                         logger.info(
                             f"{log_prefix} [TRACE] Mid-session switch_model requested: "
                             f"{model_id!r} → {new_model!r}"
                         )
+                        # Never swap the model under an answer still being generated
+                        if await cancel_response():
+                            await writer.send({"type": "cancelled", "interrupted": True})
                         try:
                             await jota_controller.switch_model(conversation_id, client_id, new_model)
                             model_id = new_model  # update local var for next infer
-                            await websocket.send_text(_json.dumps({
+                            await writer.send({
                                 "type": "model_switched",
                                 "model_id": new_model
-                            }))
+                            })
                             logger.info(
                                 f"{log_prefix} [TRACE] switch_model OK mid-session — "
                                 f"new engine_current={inference_client.current_engine_model!r}"
                             )
                         except Exception as sw_err:
                             logger.error(f"{log_prefix} switch_model failed: {sw_err}")
-                            await websocket.send_text(_json.dumps({
+                            await writer.send({
                                 "type": "error",
                                 "message": str(sw_err)
-                            }))
+                            })
                         continue  # don't treat this as a prompt
 
                     # Unknown control type — log and ignore
                     logger.warning(f"{log_prefix} Unknown control message type: {msg_type!r}")
-                    await websocket.send_text(_json.dumps({
+                    await writer.send({
                         "type": "error",
                         "message": f"Unknown control type: {msg_type!r}"
-                    }))
+                    })
                     continue
             except _json.JSONDecodeError:
                 pass  # plain text prompt — fall through
 
+            # A new prompt while answering: the user talked over the answer (barge-in)
+            if await cancel_response():
+                await writer.send({"type": "cancelled", "interrupted": True})
+
             # 5. Save User Message (text prompt)
             await memory_manager.save_message(
                 conversation_id=conversation_id,
@@ -178,23 +272,30 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
                 f"{log_prefix} [TRACE] Dispatching to controller — "
                 f"db_model={model_id!r} engine_model={inference_client.current_engine_model!r}"
             )
+            responding = asyncio.create_task(stream_response(payload))
 
-            # 6. Stream tokens back
-            async for token in jota_controller.handle_input(payload):
-                if isinstance(token, dict):
-                    # Structured control message (e.g. status indicator)
-                    await websocket.send_text(_json.dumps(token))
-                else:
-                    # Plain text content token
-                    await websocket.send_text(_json.dumps({"type": "token", "content": token}))
-            
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for user {user_id}")
 
+    except SlowConsumerError as e:
+        # The writer already closed the socket; stop the engine from generating for nobody
+        logger.warning(f"WebSocket for user {user_id} dropped: {e}")
+        if session_id:
+            await inference_client.abort_session(session_id)
+
     except Exception as e:
         logger.error(f"WebSocket error for user {user_id}: {e}")
         await websocket.close(code=1011)
 
     finally:
+        if receiving is not None:
+            receiving.cancel()
+        if responding is not None:
+            # Client gone mid-answer: stop the engine and keep the partial
+            try:
+                await cancel_response()
+            except Exception as e:
+                logger.debug(f"Cancelling response on close failed: {e}")
+        await writer.close()
         # Always release session on any exit path
         await inference_client.release_session(user_id)
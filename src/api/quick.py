@@ -6,15 +6,18 @@ Endpoint REST para clientes QUICK: comandos rápidos, stateless, sin streaming.
 from fastapi import APIRouter, Header, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, AsyncGenerator
+from typing import Literal, Optional, AsyncGenerator
 import logging
 import json
 import time
 
 from src.core.services import inference_client, memory_manager
 from src.core.tool_manager import tool_manager
+from src.core.intents import intent_matcher
 from src.core.config import settings
+from src.core.constants import TOOL_CALL_OPEN
 from src.utils.tool_parser import remove_tool_calls_from_text
+from src.utils.sentence_chunker import SentenceChunker
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -41,10 +44,47 @@ Ejemplos de respuesta correcta:
 
 
 class QuickRequest(BaseModel):
-    """Petición para el endpoint QUICK."""
+    """Petición para el endpoint QUICK.
+
+    chunking="sentence" agrupa la salida en frases pronunciables, sin markdown
+    (líneas {"type": "sentence", "content": ..., "seq": n}) en vez de un token por línea.
+    """
     text: str
     user_id: str = "quick_user"
     model_id: Optional[str] = None
+    chunking: Literal["token", "sentence"] = "token"
+
+
+def _clean_token(token):
+    """Quita bloques <tool_call> completos de un token sin tocar sus espacios (son parte del texto)."""
+    if isinstance(token, str) and TOOL_CALL_OPEN in token:
+        return remove_tool_calls_from_text(token)
+    return token
+
+
+class _TextLines:
+    """Convierte el texto de la respuesta en líneas NDJSON: una por token o una por frase."""
+
+    def __init__(self, sentences: bool):
+        self._chunker = (
+            SentenceChunker(settings.TTS_CHUNK_MIN_CHARS, settings.TTS_CHUNK_MAX_CHARS, strip_markdown=True)
+            if sentences else None
+        )
+        self._seq = 0
+
+    def _sentence(self, sentence: str) -> str:
+        line = json.dumps({"type": "sentence", "content": sentence, "seq": self._seq}) + "\n"
+        self._seq += 1
+        return line
+
+    def feed(self, text: str) -> str:
+        if self._chunker is None:
+            return json.dumps({"type": "token", "content": text}) + "\n"
+        return "".join(self._sentence(sentence) for sentence in self._chunker.feed(text))
+
+    def flush(self) -> str:
+        rest = self._chunker.flush() if self._chunker is not None else None
+        return self._sentence(rest) if rest else ""
 
 
 async def _quick_stream_generator(
@@ -52,11 +92,13 @@ async def _quick_stream_generator(
     user_id: str, 
     session_id: str, 
     text: str, 
-    model_id: Optional[str]
+    model_id: Optional[str],
+    sentences: bool = False,
 ) -> AsyncGenerator[str, None]:
-    """Generador que emite líneas JSON (NDJSON) con tokens de texto y metadatos."""
+    """Generador que emite líneas JSON (NDJSON) con tokens (o frases) de texto y metadatos."""
     
     log_prefix = f"[QUICK][Sess: {session_id}]"
+    text_lines = _TextLines(sentences)
     
     # Preparamos el system prompt incluyendo instrucciones de tools si aplica
     tool_instructions = tool_manager.get_system_prompt_addition(client_id=client_id)
@@ -78,6 +120,7 @@ async def _quick_stream_generator(
     }
     
     tool_executed = False
+    direct_answer = None  # Respuesta final de una tool direct-answer (evita la segunda pasada)
     
     try:
         # 1. Primera pasada de inferencia
@@ -95,6 +138,11 @@ async def _quick_stream_generator(
                 tc_payload = token.get("payload", {})
                 tool_name = tc_payload.get("name")
                 tool_args = tc_payload.get("arguments", {})
+
+                if tool_executed:
+                    # Una tool por pasada: la primera decide (respuesta directa o contexto de la segunda pasada)
+                    logger.warning(f"{log_prefix} Tool call {tool_name!r} ignored: one tool per pass")
+                    continue
                 
                 logger.info(f"{log_prefix} Tool call detected: {tool_name}")
                 yield json.dumps({"type": "status", "content": f"Buscando información usando {tool_name}..."}) + "\n"
@@ -104,6 +152,12 @@ async def _quick_stream_generator(
                     result = await tool_manager.execute_tool(tool_name, client_id=client_id, **tool_args)
                     duration = f"{time.time() - start_t:.2f}s"
                     result_str = result if isinstance(result, str) else json.dumps(result)
+
+                    direct_answer = tool_manager.render_direct_answer(tool_name, result, tool_args)
+                    if direct_answer is not None:
+                        logger.info(f"{log_prefix} Direct-answer tool {tool_name} ({duration}), skipping second pass")
+                        tool_executed = True
+                        continue
                     
                     yield json.dumps({"type": "status", "content": f"Búsqueda completada en {duration}. Generando respuesta..."}) + "\n"
                     
@@ -119,17 +173,31 @@ async def _quick_stream_generator(
                 except Exception as e:
                     logger.error(f"{log_prefix} Tool {tool_name} failed: {e}")
                     yield json.dumps({"type": "status", "content": f"Error al usar {tool_name}: {e}"}) + "\n"
+                    # El modelo recibe el fallo como resultado para que responda sin la tool
+                    await inference_client.set_context(session_id, [
+                        {"role": "user", "content": text},
+                        {"role": "assistant", "content": f"<tool_call>{json.dumps(tc_payload)}</tool_call>"},
+                        {"role": "tool", "content": f"Error executing tool {tool_name}: {e}"},
+                    ])
                     tool_executed = True
                     
             else:
                 # Token de texto regular — limpiar residuos XML antes de enviar
                 if not tool_executed:
-                    clean_token = remove_tool_calls_from_text(token) if isinstance(token, str) else token
+                    clean_token = _clean_token(token)
                     if clean_token:
-                        yield json.dumps({"type": "token", "content": clean_token}) + "\n"
+                        lines = text_lines.feed(clean_token)
+                        if lines:
+                            yield lines
                     
-        # 2. Segunda pasada si se ejecutó una tool (max_tokens más estricto para brevedad TTS)
-        if tool_executed:
+        # 2a. Tool direct-answer: su salida ya es la respuesta final
+        if direct_answer is not None:
+            lines = text_lines.feed(direct_answer)
+            if lines:
+                yield lines
+
+        # 2b. Segunda pasada si se ejecutó una tool (max_tokens más estricto para brevedad TTS)
+        elif tool_executed:
             yield json.dumps({"type": "status", "content": "Analizando resultados..."}) + "\n"
             async for token in inference_client.infer(
                 session_id=session_id,
@@ -145,9 +213,15 @@ async def _quick_stream_generator(
                     continue  # Ignorar tool calls anidados
 
                 # Limpiar cualquier residuo XML antes de enviar al cliente
-                clean_token = remove_tool_calls_from_text(token) if isinstance(token, str) else token
+                clean_token = _clean_token(token)
                 if clean_token:
-                    yield json.dumps({"type": "token", "content": clean_token}) + "\n"
+                    lines = text_lines.feed(clean_token)
+                    if lines:
+                        yield lines
+
+        rest = text_lines.flush()
+        if rest:
+            yield rest
                 
     except Exception as e:
         logger.error(f"{log_prefix} Error in stream generator: {e}")
@@ -159,6 +233,14 @@ async def _quick_stream_generator(
         logger.info(f"{log_prefix} Session closed.")
 
 
+async def _quick_fast_path_generator(answer: str, sentences: bool = False) -> AsyncGenerator[str, None]:
+    """Emite la respuesta del fast path de intents con el mismo formato NDJSON."""
+    text_lines = _TextLines(sentences)
+    lines = text_lines.feed(answer) + text_lines.flush()
+    if lines:
+        yield lines
+
+
 @router.post("/quick")
 async def quick_endpoint(
     request: QuickRequest,
@@ -171,6 +253,8 @@ async def quick_endpoint(
     - Stateless: no guarda mensajes en DB.
     - Streaming: devuelve JSON dict por línea (NDJSON).
     - Optimizado para TTS ("Text to Speech") (Respuestas súper cortas, sin markdown).
+    - chunking="sentence": una línea por frase completa (sin markdown) para que el
+      cliente sintetice cada frase mientras se genera la siguiente.
     - Soporta de forma emulada la ejecución de herramientas.
     """
     
@@ -191,22 +275,31 @@ async def quick_endpoint(
     log_prefix = f"[QUICK][Client: {client_id}]"
     
     logger.info(f"{log_prefix} Processing QUICK request: {request.text[:50]}...")
+
+    # 3. Fast path: comandos conocidos se resuelven sin tocar el Engine
+    fast_answer = await intent_matcher.try_answer(request.text, client_id=client_id)
+    if fast_answer is not None:
+        return StreamingResponse(
+            _quick_fast_path_generator(fast_answer, sentences=request.chunking == "sentence"),
+            media_type="application/x-ndjson"
+        )
     
-    # 3. Request sesión efímera
+    # 4. Request sesión efímera
     try:
         session_id = await inference_client.create_session()
     except Exception as e:
         logger.error(f"{log_prefix} Failed creating inferred session: {e}")
         raise HTTPException(status_code=503, detail="Inference service unavailable")
         
-    # 4. Inicia proxy stream
+    # 5. Inicia proxy stream
     return StreamingResponse(
         _quick_stream_generator(
             client_id=client_id,
             user_id=request.user_id,
             session_id=session_id,
             text=request.text,
-            model_id=request.model_id
+            model_id=request.model_id,
+            sentences=request.chunking == "sentence",
         ),
         media_type="application/x-ndjson"
     )
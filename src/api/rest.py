@@ -13,12 +13,22 @@ Rutas base (todas bajo el prefijo /api definido en main.py):
   GET    /api/conversations/{user_id}
   GET    /api/conversations/{user_id}/{conversation_id}/messages
   PATCH  /api/conversations/{conversation_id}/model
+  GET    /api/tools/stats
+  GET    /api/intents/stats
+  GET    /api/mqtt/stats
+  GET    /api/events/stats
+  GET    /api/ws/stats
+  GET    /api/inference/stats
 """
 from fastapi import APIRouter, Query, Header, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 
-from src.core.services import inference_client, memory_manager
+from src.core.services import inference_client, memory_manager, mqtt_service
+from src.core.events import event_bus
+from src.api.chat.outbound import get_outbound_stats
+from src.core.tool_manager import tool_manager
+from src.core.intents import intent_matcher
 import logging
 
 logger = logging.getLogger(__name__)
@@ -157,3 +167,83 @@ async def update_conversation_model(
         "conversation_id": conversation_id,
         "model_id": body.model_id,
     }
+
+
+# ===========================================================================
+# Tools
+# ===========================================================================
+
+@router.get("/tools/stats", summary="Métricas de uso y latencia por herramienta")
+async def get_tool_stats(
+    x_client_key: str = Header(..., description="Client authentication key"),
+):
+    """
+    Devuelve, por herramienta, el número de llamadas, errores y latencia
+    (media y máxima en ms) desde el arranque del orquestador.
+    """
+    await _require_client(x_client_key)
+    return {"status": "success", "tools": tool_manager.get_tool_stats()}
+
+
+@router.get("/intents/stats", summary="Tasa de acierto y latencia del fast path de intents")
+async def get_intent_stats(
+    x_client_key: str = Header(..., description="Client authentication key"),
+):
+    """
+    Devuelve aciertos, fallos, tasa de acierto y latencia media del matcher
+    de intents que resuelve comandos de voz sin pasar por el Engine.
+    """
+    await _require_client(x_client_key)
+    return {"status": "success", "intents": intent_matcher.get_stats()}
+
+
+@router.get("/mqtt/stats", summary="Cola y tiempos de procesado de comandos de voz MQTT")
+async def get_mqtt_stats(
+    x_client_key: str = Header(..., description="Client authentication key"),
+):
+    """
+    Devuelve la profundidad de la cola de comandos MQTT, los comandos
+    descartados (cola llena) o caducados, y los tiempos medios de espera
+    y de procesado en ms.
+    """
+    await _require_client(x_client_key)
+    return {"status": "success", "mqtt": mqtt_service.get_stats()}
+
+
+@router.get("/events/stats", summary="Colas y latencias del bus de eventos interno")
+async def get_event_bus_stats(
+    x_client_key: str = Header(..., description="Client authentication key"),
+):
+    """
+    Devuelve, por topic, los eventos publicados, procesados, descartados,
+    rechazados y fallidos con la espera media en cola y el tiempo de proceso
+    (medio y máximo) en ms, y la profundidad de cola de cada suscriptor.
+    """
+    await _require_client(x_client_key)
+    return {"status": "success", "events": event_bus.get_stats()}
+
+
+@router.get("/ws/stats", summary="Búferes de envío de las conexiones WebSocket de chat")
+async def get_ws_stats(
+    x_client_key: str = Header(..., description="Client authentication key"),
+):
+    """
+    Devuelve las conexiones de chat abiertas y totales, las desconexiones por
+    cliente lento, los tokens agrupados mientras el cliente iba retrasado y las
+    marcas máximas de búfer de envío (bytes y tramas).
+    """
+    await _require_client(x_client_key)
+    return {"status": "success", "ws": get_outbound_stats()}
+
+
+@router.get("/inference/stats", summary="Colas por sesión de inferencia")
+async def get_inference_stats(
+    x_client_key: str = Header(..., description="Client authentication key"),
+):
+    """
+    Devuelve, para cada sesión con inferencia en curso, los frames del Engine
+    pendientes de leer, su máximo y la capacidad de la cola, y el número de
+    sesiones abortadas por desbordar su cola.
+    """
+    await _require_client(x_client_key)
+    return {"status": "success", "inference": inference_client.get_queue_stats()}
@@ -0,0 +1,72 @@
+"""
+circuit_breaker.py
+~~~~~~~~~~~~~~~~~~
+Circuit breaker simple por tool.
+
+  closed    → las llamadas pasan; N fallos consecutivos (errores o timeouts) lo abren.
+  open      → las llamadas fallan al instante hasta que pasa `reset_timeout`.
+  half_open → se deja pasar una única llamada de prueba: si va bien se cierra,
+              si falla se vuelve a abrir.
+"""
+import time
+from typing import Any, Dict
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Indica si una llamada puede ejecutarse ahora."""
+        if self.state == STATE_OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = STATE_HALF_OPEN
+            self._trial_in_flight = False
+
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        """Segundos hasta que se permita la siguiente llamada de prueba."""
+        if self.state != STATE_OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == STATE_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != STATE_OPEN:
+                self.times_opened += 1
+            self.state = STATE_OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Libera una llamada admitida que no llegó a dar resultado (cancelada o rechazada)."""
+        self._trial_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "retry_after_s": round(self.retry_after(), 1),
+        }
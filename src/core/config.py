@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -29,6 +29,19 @@ class Settings(BaseSettings):
         "The tool has provided the results. "
         "Please answer the original user query using this information."
     )
+    TOOL_RESULT_PROMPT: str = "Tool result ({tool_name}):\n{result}\n\n"
+    TOOL_FINAL_PROMPT: str = (
+        "The tool budget for this request is exhausted. "
+        "Answer the original user query now with the information you have, without calling more tools."
+    )
+
+    # ---------------------------------------------------------------------------
+    # Agent loop budget (per user turn)
+    # ---------------------------------------------------------------------------
+    AGENT_MAX_STEPS: int = 3                  # tool calls per turn before forcing a final answer
+    AGENT_MAX_LATENCY: float = 45.0           # seconds for the whole turn; no new tool step after it
+    AGENT_MAX_TOOL_TIME: float = 20.0         # seconds spent in tools across the turn
+    AGENT_STREAM_PRE_TOOL_TEXT: bool = False  # stream a pass's text while a tool call may still follow
 
     # ---------------------------------------------------------------------------
     # Inference parameters
@@ -38,6 +51,8 @@ class Settings(BaseSettings):
     INFERENCE_LOAD_MODEL_TIMEOUT: float = 30.0
     INFERENCE_LIST_MODELS_TIMEOUT: float = 10.0
     INFERENCE_SESSION_TIMEOUT: float = 5.0
+    INFERENCE_SESSION_QUEUE_SIZE: int = 1024  # unread engine frames per session before it is aborted
+    INFERENCE_ABORT_SETTLE_TIMEOUT: float = 1.0  # max wait for the engine to ack an abort before reusing the session
     MODELS_CACHE_TTL: float = 300.0           # seconds model list is cached
 
     # ---------------------------------------------------------------------------
@@ -45,6 +60,36 @@ class Settings(BaseSettings):
     # ---------------------------------------------------------------------------
     TOOL_MAX_OUTPUT_CHARS: int = 4000         # cap before truncation in tool_manager
     MEMORY_TOOL_OUTPUT_CAP: int = 1000        # cap when injecting tool results into context (conservative for quick/voice flow)
+    TOOL_OUTPUT_DROP_FIELDS: List[str] = [    # low-value fields removed when compacting tool output
+        "url", "raw_content", "raw_html", "html", "images", "favicon", "score",
+    ]
+    TOOL_OUTPUT_DEDUPE_THRESHOLD: float = 0.8 # word-overlap ratio above which two results are duplicates
+
+    # ---------------------------------------------------------------------------
+    # Tool execution pools (sync tools never run on the event loop by default)
+    # ---------------------------------------------------------------------------
+    TOOL_THREAD_POOL_SIZE: int = 8
+    TOOL_PROCESS_POOL_SIZE: int = 2
+
+    # ---------------------------------------------------------------------------
+    # Tool guards: concurrency, deadline and circuit breaker (per tool)
+    # ---------------------------------------------------------------------------
+    TOOL_DEFAULT_TIMEOUT: float = 20.0        # deadline for tools without an explicit timeout
+    TOOL_MAX_CONCURRENCY: int = 8             # simultaneous executions per tool
+    TOOL_CONCURRENCY_WAIT: float = 2.0        # seconds to wait for a free slot before rejecting
+    TOOL_BREAKER_FAILURE_THRESHOLD: int = 5   # consecutive failures/timeouts that open the breaker
+    TOOL_BREAKER_RESET_TIMEOUT: float = 30.0  # seconds before a half-open trial call is allowed
+
+    # ---------------------------------------------------------------------------
+    # MCP client
+    # ---------------------------------------------------------------------------
+    MCP_POOL_SIZE: int = 2                    # sessions (child processes) per MCP server
+    MCP_CONNECT_TIMEOUT: float = 15.0         # seconds to spawn + initialize one session
+    MCP_RECONNECT_BACKOFF: float = 1.0        # first delay between background reconnect attempts (doubles)
+    MCP_RECONNECT_BACKOFF_MAX: float = 30.0   # cap on that delay
+    MCP_CATALOG_DIR: str = ".mcp_catalogs"    # tool catalog snapshots (registered before the handshake)
+    # Servers started at boot: name → {command, args, env, pool_size, required_role} (JSON)
+    MCP_SERVERS: Dict[str, Dict[str, Any]] = {}
 
     # ---------------------------------------------------------------------------
     # Tool Config
@@ -53,7 +98,27 @@ class Settings(BaseSettings):
     TAVILY_SEARCH_DEPTH: str = "basic"
     TAVILY_MAX_RESULTS: int = 5
     TAVILY_TIMEOUT: float = 6.0               # max seconds for a Tavily search before aborting
+    TAVILY_CACHE_TTL: float = 300.0           # seconds identical searches are served from cache (0 = off)
+    TAVILY_API_URL: str = "https://api.tavily.com"
+    TAVILY_MAX_CONNECTIONS: int = 10          # pooled keep-alive connections to Tavily
+    TAVILY_HEDGE_ENABLED: bool = False        # send a duplicate request when the first is slow
+    TAVILY_HEDGE_DELAY: float = 1.5           # hedge threshold until enough latency samples exist for p90
     ENABLE_GBNF_GRAMMAR: bool = False         # Deprecated: Use system prompt instead
+    LOCAL_TIMEZONE: str = "Europe/Madrid"     # default zone for get_current_time
+
+    # ---------------------------------------------------------------------------
+    # Intent fast path (rule-based answers without inference)
+    # ---------------------------------------------------------------------------
+    INTENT_FAST_PATH_ENABLED: bool = True
+    INTENTS_FILE: Optional[str] = None        # custom intent table; defaults to src/core/intents.json
+
+    # ---------------------------------------------------------------------------
+    # Transcription stream (STT) and speculative inference
+    # ---------------------------------------------------------------------------
+    TRANSCRIPTION_SPECULATION_ENABLED: bool = True   # start inferring on a stable partial transcript
+    TRANSCRIPTION_STABLE_MS: int = 300        # ms a partial must stay unchanged before speculating
+    TRANSCRIPTION_SPECULATION_MIN_CHARS: int = 8     # shorter partials are never speculated on
+    TRANSCRIPTION_USER_ID: str = "transcription"     # user/client id for voice sessions (roles, intents)
 
     # ---------------------------------------------------------------------------
     # MQTT Integration
@@ -68,6 +133,14 @@ class Settings(BaseSettings):
     MQTT_QOS: int = 1
     MQTT_SUBSCRIBE_TOPIC: str = "jota/stt"
     MQTT_RESPONSE_TOPIC_PREFIX: str = "jota/response"
+    MQTT_WORKERS: int = 4                     # commands processed concurrently (one per device at a time)
+    MQTT_QUEUE_SIZE: int = 64                 # queued commands (min 1); when full the oldest is dropped
+    MQTT_MAX_COMMAND_AGE: float = 10.0        # seconds a command may wait before being dropped (0 = never)
+    MQTT_STREAM_SENTENCES: bool = True        # publish the response sentence by sentence (seq + final marker)
+    MQTT_UNIQUE_CLIENT_ID: bool = True        # suffix MQTT_CLIENT_ID with host/pid so replicas never collide
+    MQTT_SHARED_GROUP: Optional[str] = None   # subscribe via $share/<group>/: the broker balances replicas
+    MQTT_REPLICA_COUNT: int = 1               # per-device affinity: replicas reading the plain topic
+    MQTT_REPLICA_INDEX: int = 0               # this replica serves devices with crc32(id) % count == index
     MQTT_CLIENT_SYSTEM_PROMPT: str = (
         "You are Jota, a voice command assistant. "
         "Respond ONLY with 1-2 short phrases. "
@@ -75,6 +148,20 @@ class Settings(BaseSettings):
         "Match the language the user writes in."
     )
 
+    # ---------------------------------------------------------------------------
+    # Speakable chunks (sentence streaming for TTS clients)
+    # ---------------------------------------------------------------------------
+    TTS_CHUNK_MIN_CHARS: int = 12             # shorter sentences are merged with the next one
+    TTS_CHUNK_MAX_CHARS: int = 200            # longer runs are cut at a clause break or space
+
+    # ---------------------------------------------------------------------------
+    # Internal event bus (bounded queue + workers per subscriber)
+    # ---------------------------------------------------------------------------
+    EVENT_BUS_WORKERS: int = 2                # concurrent callback runs per subscriber
+    EVENT_BUS_QUEUE_SIZE: int = 100           # events waiting per subscriber
+    EVENT_BUS_OVERFLOW: str = "block"         # full queue: "block" | "drop_oldest" | "reject"
+    EVENT_BUS_DRAIN_TIMEOUT: float = 10.0     # seconds shutdown waits for queued events
+
     # ---------------------------------------------------------------------------
     # JotaDB Integration
     # ---------------------------------------------------------------------------
@@ -82,6 +169,16 @@ class Settings(BaseSettings):
     JOTA_DB_SK: str            # Server Key - sent as Bearer token for DB access
     JOTA_DB_TIMEOUT: float = 10.0
 
+    # ---------------------------------------------------------------------------
+    # Chat WebSocket output
+    # ---------------------------------------------------------------------------
+    WS_COALESCE_MS: float = 10.0              # tokens are batched into one frame for up to this long
+    WS_COALESCE_BYTES: int = 256              # pending token text that forces an immediate frame
+    WS_RAW_PASSTHROUGH: bool = True           # tool-free clients: forward engine tokens without tag scanning
+    WS_SEND_BUFFER_BYTES: int = 262144        # unsent output per connection before a slow client is dropped (0 = no limit)
+    WS_SEND_STALL_TIMEOUT: float = 10.0       # seconds one frame write may block before the client is dropped (0 = never)
+    WS_CANCEL_GRACE: float = 2.0              # seconds a cancelled answer gets to save its partial before it is cut
+
     # ---------------------------------------------------------------------------
     # CORS
     # ---------------------------------------------------------------------------
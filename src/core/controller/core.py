@@ -35,7 +35,11 @@ class JotaController(JotaModelMixin, JotaInputMixin):
 
     async def process_event_async(self, event: dict):
         """
-        Wrapper para el event_bus: drena el generator de handle_input.
+        Wrapper para el event_bus: drena el generator de handle_input, o la
+        respuesta ya en marcha si el evento la trae (inferencia especulativa
+        de TranscriptionClient).
         """
-        async for _ in self.handle_input(event):
+        response = event.get("response")
+        stream = response.stream() if response is not None else self.handle_input(event)
+        async for _ in stream:
             pass
@@ -4,9 +4,10 @@ Input handling logic for the Orchestrator Controller.
 Provides the `JotaInputMixin` which defines the main inference flow, coordinating
 model verification, token streaming, tool execution, and error handling.
 """
+import asyncio
 import logging
 from typing import AsyncGenerator, TYPE_CHECKING
-from src.services.inference import InferenceEngineBusyError, ModelNotFoundError
+from src.services.inference import InferenceEngineBusyError, InferenceInterruptedError, ModelNotFoundError
 
 if TYPE_CHECKING:
     from src.core.memory import MemoryManager
@@ -23,11 +24,20 @@ class JotaInputMixin:
         """
         Flujo principal por petición:
           1. Verificar y cargar el modelo de la conversación si es necesario.
-          2. Hacer streaming de tokens desde el InferenceCenter.
+          2. Hacer streaming de tokens desde el InferenceCenter. Mientras el modelo
+             aún puede pedir una tool, el texto de la pasada se retiene y solo se
+             emite si la pasada termina sin tool call; sin tools (o con
+             AGENT_STREAM_PRE_TOOL_TEXT) se emite según llega, reteniendo solo lo
+             que aún puede ser una etiqueta <tool_call>.
+          3. Bucle de tools acotado: cada tool call se ejecuta y su resultado se
+             añade a la sesión del Engine como siguiente prompt (sin recargar el
+             historial), hasta que el modelo responde o se agota el presupuesto
+             (AGENT_MAX_STEPS, AGENT_MAX_LATENCY, AGENT_MAX_TOOL_TIME).
 
         Error handling diferenciado:
           - ModelNotFoundError      → marca conversación en error; no permite más prompts.
           - InferenceEngineBusyError → error transitorio; NO marca conversación en error.
+          - InferenceInterruptedError → el usuario cortó la respuesta; termina sin emitir nada más.
           - Otros errores           → propaga el mensaje de error al cliente.
         """
         content = payload.get("content")
@@ -56,7 +66,9 @@ class JotaInputMixin:
 
             from src.core.tool_manager import tool_manager, ToolPermissionError
             from src.core.config import settings as _settings
-            from src.utils.tool_parser import extract_tool_calls, remove_tool_calls_from_text
+            from src.core.constants import CONTEXT_TRUNCATED_MARKER, TOOL_CALL_CLOSE, TOOL_CALL_OPEN
+            from src.utils.tool_parser import extract_tool_calls, remove_tool_calls_from_text, tag_free_prefix_len
+            from src.utils.tool_output import compact_tool_output
             import time as _time
             import json as _json
             tool_instructions = tool_manager.get_system_prompt_addition(client_id=client_id)
@@ -80,47 +92,124 @@ class JotaInputMixin:
                 f"effective_model={effective_model!r} "
                 f"engine_current={self.inference_client.current_engine_model!r}"
             )
-            
-            tool_executed = False
-            pre_tool_thinking = []   # Buffer for text emitted BEFORE the tool call
-            
-            async for token in self.inference_client.infer(
-                session_id=session_id,
-                prompt=content,
-                conversation_id=conversation_id,
-                user_id=user_id,
-                params=infer_params,
-                client_id=client_id,
-                model_id=effective_model,
-            ):
-                if isinstance(token, dict) and token.get("type") == "tool_call":
-                    tc_payload = token.get("payload", {})
-                    tool_name = tc_payload.get("name")
-                    tool_args = tc_payload.get("arguments", {})
-                    
+
+            # Presupuesto del turno (pasos de tool, latencia total y tiempo total en tools)
+            max_steps = _settings.AGENT_MAX_STEPS
+            turn_start = _time.monotonic()
+            tool_time = 0.0
+            steps = 0
+
+            def remaining_budget() -> float:
+                """Seconds a new tool step may still take (0 once any budget is exhausted)."""
+                if steps >= max_steps:
+                    return 0.0
+                latency_left = _settings.AGENT_MAX_LATENCY - (_time.monotonic() - turn_start)
+                return max(0.0, min(latency_left, _settings.AGENT_MAX_TOOL_TIME - tool_time))
+
+            prompt = content
+            direct_answer = None     # Final answer from a direct-answer tool (skips re-inference)
+            # Pre-tool text is hidden from the client unless no tool is offered or this is asked for
+            stream_text = not tool_instructions or _settings.AGENT_STREAM_PRE_TOOL_TEXT
+
+            while True:
+                tool_executed = False
+                tools_closed = steps >= max_steps   # budget exhausted: tool calls are ignored
+                step_result = None       # (tool_name, result text) fed to the next pass
+                pass_text = ""           # Text of this pass (pre-tool thinking if a tool call follows)
+                streamed = 0             # pass_text[:streamed] was already yielded to the client
+                scanned_to = 0           # text up to here holds no (new) complete tool_call block
+
+                async for token in self.inference_client.infer(
+                    session_id=session_id,
+                    prompt=prompt,
+                    conversation_id=conversation_id,
+                    user_id=user_id,
+                    params=infer_params,
+                    client_id=client_id,
+                    model_id=effective_model,
+                ):
+                    tool_call = None
+                    if isinstance(token, dict) and token.get("type") == "tool_call":
+                        tc_payload = token.get("payload", {})
+                        tool_call = (tc_payload.get("name"), tc_payload.get("arguments", {}))
+                        thinking_text = pass_text
+                    elif not tool_executed:
+                        pass_text += token
+                        # Text-based detection: fallback when inference.py streaming
+                        # parser misses the tag boundaries between chunks. Each block
+                        # is parsed once; none is looked for once tools are off.
+                        block_end = pass_text.rfind(
+                            TOOL_CALL_CLOSE, max(scanned_to, len(pass_text) - len(token) - len(TOOL_CALL_CLOSE) + 1)
+                        )
+                        if not tools_closed and block_end >= scanned_to:
+                            block_end += len(TOOL_CALL_CLOSE)
+                            detected_calls = extract_tool_calls(pass_text[scanned_to:block_end])
+                            scanned_to = block_end
+                            if detected_calls:
+                                tool_call = (detected_calls[0]["name"], detected_calls[0]["arguments"])
+                                thinking_text = remove_tool_calls_from_text(pass_text)
+                                logger.info(f"[TOOL] Detected from text stream: {tool_call[0]} args={tool_call[1]}")
+
+                        # Once no tool call can follow (or if asked to), stream the text
+                        # as it arrives, holding back only what may still be a tool_call
+                        # tag. Blocks that won't run (tools off, or already parsed
+                        # without a call) are dropped, never shown.
+                        while stream_text or tools_closed:
+                            safe = streamed + tag_free_prefix_len(pass_text[streamed:])
+                            if safe > streamed:
+                                yield pass_text[streamed:safe]
+                                streamed = safe
+                            if not pass_text.startswith(TOOL_CALL_OPEN, streamed):
+                                break
+                            block_end = pass_text.find(TOOL_CALL_CLOSE, streamed) + len(TOOL_CALL_CLOSE)
+                            if block_end < len(TOOL_CALL_CLOSE) or not (tools_closed or block_end <= scanned_to):
+                                break
+                            streamed = block_end
+                    else:
+                        # Text after the tool call in the same pass: the answer comes next pass
+                        continue
+
+                    if tool_call is None:
+                        continue
+                    budget = remaining_budget()
+                    if tool_executed or budget <= 0:
+                        tools_closed = True
+                        logger.warning(
+                            f"Tool call {tool_call[0]!r} ignored: "
+                            f"{'one tool per step' if tool_executed else 'agent budget exhausted'}."
+                        )
+                        continue
+
+                    tool_name, tool_args = tool_call
+
                     # Save the model's pre-tool thinking to the DB for traceability,
-                    # but DO NOT yield it to the user.
-                    if pre_tool_thinking:
-                        thinking_text = "".join(pre_tool_thinking)
-                        if not stateless:
-                            await self.memory_manager.save_message(
-                                conversation_id=conversation_id,
-                                user_id=user_id,
-                                role="assistant",
-                                content=thinking_text,
-                                client_id=client_id,
-                                metadata={"model_id": effective_model, "thinking": True},
-                            )
-                        pre_tool_thinking.clear()
-                    
+                    # but DO NOT yield it to the user (unless stream_text already did).
+                    if thinking_text.strip() and not stateless:
+                        await self.memory_manager.save_message(
+                            conversation_id=conversation_id,
+                            user_id=user_id,
+                            role="assistant",
+                            content=thinking_text,
+                            client_id=client_id,
+                            metadata={"model_id": effective_model, "thinking": True},
+                        )
+
+                    steps += 1
                     # Emit structured status tokens
-                    yield {"type": "status", "content": f"Buscando información usando {tool_name}..."}
-                    
+                    yield {
+                        "type": "status",
+                        "content": f"Buscando información usando {tool_name}...",
+                        "step": steps,
+                    }
+
+                    start_t = _time.monotonic()
                     try:
-                        start_t = _time.time()
-                        result = await tool_manager.execute_tool(tool_name, client_id=client_id, **tool_args)
-                        duration = f"{_time.time() - start_t:.2f}s"
-                        
+                        result = await asyncio.wait_for(
+                            tool_manager.execute_tool(tool_name, client_id=client_id, **tool_args),
+                            timeout=budget,
+                        )
+                        elapsed = _time.monotonic() - start_t
+                        duration = f"{elapsed:.2f}s"
                         result_str = result if isinstance(result, str) else _json.dumps(result)
 
                         if not stateless:
@@ -130,113 +219,84 @@ class JotaInputMixin:
                                 role="tool",
                                 content=result_str,
                                 client_id=client_id,
-                                metadata={"tool_name": tool_name, "execution_time": duration},
+                                metadata={"tool_name": tool_name, "execution_time": duration, "step": steps},
                             )
-                        yield {"type": "status", "content": f"Búsqueda completada en {duration}. Generando respuesta..."}
-                        tool_executed = True
+                        direct_answer = tool_manager.render_direct_answer(tool_name, result, tool_args)
+                        if direct_answer is None:
+                            yield {
+                                "type": "status",
+                                "content": f"Búsqueda completada en {duration}. Generando respuesta...",
+                                "step": steps,
+                            }
+                        step_result = (tool_name, result_str)
                     except Exception as e:
+                        elapsed = _time.monotonic() - start_t
+                        if isinstance(e, asyncio.TimeoutError):
+                            e = TimeoutError("exceeded the time budget for this turn")
                         logger.error(f"Tool execution failed: {e}")
+                        error_text = f"Error executing tool {tool_name}: {e}"
                         if not stateless:
                             await self.memory_manager.save_message(
                                 conversation_id=conversation_id,
                                 user_id=user_id,
                                 role="tool",
-                                content=f"Error executing tool {tool_name}: {e}",
+                                content=error_text,
                                 client_id=client_id,
-                                metadata={"tool_name": tool_name, "error": True},
+                                metadata={"tool_name": tool_name, "error": True, "step": steps},
                             )
-                        yield {"type": "status", "content": f"Error al ejecutar {tool_name}: {e}"}
-                        tool_executed = True
-                else:
-                    if not tool_executed:
-                        pre_tool_thinking.append(token)
+                        yield {"type": "status", "content": f"Error al ejecutar {tool_name}: {e}", "step": steps}
+                        step_result = (tool_name, error_text)
+                    tool_time += elapsed
+                    tool_executed = True
 
-                        # Text-based detection: fallback when inference.py streaming
-                        # parser misses the tag boundaries between chunks.
-                        accumulated = "".join(pre_tool_thinking)
-                        detected_calls = extract_tool_calls(accumulated)
-
-                        if detected_calls:
-                            tool_call_data = detected_calls[0]
-                            tool_name = tool_call_data["name"]
-                            tool_args = tool_call_data["arguments"]
-
-                            clean_thinking = remove_tool_calls_from_text(accumulated)
-                            if clean_thinking.strip() and not stateless:
-                                await self.memory_manager.save_message(
-                                    conversation_id=conversation_id,
-                                    user_id=user_id,
-                                    role="assistant",
-                                    content=clean_thinking,
-                                    client_id=client_id,
-                                    metadata={"model_id": effective_model, "thinking": True},
-                                )
-                            pre_tool_thinking.clear()
-
-                            logger.info(f"[TOOL] Detected from text stream: {tool_name} args={tool_args}")
-                            yield {"type": "status", "content": f"Buscando información usando {tool_name}..."}
-
-                            try:
-                                start_t = _time.time()
-                                result = await tool_manager.execute_tool(tool_name, client_id=client_id, **tool_args)
-                                duration = f"{_time.time() - start_t:.2f}s"
-                                result_str = result if isinstance(result, str) else _json.dumps(result)
-                                if not stateless:
-                                    await self.memory_manager.save_message(
-                                        conversation_id=conversation_id,
-                                        user_id=user_id,
-                                        role="tool",
-                                        content=result_str,
-                                        client_id=client_id,
-                                        metadata={"tool_name": tool_name, "execution_time": duration},
-                                    )
-                                yield {"type": "status", "content": f"Búsqueda completada en {duration}. Generando respuesta..."}
-                                tool_executed = True
-                            except Exception as e:
-                                logger.error(f"Tool execution failed (text detection): {e}")
-                                if not stateless:
-                                    await self.memory_manager.save_message(
-                                        conversation_id=conversation_id,
-                                        user_id=user_id,
-                                        role="tool",
-                                        content=f"Error executing tool {tool_name}: {e}",
-                                        client_id=client_id,
-                                        metadata={"tool_name": tool_name, "error": True},
-                                    )
-                                yield {"type": "status", "content": f"Error al ejecutar {tool_name}: {e}"}
-                                tool_executed = True
-                    else:
-                        yield token
-                    
-            # If model responded without any tool call, yield all buffered text normally
-            if not tool_executed and pre_tool_thinking:
-                for chunk in pre_tool_thinking:
-                    yield chunk
-                    
-            if tool_executed:
-                logger.info(f"Tool executed, starting RE-INFERENCE for session {session_id}")
-                yield {"type": "status", "content": "Analizando resultados..."}
-                
-                # Reload context (skip for stateless — no history to reload)
+                # If model responded without any tool call, yield whatever was held back
+                if not tool_executed:
+                    rest = pass_text[streamed:]
+                    if TOOL_CALL_OPEN in rest:
+                        # Tool call ignored (budget exhausted or unparseable): never leak the raw tags
+                        rest = remove_tool_calls_from_text(rest)
+                        rest = rest.split(TOOL_CALL_OPEN, 1)[0]  # unterminated block
+                    if rest:
+                        yield rest
+                    break
+
+                if direct_answer is not None:
+                    break
+
+                # Next step: only the new tool result is appended to the engine session
+                tool_name, result_str = step_result
+                result_text = compact_tool_output(
+                    result_str,
+                    _settings.MEMORY_TOOL_OUTPUT_CAP,
+                    marker=CONTEXT_TRUNCATED_MARKER,
+                    query=content,
+                )
+                more_tools = remaining_budget() > 0
+                if not more_tools:
+                    logger.info(
+                        f"Agent budget exhausted for session {session_id} "
+                        f"(steps={steps}, tool_time={tool_time:.2f}s, "
+                        f"elapsed={_time.monotonic() - turn_start:.2f}s); requesting final answer"
+                    )
+                logger.info(f"Tool step {steps} done, continuing inference for session {session_id}")
+                yield {"type": "status", "content": "Analizando resultados...", "step": steps}
+                prompt = _settings.TOOL_RESULT_PROMPT.format(tool_name=tool_name, result=result_text) + (
+                    _settings.TOOL_FOLLOWUP_PROMPT if more_tools else _settings.TOOL_FINAL_PROMPT
+                )
+
+            if direct_answer is not None:
+                # Direct-answer tool: its (templated) output IS the response.
+                logger.info(f"Direct-answer tool result returned for session {session_id}, skipping RE-INFERENCE")
                 if not stateless:
-                    context = await self.memory_manager.get_conversation_messages(conversation_id, client_id)
-                    await self.inference_client.set_context(session_id, context)
-                
-                followup_prompt = _settings.TOOL_FOLLOWUP_PROMPT
-                    
-                async for token in self.inference_client.infer(
-                    session_id=session_id,
-                    prompt=followup_prompt,
-                    conversation_id=conversation_id,
-                    user_id=user_id,
-                    params=infer_params,
-                    client_id=client_id,
-                    model_id=effective_model,
-                ):
-                    if isinstance(token, dict) and token.get("type") == "tool_call":
-                        logger.warning("Nested tool call attempted, ignoring.")
-                    else:
-                        yield token
+                    await self.memory_manager.save_message(
+                        conversation_id=conversation_id,
+                        user_id=user_id,
+                        role="assistant",
+                        content=direct_answer,
+                        client_id=client_id,
+                        metadata={"model_id": effective_model, "direct_answer": True},
+                    )
+                yield direct_answer
 
             logger.info("Inference stream complete.")
 
@@ -250,6 +310,75 @@ class JotaInputMixin:
             # No marcamos la conversación en error — es un estado transitorio
             yield f" [Error: El Engine está procesando otra petición. Intenta de nuevo en un momento.]"
 
+        except InferenceInterruptedError:
+            logger.info(f"Inference interrupted by the client for session {session_id}")
+
         except Exception as e:
             logger.error(f"Error during inference flow: {e}")
             yield f" [Error: {str(e)}]"
+
+    def is_tool_free(self, client_id) -> bool:
+        """True si el rol del cliente no ve ninguna tool (no puede haber tool calls)."""
+        from src.core.tool_manager import tool_manager
+        return not tool_manager.get_tool_schemas(client_id)
+
+    async def handle_input_raw(self, payload: dict) -> AsyncGenerator[str, None]:
+        """
+        Fast path de `handle_input` para clientes sin tools (ver `is_tool_free`).
+
+        Sin bucle de tools ni búsqueda de etiquetas: cada token del Engine se
+        reenvía en cuanto llega, como cuerpo JSON-escapado (sin comillas) tomado
+        del frame original, para que el WebSocket lo inserte en su trama sin
+        decodificar ni volver a serializar. Los errores se emiten igual que en
+        `handle_input`, también escapados.
+        """
+        import json as _json
+        from src.core.config import settings as _settings
+
+        def escaped(text: str) -> str:
+            return _json.dumps(text)[1:-1]
+
+        session_id = payload.get("session_id")
+        conversation_id = payload.get("conversation_id")
+        user_id = payload.get("user_id")
+        client_id = payload.get("client_id")
+
+        if not session_id or not conversation_id or not user_id:
+            logger.error("Missing session_id, conversation_id, or user_id in payload")
+            yield escaped(" [Error: Internal Context Missing]")
+            return
+
+        logger.info(f"Controller processing tool-free input for session {session_id} (raw pass-through)")
+
+        try:
+            if not payload.get("stateless", False):
+                await self._ensure_model_loaded(conversation_id, client_id)
+            effective_model = self.inference_client.current_engine_model or payload.get("model_id")
+            system_prompt = payload.get("system_prompt_override") or _settings.AGENT_BASE_SYSTEM_PROMPT
+
+            async for body in self.inference_client.infer_raw(
+                session_id=session_id,
+                prompt=payload.get("content"),
+                conversation_id=conversation_id,
+                user_id=user_id,
+                params={"system_prompt": system_prompt},
+                client_id=client_id,
+                model_id=effective_model,
+            ):
+                yield body
+
+        except ModelNotFoundError as e:
+            logger.error(f"Model not found for conversation {conversation_id}: {e}")
+            await self.memory_manager.mark_conversation_error(conversation_id, client_id)
+            yield escaped(" [Error: El modelo solicitado no existe en el Engine. Selecciona un modelo válido.]")
+
+        except InferenceEngineBusyError as e:
+            logger.warning(f"Engine busy for session {session_id}: {e}")
+            yield escaped(" [Error: El Engine está procesando otra petición. Intenta de nuevo en un momento.]")
+
+        except InferenceInterruptedError:
+            logger.info(f"Inference interrupted by the client for session {session_id}")
+
+        except Exception as e:
+            logger.error(f"Error during inference flow: {e}")
+            yield escaped(f" [Error: {str(e)}]")
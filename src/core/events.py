@@ -1,15 +1,264 @@
+"""
+events.py
+~~~~~~~~~
+Bus de eventos interno con backpressure.
+
+Cada suscripción tiene su propia cola acotada y un número fijo de workers que
+la consumen, así que una ráfaga de eventos (p. ej. transcripciones) nunca lanza
+más ejecuciones concurrentes que workers haya. Con la cola llena se aplica la
+política de overflow de la suscripción:
+
+  - "block":       ``publish`` espera a que haya hueco (backpressure al productor).
+  - "drop_oldest": se descarta el evento más antiguo de la cola.
+  - "reject":      se descarta el evento nuevo.
+
+El topic de un evento es su campo ``type``. ``shutdown`` deja de aceptar eventos
+y espera a que las colas se vacíen antes de parar los workers.
+
+Un evento puede traer un callback ``on_discard`` (sin argumentos) que el bus
+llama si lo descarta sin entregarlo (overflow o drenado de ``shutdown`` agotado),
+para que el productor libere lo que el evento lleva en marcha.
+"""
 import asyncio
-from typing import Callable, Awaitable, List
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_REJECT = "reject"
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_REJECT)
+
+DEFAULT_TOPIC = "event"
+
+Subscriber = Callable[[dict], Awaitable[None]]
+
+
+def _discard(event: dict) -> None:
+    """Runs the event's ``on_discard`` callback, if any: the bus dropped it undelivered."""
+    on_discard = event.get("on_discard")
+    if on_discard is None:
+        return
+    try:
+        on_discard()
+    except Exception as e:
+        logger.error(f"EventBus on_discard callback failed: {e}", exc_info=True)
+
+
+class EventBusClosedError(RuntimeError):
+    """Raised when publishing after the bus started shutting down."""
+    pass
+
+
+class Subscription:
+    """A subscriber with its bounded queue and worker tasks."""
+
+    def __init__(self, bus: "EventBus", callback: Subscriber, topic: Optional[str],
+                 workers: int, queue_size: int, overflow: str):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy '{overflow}'. Must be one of: {list(OVERFLOW_POLICIES)}")
+        self.bus = bus
+        self.callback = callback
+        self.topic = topic
+        self.workers = max(1, workers)
+        self.overflow = overflow
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def name(self) -> str:
+        return getattr(self.callback, "__qualname__", repr(self.callback))
+
+    def matches(self, topic: str) -> bool:
+        return self.topic is None or self.topic == topic
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker(), name=f"event-bus-{self.name}-{i}")
+                for i in range(self.workers)
+            ]
+
+    async def put(self, topic: str, event: dict) -> bool:
+        """Queues an event following the overflow policy; False if it was rejected."""
+        item = (topic, time.monotonic(), event)
+        if self.overflow == OVERFLOW_BLOCK:
+            await self.queue.put(item)
+            return True
+        if self.queue.full():
+            if self.overflow == OVERFLOW_REJECT:
+                self.bus._record(topic, "rejected")
+                _discard(event)
+                return False
+            dropped_topic, _, dropped = self.queue.get_nowait()
+            self.queue.task_done()
+            self.bus._record(dropped_topic, "dropped")
+            _discard(dropped)
+        self.queue.put_nowait(item)
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            topic, queued_at, event = await self.queue.get()
+            started = time.monotonic()
+            try:
+                await self.callback(event)
+            except Exception as e:
+                self.bus._record(topic, "errors")
+                logger.error(f"EventBus subscriber {self.name} failed on '{topic}' event: {e}", exc_info=True)
+            finally:
+                self.bus._record_latency(topic, started - queued_at, time.monotonic() - started)
+                self.queue.task_done()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
 
 class EventBus:
+    """Publish/subscribe bus with bounded per-subscriber queues and worker pools."""
+
     def __init__(self):
-        self._subscribers: List[Callable[[dict], Awaitable[None]]] = []
+        self._subscriptions: List[Subscription] = []
+        self._stats: Dict[str, Dict[str, float]] = {}   # topic → counters and latency sums
+        self._closed = False
+        self._stopping: Set[asyncio.Task] = set()        # workers of unsubscribed subscriptions, stopping
+
+    def subscribe(
+        self,
+        callback: Subscriber,
+        topic: Optional[str] = None,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        overflow: Optional[str] = None,
+    ) -> Subscription:
+        """Registers a coroutine subscriber.
+
+        Args:
+            topic:      Only events whose ``type`` equals this topic (None = all events).
+            workers:    Concurrent callback runs. Defaults to EVENT_BUS_WORKERS.
+            queue_size: Events waiting for a worker. Defaults to EVENT_BUS_QUEUE_SIZE.
+            overflow:   "block", "drop_oldest" or "reject". Defaults to EVENT_BUS_OVERFLOW.
+        """
+        subscription = Subscription(
+            self,
+            callback,
+            topic,
+            workers or settings.EVENT_BUS_WORKERS,
+            queue_size or settings.EVENT_BUS_QUEUE_SIZE,
+            overflow or settings.EVENT_BUS_OVERFLOW,
+        )
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+            task = asyncio.ensure_future(subscription.stop())
+            self._stopping.add(task)
+            task.add_done_callback(self._stopping.discard)
+
+    async def publish(self, event: dict) -> int:
+        """Queues the event for every matching subscriber.
+
+        Workers are started on first use, so subscribing at import time is fine.
+        Returns the number of subscribers that accepted the event.
+
+        Raises:
+            EventBusClosedError: If the bus is shutting down.
+        """
+        if self._closed:
+            raise EventBusClosedError("EventBus is shut down")
+        topic = event.get("type") or DEFAULT_TOPIC
+        self._record(topic, "published")
+        accepted = 0
+        for subscription in list(self._subscriptions):
+            if not subscription.matches(topic):
+                continue
+            subscription.start()
+            if await subscription.put(topic, event):
+                accepted += 1
+        if accepted < sum(1 for s in self._subscriptions if s.matches(topic)):
+            logger.warning(f"EventBus: '{topic}' event rejected by a full subscriber queue")
+        return accepted
+
+    async def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """Stops accepting events, waits for queued ones to be handled, then stops the workers.
+
+        Returns False if the drain timed out (remaining events are discarded).
+        """
+        self._closed = True
+        timeout = settings.EVENT_BUS_DRAIN_TIMEOUT if timeout is None else timeout
+        started = [s for s in self._subscriptions if s._tasks]
+        drained = True
+        try:
+            await asyncio.wait_for(asyncio.gather(*(s.queue.join() for s in started)), timeout)
+        except asyncio.TimeoutError:
+            drained = False
+            pending = sum(s.queue.qsize() for s in started)
+            logger.warning(f"EventBus drain timed out after {timeout}s; {pending} events discarded")
+            for subscription in started:
+                while not subscription.queue.empty():
+                    _, _, event = subscription.queue.get_nowait()
+                    subscription.queue.task_done()
+                    _discard(event)
+        await asyncio.gather(*(s.stop() for s in started), *self._stopping)
+        return drained
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+    def _topic_stats(self, topic: str) -> Dict[str, float]:
+        if topic not in self._stats:
+            self._stats[topic] = {
+                "published": 0, "handled": 0, "errors": 0, "dropped": 0, "rejected": 0,
+                "wait_ms": 0.0, "handle_ms": 0.0, "max_handle_ms": 0.0,
+            }
+        return self._stats[topic]
+
+    def _record(self, topic: str, counter: str) -> None:
+        self._topic_stats(topic)[counter] += 1
+
+    def _record_latency(self, topic: str, wait: float, handle: float) -> None:
+        stats = self._topic_stats(topic)
+        stats["handled"] += 1
+        stats["wait_ms"] += wait * 1000
+        stats["handle_ms"] += handle * 1000
+        stats["max_handle_ms"] = max(stats["max_handle_ms"], handle * 1000)
 
-    def subscribe(self, callback: Callable[[dict], Awaitable[None]]):
-        self._subscribers.append(callback)
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-topic counters and latency (ms), plus per-subscriber queue depth."""
+        topics = {}
+        for topic, s in self._stats.items():
+            handled = s["handled"]
+            topics[topic] = {
+                "published": s["published"],
+                "handled": handled,
+                "errors": s["errors"],
+                "dropped": s["dropped"],
+                "rejected": s["rejected"],
+                "avg_wait_ms": s["wait_ms"] / handled if handled else 0.0,
+                "avg_handle_ms": s["handle_ms"] / handled if handled else 0.0,
+                "max_handle_ms": s["max_handle_ms"],
+            }
+        subscribers = [
+            {
+                "subscriber": sub.name,
+                "topic": sub.topic or "*",
+                "workers": sub.workers,
+                "overflow": sub.overflow,
+                "queue_depth": sub.queue.qsize(),
+                "queue_size": sub.queue.maxsize,
+            }
+            for sub in self._subscriptions
+        ]
+        return {"topics": topics, "subscribers": subscribers}
 
-    async def publish(self, event: dict):
-        for subscriber in self._subscribers:
-            asyncio.create_task(subscriber(event))
 
 event_bus = EventBus()
@@ -0,0 +1,223 @@
+"""
+intents.py
+~~~~~~~~~~
+Fast path basado en reglas para comandos de voz conocidos.
+
+Un `IntentMatcher` carga una tabla de intents (JSON) con patrones regex
+precompilados. Los grupos con nombre de cada patrón son los *slots* que se
+pasan como argumentos a la tool asociada. Si un texto encaja por completo
+con un patrón, la tool se ejecuta y se devuelve la respuesta formateada sin
+pasar por el Engine; en cualquier otro caso se devuelve None y el llamador
+sigue con la inferencia normal.
+
+Formato del fichero:
+    {
+      "intents": [
+        {
+          "name": "calculate",
+          "patterns": ["cu[aá]nto es (?P<expression>.+)"],
+          "tool": "calculate",
+          "arguments": {},                      # argumentos fijos (opcional)
+          "slots": {"expression": "string"},    # string | number | integer (opcional)
+          "answer_template": "Son {value}."     # opcional
+        }
+      ]
+    }
+"""
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.config import settings
+from src.core.tool_manager import ToolManager, ToolPermissionError, tool_manager
+from src.core.tool_validation import parse_decimal
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_INTENTS_FILE = Path(__file__).with_name("intents.json")
+
+# Signos que los STT suelen añadir alrededor de la frase y no aportan nada al match
+_EDGE_PUNCTUATION = "¿?¡!.,;: \t\n"
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_utterance(text: str) -> str:
+    """Minúsculas, espacios colapsados y sin puntuación en los extremos."""
+    return _WHITESPACE.sub(" ", text.strip(_EDGE_PUNCTUATION).lower())
+
+
+@dataclass
+class Intent:
+    name: str
+    tool: str
+    patterns: List[re.Pattern]
+    arguments: Dict[str, Any] = field(default_factory=dict)
+    slots: Dict[str, str] = field(default_factory=dict)
+    answer_template: Optional[str] = None
+
+
+@dataclass
+class IntentMatch:
+    intent: Intent
+    arguments: Dict[str, Any]
+
+
+def _coerce_slot(value: str, slot_type: str) -> Any:
+    value = value.strip()
+    if slot_type == "number":
+        return parse_decimal(value)
+    if slot_type == "integer":
+        return int(value)
+    return value
+
+
+class IntentMatcher:
+    """Tabla de intents precompilada con extracción de slots y métricas de acierto."""
+
+    def __init__(self, tm: ToolManager = tool_manager):
+        self._tool_manager = tm
+        self._intents: List[Intent] = []
+        self._stats: Dict[str, float] = {"hits": 0, "misses": 0, "errors": 0, "hit_ms": 0.0, "miss_ms": 0.0}
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def load(self, path: Optional[str] = None) -> int:
+        """Carga (o recarga) la tabla de intents desde un fichero JSON.
+
+        Returns:
+            Número de intents cargados. Un fichero inexistente o inválido deja
+            la tabla vacía (el fast path queda desactivado) y se registra en el log.
+        """
+        file_path = Path(path) if path else _DEFAULT_INTENTS_FILE
+        try:
+            raw = json.loads(file_path.read_text(encoding="utf-8"))
+            self.load_table(raw)
+        except (OSError, ValueError, re.error, KeyError, TypeError) as e:
+            logger.error(f"Intent table {file_path} could not be loaded: {e}. Fast path disabled.")
+            self._intents = []
+        else:
+            logger.info(f"Intent table loaded from {file_path}: {len(self._intents)} intents")
+        return len(self._intents)
+
+    def load_table(self, table: Dict[str, Any]) -> None:
+        """Compila una tabla de intents ya parseada."""
+        intents = []
+        for entry in table.get("intents", []):
+            intents.append(Intent(
+                name=entry["name"],
+                tool=entry["tool"],
+                patterns=[re.compile(p, re.IGNORECASE) for p in entry["patterns"]],
+                arguments=dict(entry.get("arguments", {})),
+                slots=dict(entry.get("slots", {})),
+                answer_template=entry.get("answer_template"),
+            ))
+        self._intents = intents
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+    def match(self, text: str) -> Optional[IntentMatch]:
+        """Devuelve el primer intent cuyo patrón encaja con el texto completo."""
+        utterance = normalize_utterance(text)
+        if not utterance:
+            return None
+
+        for intent in self._intents:
+            if not self._tool_manager.has_tool(intent.tool):
+                continue
+            for pattern in intent.patterns:
+                m = pattern.fullmatch(utterance)
+                if not m:
+                    continue
+                arguments = dict(intent.arguments)
+                try:
+                    for slot, value in m.groupdict().items():
+                        if value is not None:
+                            arguments[slot] = _coerce_slot(value, intent.slots.get(slot, "string"))
+                except ValueError:
+                    # Un slot que no encaja con su tipo no es un match seguro
+                    continue
+                return IntentMatch(intent=intent, arguments=arguments)
+        return None
+
+    async def try_answer(self, text: str, client_id: Any = None) -> Optional[str]:
+        """Resuelve el texto por el fast path si hay un match seguro.
+
+        Returns:
+            La respuesta final para el cliente, o None si hay que recurrir al LLM
+            (sin match, permiso denegado o error de la tool).
+        """
+        start = time.perf_counter()
+        matched = self.match(text)
+        if matched is None:
+            self._record(start, hit=False)
+            return None
+
+        intent = matched.intent
+        try:
+            result = await self._tool_manager.execute_tool(intent.tool, client_id=client_id, **matched.arguments)
+            answer = self._render(intent, result, matched.arguments)
+        except ToolPermissionError as e:
+            logger.info(f"Intent '{intent.name}' matched but tool is not allowed: {e}")
+            self._record(start, hit=False)
+            return None
+        except Exception as e:
+            logger.warning(f"Intent '{intent.name}' failed ({e}); falling back to LLM")
+            self._stats["errors"] += 1
+            self._record(start, hit=False)
+            return None
+
+        elapsed_ms = self._record(start, hit=True)
+        logger.info(f"Intent fast path hit: '{intent.name}' args={matched.arguments} ({elapsed_ms:.2f}ms)")
+        return answer
+
+    def _render(self, intent: Intent, result: Any, arguments: Dict[str, Any]) -> str:
+        if intent.answer_template is not None:
+            fields = dict(arguments)
+            if isinstance(result, dict):
+                fields.update(result)
+            fields["result"] = result if isinstance(result, str) else json.dumps(result, ensure_ascii=False)
+            return intent.answer_template.format(**fields)
+
+        direct = self._tool_manager.render_direct_answer(intent.tool, result, arguments)
+        if direct is not None:
+            return direct
+        return result if isinstance(result, str) else json.dumps(result, ensure_ascii=False)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    def _record(self, start: float, hit: bool) -> float:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if hit:
+            self._stats["hits"] += 1
+            self._stats["hit_ms"] += elapsed_ms
+        else:
+            self._stats["misses"] += 1
+            self._stats["miss_ms"] += elapsed_ms
+        return elapsed_ms
+
+    def get_stats(self) -> Dict[str, float]:
+        """Tasa de acierto y latencia media (ms) del fast path desde el arranque."""
+        hits, misses = self._stats["hits"], self._stats["misses"]
+        total = hits + misses
+        return {
+            "intents": len(self._intents),
+            "hits": hits,
+            "misses": misses,
+            "errors": self._stats["errors"],
+            "hit_rate": hits / total if total else 0.0,
+            "avg_hit_ms": self._stats["hit_ms"] / hits if hits else 0.0,
+            "avg_miss_ms": self._stats["miss_ms"] / misses if misses else 0.0,
+        }
+
+
+# Global IntentMatcher instance
+intent_matcher = IntentMatcher()
+if settings.INTENT_FAST_PATH_ENABLED:
+    intent_matcher.load(settings.INTENTS_FILE)
@@ -3,6 +3,7 @@ import logging
 from typing import Optional, Dict, Any, Literal
 from src.core.config import settings
 from src.core.constants import CONTEXT_TRUNCATED_MARKER
+from src.utils.tool_output import compact_tool_output
 
 logger = logging.getLogger(__name__)
 
@@ -217,13 +218,22 @@ class MemoryManager:
             raw_messages = response.json()
             processed_messages = []
             
+            last_user_prompt = None
             for msg in raw_messages:
+                if msg.get("role") == "user":
+                    last_user_prompt = msg.get("content")
                 # Local optimization for tool calls to avoid context inflation
                 if msg.get("role") == "tool":
                     content = msg.get("content", "")
-                    # Cap tool output footprint to ~1500 chars to avoid model distraction and token explosion
+                    # Compact tool output (structure-aware), keeping what is relevant to the
+                    # prompt that triggered it, to avoid model distraction and token explosion
                     if content and len(content) > settings.MEMORY_TOOL_OUTPUT_CAP:
-                        msg["content"] = content[:settings.MEMORY_TOOL_OUTPUT_CAP] + CONTEXT_TRUNCATED_MARKER
+                        msg["content"] = compact_tool_output(
+                            content,
+                            settings.MEMORY_TOOL_OUTPUT_CAP,
+                            marker=CONTEXT_TRUNCATED_MARKER,
+                            query=last_user_prompt,
+                        )
                 processed_messages.append(msg)
                 
             # Return up to 'fetch_limit' elements; the downstream model needs the tool traces chronologically
@@ -3,7 +3,12 @@ from src.core.memory import MemoryManager
 from src.services.inference import InferenceClient
 from src.core.controller import JotaController
 from src.services.mqtt import MQTTService
+from src.services.transcription import TranscriptionClient
 import src.tools  # noqa: F401 — triggers @tool decorator registrations
+from src.tools import tavily
+from src.core.tool_manager import tool_manager
+from src.services.mcp_client import mcp_manager
+from src.core.events import event_bus
 
 logger = logging.getLogger(__name__)
 
@@ -11,12 +16,20 @@ logger = logging.getLogger(__name__)
 memory_manager = MemoryManager()
 inference_client = InferenceClient(memory_manager=memory_manager)
 jota_controller = JotaController(inference_client=inference_client, memory_manager=memory_manager)
+mqtt_service = MQTTService(inference_client=inference_client, jota_controller=jota_controller)
+transcription_client = TranscriptionClient(inference_client=inference_client, jota_controller=jota_controller)
 
 async def shutdown_services():
     """
     Graceful shutdown of all services.
     """
     logger.info("Shutting down services...")
+    transcription_client.stop()
+    await mqtt_service.shutdown()
+    await event_bus.shutdown()
     await inference_client.invoke_shutdown()
     await memory_manager.close()
+    await tavily.close_client()
+    await mcp_manager.close_all()
+    tool_manager.shutdown()
     logger.info("Services shut down.")
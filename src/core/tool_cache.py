@@ -0,0 +1,133 @@
+"""
+tool_cache.py
+~~~~~~~~~~~~~
+Caché de resultados por tool: LRU con TTL y coalescencia de llamadas
+concurrentes idénticas (single-flight).
+
+Se configura de forma declarativa desde `@tool(cache_ttl=...)` o, para
+tools registradas dinámicamente (MCP), con `ToolManager.enable_cache`.
+"""
+import asyncio
+import json
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_arguments(arguments: Dict[str, Any]) -> str:
+    """Clave por defecto: strings en minúsculas y con espacios colapsados, claves ordenadas."""
+    normalized = {
+        k: _WHITESPACE.sub(" ", v.strip().lower()) if isinstance(v, str) else v
+        for k, v in arguments.items()
+    }
+    return json.dumps(normalized, sort_keys=True, default=str, ensure_ascii=False)
+
+
+@dataclass
+class CachePolicy:
+    """Opciones de caché de una tool.
+
+    Attributes:
+        ttl:         Segundos que un resultado se considera válido.
+        max_entries: Tamaño máximo del LRU; al superarlo se expulsa la entrada más antigua.
+        key:         Función que normaliza los argumentos a una clave hashable.
+        cache_errors: Si True, las excepciones también se cachean (durante el mismo TTL).
+        cache_if:    Predicado opcional sobre el resultado; si devuelve False no se cachea
+                     (p. ej. resultados vacíos por timeout).
+    """
+    ttl: float
+    max_entries: int = 128
+    key: Callable[[Dict[str, Any]], Any] = normalize_arguments
+    cache_errors: bool = False
+    cache_if: Optional[Callable[[Any], bool]] = None
+
+
+class ToolResultCache:
+    """LRU con expiración y single-flight para los resultados de una tool."""
+
+    def __init__(self, policy: CachePolicy):
+        self.policy = policy
+        # key → (expires_at, is_error, value)
+        self._entries: "OrderedDict[Any, Tuple[float, bool, Any]]" = OrderedDict()
+        self._inflight: Dict[Any, asyncio.Future] = {}
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    def _lookup(self, key: Any) -> Optional[Tuple[bool, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, is_error, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return is_error, value
+
+    def _store(self, key: Any, is_error: bool, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.policy.ttl, is_error, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.policy.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def get_or_call(self, arguments: Dict[str, Any], call: Callable[[], Awaitable[Any]]) -> Any:
+        """Devuelve el resultado cacheado o ejecuta `call` una sola vez por clave."""
+        key = self.policy.key(arguments)
+
+        cached = self._lookup(key)
+        if cached is not None:
+            self.stats["hits"] += 1
+            is_error, value = cached
+            if is_error:
+                raise value
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                result = await asyncio.shield(inflight)
+                self.stats["coalesced"] += 1
+                return result
+            except asyncio.CancelledError:
+                # La llamada líder fue cancelada: ejecutamos nosotros mismos.
+                if not inflight.cancelled():
+                    raise
+
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if self.policy.cache_errors:
+                self._store(key, True, e)
+            future.set_exception(e)
+            # Evita el warning "exception was never retrieved" si nadie más esperaba
+            future.exception()
+            raise
+        else:
+            if self.policy.cache_if is None or self.policy.cache_if(result):
+                self._store(key, False, result)
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+        served = self.stats["hits"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": served / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
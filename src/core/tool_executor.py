@@ -0,0 +1,104 @@
+"""
+tool_executor.py
+~~~~~~~~~~~~~~~~
+Ejecución de tools fuera del event loop.
+
+Cada tool declara un modo de ejecución:
+  - inline:  se llama directamente en el loop (coroutines y funciones triviales).
+  - thread:  se envía a un ThreadPoolExecutor compartido (I/O o librerías bloqueantes).
+  - process: se envía a un ProcessPoolExecutor compartido (CPU intensivo; la función
+             y sus argumentos deben ser picklables, es decir, definidos a nivel de módulo).
+
+Los pools se crean de forma perezosa y se cierran en `shutdown()`. Al cancelar o
+vencer el timeout de una llamada, el trabajo aún en cola se descarta; el que ya está
+en ejecución en un hilo/proceso no se puede interrumpir: `run()` solo termina (con
+CancelledError) cuando el worker acaba, para que quien limita la concurrencia siga
+contando ese hueco como ocupado. El resultado se ignora.
+"""
+import asyncio
+import functools
+import inspect
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_INLINE = "inline"
+EXECUTION_THREAD = "thread"
+EXECUTION_PROCESS = "process"
+EXECUTION_MODES = (EXECUTION_INLINE, EXECUTION_THREAD, EXECUTION_PROCESS)
+
+
+def default_execution_mode(func: Callable) -> str:
+    """Coroutines corren en el loop; las funciones síncronas nunca lo bloquean por defecto."""
+    return EXECUTION_INLINE if inspect.iscoroutinefunction(func) else EXECUTION_THREAD
+
+
+class ToolExecutor:
+    """Pools compartidos para ejecutar tools síncronas sin bloquear el event loop."""
+
+    def __init__(self, thread_workers: int, process_workers: int):
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.thread_workers, thread_name_prefix="jota-tool"
+            )
+        return self._thread_pool
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            # spawn: los workers no heredan el estado del loop ni los sockets del proceso padre
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._process_pool
+
+    async def run(self, func: Callable, kwargs: Dict[str, Any], mode: str) -> Any:
+        """Ejecuta `func(**kwargs)` según el modo indicado."""
+        if mode == EXECUTION_INLINE:
+            if inspect.iscoroutinefunction(func):
+                return await func(**kwargs)
+            return func(**kwargs)
+
+        if inspect.iscoroutinefunction(func):
+            raise ValueError(f"Coroutine tool '{func.__name__}' cannot run in '{mode}' mode")
+
+        call = functools.partial(func, **kwargs)
+        if mode == EXECUTION_THREAD:
+            return await self._await_worker(self._get_thread_pool().submit(call))
+        if mode == EXECUTION_PROCESS:
+            try:
+                return await self._await_worker(self._get_process_pool().submit(call))
+            except BrokenProcessPool as e:
+                # Un worker murió (OOM, señal...): se recrea el pool en la siguiente llamada
+                logger.error(f"Process pool broken while running '{func.__name__}': {e}")
+                self._process_pool = None
+                raise RuntimeError(f"Tool '{func.__name__}' worker process died") from e
+        raise ValueError(f"Unknown execution mode '{mode}'. Must be one of: {list(EXECUTION_MODES)}")
+
+    @staticmethod
+    async def _await_worker(work: Future) -> Any:
+        try:
+            return await asyncio.wrap_future(work)
+        except asyncio.CancelledError:
+            if not work.cancel():
+                # Ya corre en un worker: no se da por terminada hasta que acabe
+                await asyncio.wait([asyncio.wrap_future(work)])
+            raise
+
+    def shutdown(self) -> None:
+        """Cierra los pools sin esperar a trabajos huérfanos (timeouts/cancelaciones)."""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
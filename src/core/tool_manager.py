@@ -1,12 +1,20 @@
+import asyncio
 import inspect
 import json
 import logging
 import os
+import time
 from typing import Callable, Dict, Any, List, Optional
+import httpx
 from pydantic import BaseModel
 
-from src.core.constants import TOOL_CALL_OPEN, TOOL_CALL_CLOSE, TOOL_OUTPUT_TRUNCATED_MARKER
+from src.core.constants import TOOL_CALL_OPEN, TOOL_CALL_CLOSE
 from src.core.config import settings
+from src.core.tool_cache import CachePolicy, ToolResultCache, normalize_arguments
+from src.core.circuit_breaker import CircuitBreaker
+from src.core.tool_validation import ToolArgumentError, Validator, compile_validator
+from src.core.tool_executor import EXECUTION_INLINE, EXECUTION_MODES, ToolExecutor, default_execution_mode
+from src.utils.tool_output import compact_tool_output
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +36,23 @@ class ToolPermissionError(Exception):
     pass
 
 
+class ToolTimeoutError(TimeoutError):
+    """Raised when a tool call exceeds its configured timeout."""
+    pass
+
+
+class ToolUnavailableError(Exception):
+    """Raised without running the tool when its circuit breaker is open or it is saturated."""
+    pass
+
+
+def _is_backend_failure(error: BaseException) -> bool:
+    """Timeouts and transport/upstream failures; errors caused by the call's own input don't count."""
+    if isinstance(error, (RecursionError, NotImplementedError)):
+        return False
+    return isinstance(error, (TimeoutError, OSError, RuntimeError, httpx.HTTPError))
+
+
 class ToolManager:
     """Manages the registration, permission gating, and execution of tools."""
     
@@ -36,6 +61,19 @@ class ToolManager:
         self._schemas: Dict[str, Dict[str, Any]] = {}
         self._permissions: Dict[str, str] = {}          # tool_name → required role
         self._client_roles: Dict[Any, str] = {}         # client_id → assigned role
+        self._direct_answers: Dict[str, Optional[str]] = {}  # tool_name → answer template (None = raw output)
+        self._stats: Dict[str, Dict[str, float]] = {}    # tool_name → call counters and latency
+        self._caches: Dict[str, ToolResultCache] = {}    # tool_name → result cache (opt-in)
+        self._execution: Dict[str, str] = {}            # tool_name → inline | thread | process
+        self._timeouts: Dict[str, float] = {}           # tool_name → per-call timeout (seconds)
+        self._concurrency: Dict[str, int] = {}          # tool_name → max concurrent executions
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._validators: Dict[str, Validator] = {}     # tool_name → precompiled argument validator
+        self._executor = ToolExecutor(
+            thread_workers=settings.TOOL_THREAD_POOL_SIZE,
+            process_workers=settings.TOOL_PROCESS_POOL_SIZE,
+        )
         self.max_output_chars = max_output_chars
         
     # ------------------------------------------------------------------
@@ -64,11 +102,39 @@ class ToolManager:
     # ------------------------------------------------------------------
     # Tool registration
     # ------------------------------------------------------------------
-    def register(self, func: Callable, required_role: str = ROLE_PUBLIC):
-        """Registers a tool function with an optional required permission role."""
+    def register(
+        self,
+        func: Callable,
+        required_role: str = ROLE_PUBLIC,
+        direct_answer: bool = False,
+        answer_template: Optional[str] = None,
+        cache: Optional[CachePolicy] = None,
+        execution: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        """Registers a tool function with an optional required permission role.
+
+        Args:
+            direct_answer:   If True, the tool output is the final answer: it is sent
+                             straight to the client and no follow-up inference is run.
+            answer_template: Optional ``str.format`` template applied to the output of a
+                             direct-answer tool. Receives ``{result}``, the call arguments
+                             and, for dict results, the result keys.
+            cache:           Optional result caching policy (see ``enable_cache``).
+            execution:       "inline", "thread" or "process". Defaults to inline for
+                             coroutines and to the thread pool for sync functions, so
+                             a sync tool never blocks the event loop unless declared inline.
+            timeout:         Per-call timeout in seconds (ToolTimeoutError). Defaults to
+                             TOOL_DEFAULT_TIMEOUT.
+            max_concurrency: Max simultaneous executions of this tool. Defaults to
+                             TOOL_MAX_CONCURRENCY.
+        """
         name = func.__name__
-        self._tools[name] = func
-        self._permissions[name] = required_role
+        self._set_options(
+            name, func, required_role, direct_answer, answer_template, cache,
+            execution or default_execution_mode(func), timeout, max_concurrency,
+        )
         
         # Parse docstring for description
         doc = inspect.getdoc(func)
@@ -112,8 +178,134 @@ class ToolManager:
         }
         
         self._schemas[name] = schema
+        accepts_extra = any(p.kind == inspect.Parameter.VAR_KEYWORD for p in sig.parameters.values())
+        self._validators[name] = compile_validator(params, allow_extra=accepts_extra)
         return func
         
+    def register_external(
+        self,
+        name: str,
+        func: Callable,
+        description: str,
+        parameters: Optional[Dict[str, Any]],
+        required_role: str = ROLE_PUBLIC,
+        cache: Optional[CachePolicy] = None,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        """Registers a coroutine tool whose schema comes from outside (e.g. an MCP proxy).
+
+        Same guards and permission gating as ``register``, but the parameters
+        JSON schema is taken as given instead of being derived from the signature.
+        """
+        if not inspect.iscoroutinefunction(func):
+            raise ValueError(f"External tool '{name}' must be a coroutine function")
+        if required_role not in ROLE_HIERARCHY:
+            raise ValueError(f"Invalid role '{required_role}'. Must be one of: {list(ROLE_HIERARCHY.keys())}")
+        self._set_options(name, func, required_role, False, None, cache, EXECUTION_INLINE, timeout, max_concurrency)
+        parameters = parameters or {"type": "object", "properties": {}}
+        self._schemas[name] = {
+            "name": name,
+            "description": description,
+            "parameters": parameters,
+            "required_role": required_role,
+        }
+        self._validators[name] = compile_validator(parameters)
+        return func
+
+    def unregister(self, name: str):
+        """Removes a tool and all of its per-tool state (no-op if unknown)."""
+        for registry in (
+            self._tools, self._schemas, self._permissions, self._direct_answers, self._caches,
+            self._execution, self._timeouts, self._concurrency, self._semaphores,
+            self._breakers, self._validators,
+        ):
+            registry.pop(name, None)
+
+    def _set_options(
+        self,
+        name: str,
+        func: Callable,
+        required_role: str,
+        direct_answer: bool,
+        answer_template: Optional[str],
+        cache: Optional[CachePolicy],
+        execution: str,
+        timeout: Optional[float],
+        max_concurrency: Optional[int],
+    ):
+        """Stores the callable and its execution/permission options, resetting its guards."""
+        if execution not in EXECUTION_MODES:
+            raise ValueError(f"Invalid execution mode '{execution}'. Must be one of: {list(EXECUTION_MODES)}")
+        if execution != EXECUTION_INLINE and inspect.iscoroutinefunction(func):
+            raise ValueError(f"Coroutine tool '{name}' must use inline execution, got '{execution}'")
+        self._execution[name] = execution
+        if timeout:
+            self._timeouts[name] = timeout
+        else:
+            self._timeouts.pop(name, None)
+        if max_concurrency:
+            self._concurrency[name] = max_concurrency
+        else:
+            self._concurrency.pop(name, None)
+        self._semaphores.pop(name, None)
+        self._breakers.pop(name, None)
+        self._tools[name] = func
+        self._permissions[name] = required_role
+        if direct_answer or answer_template is not None:
+            self._direct_answers[name] = answer_template
+        else:
+            self._direct_answers.pop(name, None)
+        if cache is not None:
+            self.enable_cache(name, cache)
+        else:
+            self._caches.pop(name, None)
+
+    def enable_cache(self, name: str, policy: CachePolicy):
+        """Serves repeated calls of a tool from an LRU keyed on its normalised arguments.
+
+        Concurrent identical calls are coalesced into a single execution.
+        Also usable for tools registered without the decorator (e.g. MCP proxies).
+        """
+        if policy.ttl <= 0:
+            self._caches.pop(name, None)
+            return
+        self._caches[name] = ToolResultCache(policy)
+
+    def has_tool(self, name: str) -> bool:
+        """Returns True if a tool with this name is registered."""
+        return name in self._tools
+
+    def refresh_validator(self, name: str, allow_extra: Optional[bool] = None):
+        """(Re)compiles the argument validator of a tool from its registered schema.
+
+        Used after editing a registered schema in place.
+        """
+        schema = self._schemas[name]
+        self._validators[name] = compile_validator(schema.get("parameters"), allow_extra=allow_extra)
+
+    def validate_arguments(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Checks call arguments against the tool's precompiled schema validator.
+
+        Returns:
+            The arguments, with unambiguous numeric strings coerced.
+
+        Raises:
+            ValueError: If the tool is not registered.
+            ToolArgumentError: If the arguments do not match the schema.
+        """
+        validator = self._validators.get(name)
+        if validator is None:
+            if name not in self._schemas:
+                raise ValueError(f"Tool '{name}' not found.")
+            self.refresh_validator(name)
+            validator = self._validators[name]
+        return validator(arguments)
+
+    def get_tool_schema(self, name: str) -> Optional[Dict[str, Any]]:
+        """Returns the registered schema of a single tool, or None if unknown."""
+        return self._schemas.get(name)
+
     def get_tool_schemas(self, client_id: Any = None) -> List[Dict[str, Any]]:
         """Returns the JSON schemas for tools accessible to a given client.
         
@@ -143,6 +335,8 @@ class ToolManager:
         Raises:
             ValueError: If the tool is not registered.
             ToolPermissionError: If the client lacks the required role.
+            ToolArgumentError: If the arguments do not match the tool's schema
+                (the tool is not called).
         """
         if name not in self._tools:
             raise ValueError(f"Tool '{name}' not found.")
@@ -150,26 +344,182 @@ class ToolManager:
         # Permission gate
         if client_id is not None:
             self._check_permission(client_id, name)
+
+        # Argument gate — invalid calls never reach the tool (or the network)
+        if name in self._schemas:
+            try:
+                kwargs = self.validate_arguments(name, kwargs)
+            except ToolArgumentError as e:
+                self._get_stats(name)["invalid"] += 1
+                raise ToolArgumentError(f"Invalid arguments for tool '{name}': {e}")
         
-        func = self._tools[name]
-        
-        # Execute
-        if inspect.iscoroutinefunction(func):
-            result = await func(**kwargs)
+        # Execute (through the result cache when the tool opted in)
+        cache = self._caches.get(name)
+        if cache is not None:
+            result = await cache.get_or_call(kwargs, lambda: self._invoke(name, kwargs))
         else:
-            result = func(**kwargs)
+            result = await self._invoke(name, kwargs)
             
-        # Output size limit — cap to prevent context overflow
+        # Output size limit — compact (structure-aware) to prevent context overflow.
+        # The tool's own string arguments (e.g. the search query) drive relevance.
         result_str = result if isinstance(result, str) else json.dumps(result)
         if len(result_str) > self.max_output_chars:
+            query = " ".join(v for v in kwargs.values() if isinstance(v, str))
+            result_str = compact_tool_output(result, self.max_output_chars, query=query)
             logger.warning(
-                f"Tool '{name}' output truncated: {len(result_str)} → {self.max_output_chars} chars"
+                f"Tool '{name}' output compacted: {len(result_str)} chars (limit {self.max_output_chars})"
             )
-            result_str = result_str[:self.max_output_chars] + TOOL_OUTPUT_TRUNCATED_MARKER
             return result_str
             
         return result
 
+    def _get_semaphore(self, name: str) -> asyncio.Semaphore:
+        if name not in self._semaphores:
+            limit = self._concurrency.get(name, settings.TOOL_MAX_CONCURRENCY)
+            self._semaphores[name] = asyncio.Semaphore(limit)
+        return self._semaphores[name]
+
+    def _get_breaker(self, name: str) -> CircuitBreaker:
+        if name not in self._breakers:
+            self._breakers[name] = CircuitBreaker(
+                failure_threshold=settings.TOOL_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=settings.TOOL_BREAKER_RESET_TIMEOUT,
+            )
+        return self._breakers[name]
+
+    async def _invoke(self, name: str, kwargs: Dict[str, Any]) -> Any:
+        """Calls the tool in its execution mode and records latency.
+
+        Guarded by the tool's circuit breaker, concurrency limit and deadline:
+        an open breaker or a saturated tool fails fast with ToolUnavailableError.
+        Only timeouts and transport/upstream failures count towards opening the
+        breaker; errors caused by the arguments (ValueError, ZeroDivisionError...) do not.
+        """
+        func = self._tools[name]
+        mode = self._execution.get(name) or default_execution_mode(func)
+        timeout = self._timeouts.get(name, settings.TOOL_DEFAULT_TIMEOUT)
+        stats = self._get_stats(name)
+
+        breaker = self._get_breaker(name)
+        if not breaker.allow():
+            stats["short_circuited"] += 1
+            raise ToolUnavailableError(
+                f"Tool '{name}' is temporarily unavailable after repeated failures "
+                f"(retry in {breaker.retry_after():.0f}s). Answer without it."
+            )
+
+        semaphore = self._get_semaphore(name)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), settings.TOOL_CONCURRENCY_WAIT)
+        except asyncio.TimeoutError:
+            breaker.release()
+            stats["rejections"] += 1
+            raise ToolUnavailableError(f"Tool '{name}' is saturated, try again later. Answer without it.")
+
+        start = time.perf_counter()
+        # The slot is held until the work really ends: a thread/process call that
+        # outlives its deadline keeps counting against max_concurrency
+        work = asyncio.ensure_future(self._executor.run(func, kwargs, mode))
+        work.add_done_callback(lambda task: self._release_slot(semaphore, task))
+        try:
+            call = asyncio.shield(work)
+            result = await asyncio.wait_for(call, timeout) if timeout else await call
+        except asyncio.TimeoutError:
+            work.cancel()
+            breaker.record_failure()
+            stats["timeouts"] += 1
+            self._record_call(name, time.perf_counter() - start, error=True)
+            raise ToolTimeoutError(f"Tool '{name}' timed out after {timeout}s")
+        except asyncio.CancelledError:
+            work.cancel()
+            breaker.release()
+            raise
+        except Exception as e:
+            if _is_backend_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.release()   # bad input (e.g. division by zero): the backend is fine
+            self._record_call(name, time.perf_counter() - start, error=True)
+            raise
+        breaker.record_success()
+        self._record_call(name, time.perf_counter() - start)
+        return result
+
+    @staticmethod
+    def _release_slot(semaphore: asyncio.Semaphore, work: asyncio.Future) -> None:
+        semaphore.release()
+        if not work.cancelled():
+            work.exception()   # retrieved here when the caller already gave up on it
+
+    def shutdown(self):
+        """Releases the thread/process pools used by sync tools."""
+        self._executor.shutdown()
+
+    def _get_stats(self, name: str) -> Dict[str, float]:
+        if name not in self._stats:
+            self._stats[name] = {
+                "calls": 0, "errors": 0, "invalid": 0, "timeouts": 0, "rejections": 0, "short_circuited": 0,
+                "total_ms": 0.0, "max_ms": 0.0,
+            }
+        return self._stats[name]
+
+    def _record_call(self, name: str, elapsed: float, error: bool = False):
+        stats = self._get_stats(name)
+        elapsed_ms = elapsed * 1000
+        stats["calls"] += 1
+        stats["errors"] += int(error)
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def get_tool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns per-tool call volume, latency, guard and cache counters since startup.
+
+        ``calls`` counts real executions only; requests served from the cache
+        show up under ``cache`` instead. ``rejections`` (saturated), ``timeouts``
+        and ``short_circuited`` (breaker open) are reported alongside the
+        breaker state and current in-flight executions.
+        """
+        stats: Dict[str, Dict[str, Any]] = {
+            name: {**s, "avg_ms": s["total_ms"] / s["calls"] if s["calls"] else 0.0}
+            for name, s in self._stats.items()
+        }
+        for name, cache in self._caches.items():
+            stats.setdefault(name, {})["cache"] = cache.get_stats()
+        for name, breaker in self._breakers.items():
+            stats.setdefault(name, {})["breaker"] = breaker.get_stats()
+        for name, semaphore in self._semaphores.items():
+            limit = self._concurrency.get(name, settings.TOOL_MAX_CONCURRENCY)
+            stats.setdefault(name, {})["in_flight"] = limit - semaphore._value
+        return stats
+
+    def is_direct_answer(self, name: str) -> bool:
+        """Returns True if the tool's output is returned to the client without re-inference."""
+        return name in self._direct_answers
+
+    def render_direct_answer(self, name: str, result: Any, arguments: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Builds the final client answer for a direct-answer tool.
+
+        Returns None when the tool is not declared as direct-answer, so callers
+        fall back to the regular follow-up inference.
+        """
+        if name not in self._direct_answers:
+            return None
+
+        result_str = result if isinstance(result, str) else json.dumps(result, ensure_ascii=False)
+        template = self._direct_answers[name]
+        if template is None:
+            return result_str
+
+        fields: Dict[str, Any] = dict(arguments or {})
+        if isinstance(result, dict):
+            fields.update(result)
+        fields["result"] = result_str
+        try:
+            return template.format(**fields)
+        except (KeyError, IndexError, ValueError) as e:
+            logger.warning(f"Tool '{name}' answer template failed ({e!r}); returning raw output")
+            return result_str
+
     # ------------------------------------------------------------------
     # System prompt & grammar generation
     # ------------------------------------------------------------------
@@ -240,7 +590,8 @@ class ToolManager:
             "}\n"
             f"{TOOL_CALL_CLOSE}\n\n"
             "IMPORTANT RULES:\n"
-            "1. Use tools ONLY when you need current/external data\n"
+            "1. Use tools ONLY when you need current/external data, the current time, "
+            "or an exact calculation or unit conversion\n"
             "2. Output ONLY the tool call, nothing before or after\n"
             "3. Wait for the tool result before responding\n"
             "4. After receiving results, synthesize a natural answer\n"
@@ -309,7 +660,21 @@ ws ::= [ \t\n\r]*
 # Global ToolManager instance
 tool_manager = ToolManager()
 
-def tool(func: Callable = None, *, required_role: str = ROLE_PUBLIC):
+def tool(
+    func: Callable = None,
+    *,
+    required_role: str = ROLE_PUBLIC,
+    direct_answer: bool = False,
+    answer_template: Optional[str] = None,
+    cache_ttl: Optional[float] = None,
+    cache_max_entries: int = 128,
+    cache_key: Callable[[Dict[str, Any]], Any] = normalize_arguments,
+    cache_errors: bool = False,
+    cache_if: Optional[Callable[[Any], bool]] = None,
+    execution: Optional[str] = None,
+    timeout: Optional[float] = None,
+    max_concurrency: Optional[int] = None,
+):
     """Decorator to register a function as a tool.
     
     Usage:
@@ -318,6 +683,15 @@ def tool(func: Callable = None, *, required_role: str = ROLE_PUBLIC):
         
         @tool(required_role="admin")    # admin-only tool
         async def gpu_stats(): ...
+
+        @tool(direct_answer=True, answer_template="Son las {result}.")
+        def get_current_time(): ...     # output goes straight to the client
+
+        @tool(cache_ttl=300)            # identical calls within 5 min hit the cache
+        async def search(query: str): ...
+
+        @tool(execution="process", timeout=10)  # CPU-heavy, off the event loop
+        def factorize(n: int): ...
     """
     if func is not None:
         # Called as @tool without arguments
@@ -325,6 +699,21 @@ def tool(func: Callable = None, *, required_role: str = ROLE_PUBLIC):
     
     # Called as @tool(required_role="admin")
     def decorator(f: Callable):
-        return tool_manager.register(f, required_role=required_role)
+        return tool_manager.register(
+            f,
+            required_role=required_role,
+            direct_answer=direct_answer,
+            answer_template=answer_template,
+            cache=CachePolicy(
+                ttl=cache_ttl,
+                max_entries=cache_max_entries,
+                key=cache_key,
+                cache_errors=cache_errors,
+                cache_if=cache_if,
+            ) if cache_ttl else None,
+            execution=execution,
+            timeout=timeout,
+            max_concurrency=max_concurrency,
+        )
     return decorator
 
@@ -0,0 +1,163 @@
+"""
+tool_validation.py
+~~~~~~~~~~~~~~~~~~
+Validadores de argumentos precompilados a partir del JSON schema de cada tool.
+
+El schema se compila una sola vez al registrar la tool: el resultado es un
+closure que solo comprueba lo que el schema declara (tipos, requeridos, enums,
+propiedades desconocidas), sin reinterpretar el schema en cada llamada.
+
+Los números llegan a menudo como texto desde el modelo ("5"): se aceptan y
+convierten cuando son inequívocos. La coma solo se admite como único separador
+decimal ("1,5"); "1,000" o "1.000,5" son ambiguos y se rechazan en vez de adivinar.
+Un string requerido vacío cuenta como ausente.
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Validator = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+class ToolArgumentError(ValueError):
+    """Raised when tool call arguments do not match the tool's schema."""
+    pass
+
+
+def _to_integer(value: Any) -> Tuple[bool, Any]:
+    if isinstance(value, bool):
+        return False, value
+    if isinstance(value, int):
+        return True, value
+    if isinstance(value, float) and value.is_integer():
+        return True, int(value)
+    if isinstance(value, str):
+        try:
+            return True, int(value.strip())
+        except ValueError:
+            pass
+    return False, value
+
+
+_THOUSANDS_GROUPED = re.compile(r"[+-]?[1-9]\d{0,2}(?:,\d{3})+")
+_DECIMAL_COMMA = re.compile(r"[+-]?\d*,\d+")
+
+
+def parse_decimal(text: str) -> float:
+    """Parses a number that may use a comma as its single decimal separator ("1,5" → 1.5).
+
+    Raises:
+        ValueError: Not a number, or ambiguous: thousands-grouped ("1,000") or
+            mixing separators ("1.000,5").
+    """
+    text = text.strip()
+    if "," in text:
+        if _THOUSANDS_GROUPED.fullmatch(text) or not _DECIMAL_COMMA.fullmatch(text):
+            raise ValueError(f"ambiguous number {text!r}")
+        text = text.replace(",", ".")
+    return float(text)
+
+
+def _to_number(value: Any) -> Tuple[bool, Any]:
+    if isinstance(value, bool):
+        return False, value
+    if isinstance(value, (int, float)):
+        return True, value
+    if isinstance(value, str):
+        try:
+            return True, parse_decimal(value)
+        except ValueError:
+            pass
+    return False, value
+
+
+_CHECKS: Dict[str, Callable[[Any], Tuple[bool, Any]]] = {
+    "string": lambda v: (isinstance(v, str), v),
+    "integer": _to_integer,
+    "number": _to_number,
+    "boolean": lambda v: (isinstance(v, bool), v),
+    "array": lambda v: (isinstance(v, list), v),
+    "object": lambda v: (isinstance(v, dict), v),
+    "null": lambda v: (v is None, v),
+}
+
+
+def _compile_value(schema: Dict[str, Any], path: str) -> Callable[[Any], Any]:
+    """Compiles the checks for a single value; the returned callable returns the (coerced) value."""
+    declared = schema.get("type")
+    types: List[str] = [declared] if isinstance(declared, str) else list(declared or [])
+    checks = [_CHECKS[t] for t in types if t in _CHECKS]
+    enum = schema.get("enum")
+    enum_values = list(enum) if isinstance(enum, list) else None
+
+    nested: Optional[Callable[[Any], Any]] = None
+    if "object" in types and isinstance(schema.get("properties"), dict):
+        nested = _compile_object(schema, f"{path}.")
+    elif "array" in types and isinstance(schema.get("items"), dict):
+        item = _compile_value(schema["items"], f"{path}[]")
+        nested = lambda values: [item(v) for v in values]
+
+    def check(value: Any) -> Any:
+        if checks:
+            for type_check in checks:
+                ok, coerced = type_check(value)
+                if ok:
+                    value = coerced
+                    break
+            else:
+                raise ToolArgumentError(
+                    f"'{path}' must be {' or '.join(types)}, got {type(value).__name__}"
+                )
+        if enum_values is not None and value not in enum_values:
+            raise ToolArgumentError(f"'{path}' must be one of {enum_values}, got {value!r}")
+        if nested is not None and isinstance(value, (dict, list)):
+            value = nested(value)
+        return value
+
+    return check
+
+
+def _compile_object(schema: Dict[str, Any], path: str = "", allow_extra: Optional[bool] = None) -> Validator:
+    properties: Dict[str, Any] = schema.get("properties") or {}
+    required = [name for name in schema.get("required") or [] if isinstance(name, str)]
+    string_required = [name for name in required if properties.get(name, {}).get("type") == "string"]
+    fields = {name: _compile_value(sub or {}, f"{path}{name}") for name, sub in properties.items()}
+    if allow_extra is None:
+        allow_extra = schema.get("additionalProperties", True) is not False
+
+    def validate(arguments: Dict[str, Any]) -> Dict[str, Any]:
+        missing = [name for name in required if name not in arguments]
+        missing += [
+            name for name in string_required
+            if isinstance(arguments.get(name), str) and not arguments[name].strip()
+        ]
+        if missing:
+            raise ToolArgumentError(f"missing required argument(s): {', '.join(missing)}")
+        if not allow_extra:
+            unknown = [name for name in arguments if name not in fields]
+            if unknown:
+                raise ToolArgumentError(
+                    f"unknown argument(s): {', '.join(unknown)}; expected: {', '.join(fields) or 'none'}"
+                )
+        validated = dict(arguments)
+        for name, value in arguments.items():
+            check = fields.get(name)
+            if check is not None:
+                validated[name] = check(value)
+        return validated
+
+    return validate
+
+
+def compile_validator(parameters: Optional[Dict[str, Any]], allow_extra: Optional[bool] = None) -> Validator:
+    """Compiles a tool's ``parameters`` JSON schema into a fast argument validator.
+
+    Args:
+        parameters:  Object schema (``properties``, ``required``, ``enum``...).
+        allow_extra: Whether unknown arguments are accepted. Defaults to the
+                     schema's ``additionalProperties`` (accepted unless False).
+
+    Returns:
+        A callable that takes the call arguments and returns them validated
+        (numeric strings coerced), raising ToolArgumentError otherwise.
+    """
+    return _compile_object(parameters or {}, allow_extra=allow_extra)
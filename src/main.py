@@ -6,9 +6,9 @@ from src.core.config import settings
 from src.api.chat import router as chat_router
 from src.api.quick import router as quick_router
 from src.api.rest import router as rest_router
-# from src.services.transcription import transcription_client  # Disabled until MQTT is available
-from src.core.services import inference_client, memory_manager, shutdown_services
-# from src.services.mqtt import mqtt_service # Disabled
+# from src.core.services import transcription_client  # Disabled until MQTT is available
+from src.core.services import inference_client, memory_manager, mqtt_service, shutdown_services
+from src.services.mcp_client import mcp_manager
 
 # Configure root logger so all src.* loggers propagate to the console.
 # Gunicorn only sets up gunicorn.*/uvicorn.* loggers; without this,
@@ -74,6 +74,17 @@ async def lifespan(app: FastAPI):
         logger.info("✅ MQTT: Suscrito y escuchando")
         logger.info("")  # Línea en blanco
 
+    # 4. MCP servers: tools registered from the catalog snapshot, sessions open in background
+    if settings.MCP_SERVERS:
+        logger.info("🔌 Conectando servidores MCP...")
+        errors = await mcp_manager.start_servers(settings.MCP_SERVERS)
+        for name, error in errors.items():
+            if error:
+                logger.error(f"❌ MCP '{name}': {error}")
+            else:
+                logger.info(f"✅ MCP '{name}': tools registradas")
+        logger.info("")  # Línea en blanco
+
     logger.info("=" * 60)
     logger.info("✨ JotaOrchestrator listo para recibir peticiones")
     logger.info("=" * 60)
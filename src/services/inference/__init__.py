@@ -7,6 +7,11 @@ mantener la compatibilidad estricta.
 """
 
 from .client import InferenceClient
-from .exceptions import InferenceEngineBusyError, ModelNotFoundError
+from .exceptions import InferenceEngineBusyError, InferenceInterruptedError, ModelNotFoundError
 
-__all__ = ["InferenceClient", "InferenceEngineBusyError", "ModelNotFoundError"]
+__all__ = [
+    "InferenceClient",
+    "InferenceEngineBusyError",
+    "InferenceInterruptedError",
+    "ModelNotFoundError",
+]
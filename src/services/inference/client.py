@@ -6,6 +6,7 @@ and session management mixins to provide a high-level API for interacting with t
 InferenceCenter (e.g., listing/loading models and streaming inference tokens).
 """
 import asyncio
+import re
 import time
 import json
 import logging
@@ -14,19 +15,34 @@ from typing import Dict, AsyncGenerator, Any, Optional, List, Union
 from src.core.config import settings
 from src.core.constants import TOOL_CALL_OPEN, TOOL_CALL_CLOSE, INTERRUPTED_MARKER
 from src.core.memory import MemoryManager
+from src.utils.tool_parser import parse_tool_call_json
 
 from .connection import InferenceConnectionMixin
 from .session_manager import InferenceSessionMixin
-from .exceptions import InferenceEngineBusyError, ModelNotFoundError
+from .exceptions import InferenceEngineBusyError, InferenceInterruptedError, ModelNotFoundError
 
 logger = logging.getLogger(__name__)
 
+# "content" string of a flat engine frame, still JSON-escaped
+_CONTENT_LITERAL = re.compile(r'"content"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def content_literal(raw: Optional[str], content: str) -> str:
+    """JSON-escaped body (no quotes) of a token's content, sliced from the raw engine frame when possible."""
+    if raw is not None:
+        match = _CONTENT_LITERAL.search(raw)
+        if match:
+            return match.group(1)
+    return json.dumps(content)[1:-1]
+
+
 class InferenceClient(InferenceConnectionMixin, InferenceSessionMixin):
     """
     Cliente WebSocket que mantiene una conexión persistente con el InferenceCenter.
 
     Internals:
-        _response_queues    : Cola asyncio por session_id para streaming de tokens.
+        _response_queues    : Cola asyncio acotada por session_id para streaming de tokens
+                              (INFERENCE_SESSION_QUEUE_SIZE; al desbordar se aborta la sesión).
         _pending_commands   : Mapa de futures para comandos de gestión (list_models, load_model).
         _pending_sessions   : Futures para creación de sesión en vuelo.
         _auth_future        : Future que se resuelve al completar autenticación.
@@ -45,6 +61,10 @@ class InferenceClient(InferenceConnectionMixin, InferenceSessionMixin):
         self.active_sessions: Dict[str, str] = {}
         self._user_sessions: Dict[str, str] = {}  # user_id -> session_id tracking
         self._response_queues: Dict[str, asyncio.Queue] = {}
+        self._queue_high_water: Dict[str, int] = {}   # session_id -> max queued frames
+        self._aborting: Dict[str, asyncio.Event] = {}  # aborted on purpose; set once the engine closes it
+        self._overflow_aborts = 0
+        self._background_tasks: set = set()
         self._pending_sessions: Dict[str, asyncio.Future] = {}
         self._pending_commands: Dict[str, asyncio.Future] = {}
         self._session_creation_future: Optional[asyncio.Future] = None
@@ -154,6 +174,7 @@ class InferenceClient(InferenceConnectionMixin, InferenceSessionMixin):
         El mensaje completo se persiste en MemoryManager al recibir op='end',
         incluyendo metadata con el model_id para trazabilidad.
         Si la inferencia es interrumpida, guarda la respuesta parcial con '[INTERRUPTED]'.
+        Tras `interrupt_session` (barge-in) la guarda igual y lanza InferenceInterruptedError.
 
         Raises:
             Exception: Si el engine no está disponible o se excede el timeout (30s/token).
@@ -176,8 +197,8 @@ class InferenceClient(InferenceConnectionMixin, InferenceSessionMixin):
 
         try:
             logger.info(f"{log_prefix} Starting inference...")
-            if session_id not in self._response_queues:
-                self._response_queues[session_id] = asyncio.Queue()
+            await self._settle_abort(session_id)
+            self._open_queue(session_id)
             
             # Using prompt natively for remote inference as Chat formatting happens downstream
             request = {
@@ -226,12 +247,12 @@ class InferenceClient(InferenceConnectionMixin, InferenceSessionMixin):
                             if end_idx > yielded_len:
                                 yielded_len = end_idx
                                 json_str = tool_call_str[len(TOOL_CALL_OPEN):-len(TOOL_CALL_CLOSE)].strip()
-                                try:
-                                    tool_call_data = json.loads(json_str)
+                                tool_call_data = parse_tool_call_json(json_str)
+                                if tool_call_data is not None:
                                     yield {"type": "tool_call", "payload": tool_call_data}
-                                except Exception as e:
-                                    logger.error(f"Failed to parse tool JSON: {e}")
-                                    yield f"\\n[Error parsing tool call: {e}]\\n"
+                                else:
+                                    logger.error(f"{log_prefix} Failed to parse tool JSON: {json_str!r}")
+                                    yield f"\\n[Error parsing tool call: invalid JSON]\\n"
                     else:
                         safe_to_yield = full_text
                         last_lt = full_text.rfind("<")
@@ -245,9 +266,17 @@ class InferenceClient(InferenceConnectionMixin, InferenceSessionMixin):
                             yield chunk
 
                 elif op == "end":
+                    self._clear_abort(session_id)
                     full_text = "".join(response_buffer)
-                    if len(full_text) > yielded_len:
-                        yield full_text[yielded_len:]
+                    pending = full_text[yielded_len:]
+                    # Generation stopped inside an unclosed <tool_call>: try to recover it
+                    if pending.startswith(TOOL_CALL_OPEN) and TOOL_CALL_CLOSE not in pending:
+                        tool_call_data = parse_tool_call_json(pending[len(TOOL_CALL_OPEN):].strip())
+                        if tool_call_data is not None:
+                            yield {"type": "tool_call", "payload": tool_call_data}
+                            pending = ""
+                    if pending:
+                        yield pending
                         
                     if persist_messages:
                         await self.memory_manager.save_message(
@@ -263,26 +292,137 @@ class InferenceClient(InferenceConnectionMixin, InferenceSessionMixin):
                 elif op == "error":
                     error_msg = data.get("error") or data.get("message") or data.get("content") or str(data)
                     raise Exception(error_msg)
+                elif op == "interrupted":
+                    raise InferenceInterruptedError("Inference interrupted by the client")
             
+        except InferenceInterruptedError:
+            logger.info(f"{log_prefix} Inference interrupted by the client.")
+            await self._save_interrupted(
+                log_prefix, response_buffer, conversation_id, user_id, client_id, model_id, persist_messages,
+                mark_error=False,
+            )
+            raise
         except Exception as e:
             logger.error(f"{log_prefix} Inference error: {e}")
-            
-            if response_buffer:
-                logger.info(f"{log_prefix} Saving interrupted response.")
-                partial_response = "".join(response_buffer) + INTERRUPTED_MARKER
-                if persist_messages:
-                    await self.memory_manager.save_message(
-                        conversation_id=conversation_id,
-                        user_id=user_id,
-                        role="assistant",
-                        content=partial_response,
-                        client_id=client_id,
-                        metadata={"model_id": model_id, "interrupted": True} if model_id else {"interrupted": True},
-                    )
-            
-            await self.memory_manager.mark_conversation_error(conversation_id, user_id)
+            await self._save_interrupted(
+                log_prefix, response_buffer, conversation_id, user_id, client_id, model_id, persist_messages
+            )
             raise e
         finally:
-             if session_id in self._response_queues:
-                 del self._response_queues[session_id]
+             self._close_queue(session_id)
              logger.debug(f"{log_prefix} Cleaned up queue.")
+
+    async def infer_raw(
+        self,
+        session_id: str,
+        prompt: str,
+        conversation_id: str,
+        user_id: str,
+        params: Optional[Dict[str, Any]] = None,
+        client_id: int = None,
+        model_id: Optional[str] = None,
+        persist_messages: bool = True,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Variante de `infer` sin herramientas: no busca etiquetas <tool_call> ni
+        re-ensambla el texto por token.
+
+        Yields:
+            str: El contenido de cada frame 'token' del Engine tal y como llegó,
+                 ya escapado para JSON (sin comillas), listo para reenviarse al
+                 cliente sin volver a serializarlo.
+
+        Persistencia y errores igual que en `infer`.
+        """
+        if params is None:
+            params = {"temp": settings.INFERENCE_DEFAULT_TEMP}
+
+        log_prefix = f"[Conv: {conversation_id}][Sess: {session_id}]"
+        response_buffer = []
+
+        try:
+            logger.info(f"{log_prefix} Starting raw inference...")
+            await self._settle_abort(session_id)
+            queue = self._open_queue(session_id)
+            if not self.is_connected:
+                raise Exception("Inference Engine Unavailable")
+
+            await self.websocket.send(json.dumps({
+                "op": "infer",
+                "session_id": session_id,
+                "prompt": prompt,
+                "params": params,
+            }))
+
+            while True:
+                try:
+                    data = await asyncio.wait_for(queue.get(), timeout=settings.INFERENCE_TOKEN_TIMEOUT)
+                except asyncio.TimeoutError:
+                    raise Exception("Inference timed out waiting for token")
+                if data is None:
+                    raise Exception("Stream interrupted")
+
+                op = data.get("op")
+                if op == "token":
+                    content = data.get("content", "")
+                    if content:
+                        response_buffer.append(content)
+                        yield content_literal(data.get("raw"), content)
+                elif op == "end":
+                    self._clear_abort(session_id)
+                    if persist_messages:
+                        await self.memory_manager.save_message(
+                            conversation_id=conversation_id,
+                            user_id=user_id,
+                            role="assistant",
+                            content="".join(response_buffer),
+                            client_id=client_id,
+                            metadata={"model_id": model_id} if model_id else None,
+                        )
+                    logger.info(f"{log_prefix} Raw inference complete (model={model_id!r}).")
+                    break
+                elif op == "error":
+                    error_msg = data.get("error") or data.get("message") or data.get("content") or str(data)
+                    raise Exception(error_msg)
+                elif op == "interrupted":
+                    raise InferenceInterruptedError("Inference interrupted by the client")
+
+        except InferenceInterruptedError:
+            logger.info(f"{log_prefix} Inference interrupted by the client.")
+            await self._save_interrupted(
+                log_prefix, response_buffer, conversation_id, user_id, client_id, model_id, persist_messages,
+                mark_error=False,
+            )
+            raise
+        except Exception as e:
+            logger.error(f"{log_prefix} Inference error: {e}")
+            await self._save_interrupted(
+                log_prefix, response_buffer, conversation_id, user_id, client_id, model_id, persist_messages
+            )
+            raise e
+        finally:
+            self._close_queue(session_id)
+
+    async def _save_interrupted(
+        self, log_prefix: str, response_buffer: List[str], conversation_id: str, user_id: str,
+        client_id, model_id: Optional[str], persist_messages: bool, mark_error: bool = True,
+    ) -> None:
+        """
+        Persiste la respuesta parcial con INTERRUPTED_MARKER y marca la conversación
+        en error (salvo `mark_error=False`: un barge-in del usuario no es un fallo).
+        """
+        if response_buffer:
+            logger.info(f"{log_prefix} Saving interrupted response.")
+            partial_response = "".join(response_buffer) + INTERRUPTED_MARKER
+            if persist_messages:
+                await self.memory_manager.save_message(
+                    conversation_id=conversation_id,
+                    user_id=user_id,
+                    role="assistant",
+                    content=partial_response,
+                    client_id=client_id,
+                    metadata={"model_id": model_id, "interrupted": True} if model_id else {"interrupted": True},
+                )
+
+        if mark_error:
+            await self.memory_manager.mark_conversation_error(conversation_id, user_id)
@@ -190,8 +190,10 @@ class InferenceConnectionMixin:
                 return
 
         # Prioridad 3: error dentro de una sesión de inferencia en curso
+        if self._drop_aborted(session_id, data):
+            return
         if session_id and session_id in self._response_queues:
-            await self._response_queues[session_id].put(data)
+            self._deliver(session_id, data)
         else:
             logger.debug(f"Unrouted error (queue already cleaned): {error_msg} (session_id={session_id!r})")
 
@@ -221,11 +223,129 @@ class InferenceConnectionMixin:
 
     async def _handle_session_token(self, data: dict, session_id: str | None) -> None:
         """Fallback: route token/end/abort messages to the session queue."""
+        if self._drop_aborted(session_id, data):
+            return
         if session_id and session_id in self._response_queues:
-            await self._response_queues[session_id].put(data)
+            self._deliver(session_id, data)
         elif data.get("op") not in ("abort", "end"):
             logger.warning(f"Unhandled message op='{data.get('op')}' session_id={session_id!r}")
 
+    # ---------------------------------------------------------------------------
+    # Per-session queues (bounded; demux never waits on a consumer)
+    # ---------------------------------------------------------------------------
+
+    def _open_queue(self, session_id: str) -> asyncio.Queue:
+        if session_id not in self._response_queues:
+            self._response_queues[session_id] = asyncio.Queue(maxsize=settings.INFERENCE_SESSION_QUEUE_SIZE)
+            self._queue_high_water[session_id] = 0
+        return self._response_queues[session_id]
+
+    def _close_queue(self, session_id: str) -> None:
+        self._response_queues.pop(session_id, None)
+        self._queue_high_water.pop(session_id, None)
+
+    def _deliver(self, session_id: str, data: dict) -> None:
+        """
+        Routes a frame to its session queue without ever waiting.
+
+        A full queue means the consumer of that session is gone or far behind:
+        the session is aborted on the Engine and its consumer gets an error in
+        place of the rest of the stream, so one session never holds up the others.
+        """
+        queue = self._response_queues[session_id]
+        try:
+            queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self._abort_overflowed(session_id, queue)
+            return
+        depth = queue.qsize()
+        if depth > self._queue_high_water.get(session_id, 0):
+            self._queue_high_water[session_id] = depth
+
+    @staticmethod
+    def _push_control(queue: asyncio.Queue, frame: dict) -> None:
+        """Puts a frame generated locally for the consumer, dropping unread frames if there is no room."""
+        try:
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(frame)
+
+    def _abort_overflowed(self, session_id: str, queue: asyncio.Queue) -> None:
+        logger.error(
+            f"Session {session_id} queue overflow ({queue.maxsize} frames unread): aborting session"
+        )
+        self._mark_aborting(session_id)
+        self._overflow_aborts += 1
+        self._push_control(queue, {
+            "op": "error",
+            "session_id": session_id,
+            "error": f"Session queue overflow: more than {queue.maxsize} frames unread",
+        })
+        task = asyncio.create_task(self.abort_session(session_id))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    # ---------------------------------------------------------------------------
+    # Aborted generations (overflow, barge-in)
+    # ---------------------------------------------------------------------------
+
+    def _mark_aborting(self, session_id: str) -> None:
+        """From now on, frames of the current generation of this session are dropped."""
+        self._aborting.setdefault(session_id, asyncio.Event())
+
+    def _drop_aborted(self, session_id: str | None, data: dict) -> bool:
+        """
+        True if the frame belongs to a generation we aborted on purpose.
+
+        Tokens the Engine had already sent are discarded; its closing frame
+        (abort ack, end or error) settles the abort so the session can be reused.
+        """
+        settled = self._aborting.get(session_id) if session_id else None
+        if settled is None:
+            return False
+        if data.get("op") in ("abort", "end", "error"):
+            settled.set()
+            self._aborting.pop(session_id, None)
+        return True
+
+    def _clear_abort(self, session_id: str) -> None:
+        """The generation ended on its own (its `end` was read before the abort took effect): nothing to settle."""
+        settled = self._aborting.pop(session_id, None)
+        if settled is not None:
+            settled.set()
+
+    async def _settle_abort(self, session_id: str) -> None:
+        """
+        Before a new inference on an aborted session: waits (bounded) for the
+        Engine to close the aborted generation, so its late frames are not
+        mistaken for the new answer.
+        """
+        settled = self._aborting.get(session_id)
+        if settled is None:
+            return
+        try:
+            await asyncio.wait_for(settled.wait(), timeout=settings.INFERENCE_ABORT_SETTLE_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"Session {session_id}: no abort ack from the Engine, reusing it anyway")
+        self._aborting.pop(session_id, None)
+
+    def get_queue_stats(self) -> dict:
+        """Depth, high-water mark and capacity of each session queue, plus overflow aborts."""
+        return {
+            "sessions": {
+                session_id: {
+                    "depth": queue.qsize(),
+                    "high_water": self._queue_high_water.get(session_id, 0),
+                    "capacity": queue.maxsize,
+                    "aborting": session_id in self._aborting,
+                }
+                for session_id, queue in self._response_queues.items()
+            },
+            "overflow_aborts": self._overflow_aborts,
+        }
+
     # ---------------------------------------------------------------------------
     # Read loop
     # ---------------------------------------------------------------------------
@@ -259,6 +379,8 @@ class InferenceConnectionMixin:
                     data = json.loads(message)
                     op = data.get("op")
                     session_id = data.get("session_id")
+                    if op == "token":
+                        data["raw"] = message  # lets infer_raw reuse the escaped content as is
 
                     handler = _handlers.get(op, self._handle_session_token)
                     await handler(data, session_id)
@@ -9,3 +9,6 @@ class InferenceEngineBusyError(Exception):
 
 class ModelNotFoundError(Exception):
     """El Engine no encontró el modelo solicitada."""
+
+class InferenceInterruptedError(Exception):
+    """La generación se cortó a petición del cliente (barge-in); el parcial ya está guardado."""
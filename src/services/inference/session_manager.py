@@ -47,10 +47,29 @@ class InferenceSessionMixin:
              except Exception as e:
                  logger.error(f"Failed to abort session {session_id}: {e}")
 
+    async def interrupt_session(self, session_id: str) -> bool:
+        """
+        Barge-in: stops the generation in flight for a session.
+
+        Sends abort to the Engine and wakes the consumer with an 'interrupted'
+        frame, so `infer` saves the partial answer with INTERRUPTED_MARKER and
+        raises InferenceInterruptedError. Late frames of the aborted generation
+        are dropped. Returns False if no inference was in flight.
+        """
+        queue = self._response_queues.get(session_id)
+        if queue is None:
+            return False
+        self._mark_aborting(session_id)
+        self._push_control(queue, {"op": "interrupted", "session_id": session_id})
+        await self.abort_session(session_id)
+        return True
+
     async def close_session(self, session_id: str):
         """
         Closes and frees the session from the InferenceCenter.
         """
+        self._aborting.pop(session_id, None)
+        self._queue_high_water.pop(session_id, None)
         if self.is_connected:
              try:
                  await self.websocket.send(json.dumps({
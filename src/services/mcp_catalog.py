@@ -0,0 +1,116 @@
+"""
+mcp_catalog.py
+~~~~~~~~~~~~~~
+Snapshots en disco del catálogo de tools de cada servidor MCP.
+
+Al arrancar, las tools MCP se registran desde el último snapshot sin esperar
+al handshake del servidor; la conexión real se abre en segundo plano. Cada
+snapshot guarda un hash del catálogo (``version``) y la identidad que el
+servidor anunció en ``initialize`` (``server_version``): el catálogo solo se
+vuelve a pedir cuando esa identidad cambia o el servidor notifica
+``tools/list_changed``.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def catalog_version(tools: List[Dict[str, Any]]) -> str:
+    """Hash estable del catálogo (independiente del orden de tools y claves)."""
+    canonical = json.dumps(sorted(tools, key=lambda t: t["name"]), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def tools_from_listing(listing: Any) -> List[Dict[str, Any]]:
+    """Convierte un ``ListToolsResult`` de MCP en dicts serializables."""
+    return [
+        {
+            "name": mcp_tool.name,
+            "description": mcp_tool.description,
+            "inputSchema": mcp_tool.inputSchema,
+        }
+        for mcp_tool in listing.tools
+    ]
+
+
+@dataclass
+class CatalogSnapshot:
+    """Catálogo de un servidor MCP tal y como se guarda en disco.
+
+    Attributes:
+        server_name:    Nombre con el que el orquestador registra el servidor.
+        tools:          Tools del servidor (``name``, ``description``, ``inputSchema``).
+        server_version: ``serverInfo`` anunciado en el handshake ("name/version").
+        version:        Hash del catálogo; se calcula a partir de ``tools`` si se omite.
+        saved_at:       Epoch del último guardado.
+    """
+    server_name: str
+    tools: List[Dict[str, Any]]
+    server_version: Optional[str] = None
+    version: str = ""
+    saved_at: float = field(default_factory=time.time)
+
+    def __post_init__(self):
+        if not self.version:
+            self.version = catalog_version(self.tools)
+
+
+class MCPCatalogStore:
+    """Lee y escribe un snapshot JSON por servidor en ``directory``."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, server_name: str) -> str:
+        return os.path.join(self.directory, f"{_UNSAFE_CHARS.sub('_', server_name)}.json")
+
+    def load(self, server_name: str) -> Optional[CatalogSnapshot]:
+        """Devuelve el snapshot guardado, o None si no existe o está corrupto."""
+        path = self.path(server_name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            snapshot = CatalogSnapshot(
+                server_name=server_name,
+                tools=data["tools"],
+                server_version=data.get("server_version"),
+                saved_at=data.get("saved_at", 0.0),
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable MCP catalog snapshot {path}: {e}")
+            return None
+        if data.get("version") != snapshot.version:
+            logger.warning(f"Ignoring MCP catalog snapshot {path}: version hash mismatch")
+            return None
+        return snapshot
+
+    def save(self, snapshot: CatalogSnapshot) -> None:
+        """Escribe el snapshot de forma atómica (fichero temporal + rename)."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(snapshot.server_name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "server_name": snapshot.server_name,
+                    "server_version": snapshot.server_version,
+                    "version": snapshot.version,
+                    "saved_at": snapshot.saved_at,
+                    "tools": snapshot.tools,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        os.replace(tmp_path, path)
@@ -1,28 +1,296 @@
 import asyncio
 import sys
-from typing import Dict, Any, List, Optional
-from mcp import ClientSession, StdioServerParameters
+from typing import Callable, Dict, Any, List, Optional, Set
+from mcp import ClientSession, StdioServerParameters, types
 from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
 
-from src.core.tool_manager import ToolManager, tool_manager
+from src.core.config import settings
+from src.core.tool_cache import CachePolicy
+from src.core.tool_manager import ROLE_PUBLIC, ToolManager, tool_manager
+from src.services.mcp_catalog import CatalogSnapshot, MCPCatalogStore, catalog_version, tools_from_listing
+
+
+class MCPConnection:
+    """
+    One stdio child process and its ClientSession.
+
+    The stdio/session context managers are entered and exited by a dedicated
+    task (anyio cancel scopes must be closed by the task that opened them), so
+    connections can be opened concurrently and closed from anywhere.
+    """
+
+    def __init__(
+        self,
+        server_name: str,
+        params: StdioServerParameters,
+        index: int,
+        on_message: Optional[Callable[[Any], None]] = None,
+    ):
+        self.server_name = server_name
+        self.params = params
+        self.index = index
+        self.on_message = on_message
+        self.session: Optional[ClientSession] = None
+        self.server_info: Optional[types.Implementation] = None
+        self.in_flight = 0
+        self._task: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Future] = None
+        self._closing = asyncio.Event()
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def open(self, timeout: float) -> None:
+        self._ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(), name=f"mcp-{self.server_name}-{self.index}")
+        try:
+            await asyncio.wait_for(asyncio.shield(self._ready), timeout)
+        except BaseException:
+            await self.close()
+            raise
+
+    async def _run(self) -> None:
+        try:
+            async with stdio_client(self.params) as (read, write):
+                async with ClientSession(read, write, message_handler=self._handle_message) as session:
+                    result = await session.initialize()
+                    self.server_info = result.serverInfo
+                    self.session = session
+                    self._ready.set_result(None)
+                    await self._closing.wait()
+        except Exception as e:
+            if not self._ready.done():
+                self._ready.set_exception(e)
+            else:
+                print(f"MCP connection {self.server_name}#{self.index} ended: {e}", file=sys.stderr)
+        finally:
+            self.session = None
+
+    async def _handle_message(self, message: Any) -> None:
+        if self.on_message is not None:
+            self.on_message(message)
+
+    async def close(self) -> None:
+        self._closing.set()
+        if self._task is not None and not self._task.done():
+            try:
+                await asyncio.wait_for(self._task, timeout=5.0)
+            except (asyncio.TimeoutError, asyncio.CancelledError, Exception):
+                self._task.cancel()
+        self.session = None
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """True when the session itself is unusable (process died, pipe closed...)."""
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    # Protocol-level failures surface as McpError; anything else comes from the transport
+    return True
+
+
+class MCPServerUnavailableError(RuntimeError):
+    """No live session of an MCP server (it is being reconnected in the background)."""
+
+
+class MCPServerPool:
+    """
+    Pool of sessions (child processes) for one MCP server.
+
+    Calls go to the live session with the fewest calls in flight, so a slow call
+    does not serialise every other call through a single stdio pipe. Missing or
+    dead sessions are reopened by one background task with exponential backoff
+    (MCP_RECONNECT_BACKOFF); calls are never held behind it while a session is
+    live, and fail with MCPServerUnavailableError when none is. The server's
+    tool catalog is cached after the first ``list_tools`` until the server sends
+    ``tools/list_changed`` (then ``on_tools_changed`` is called).
+    """
+
+    def __init__(self, server_name: str, params: StdioServerParameters, size: int):
+        self.server_name = server_name
+        self.params = params
+        self.size = max(1, size)
+        self._connections: List[MCPConnection] = []
+        self._next_index = 0
+        self._lock = asyncio.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._attempt: Optional[asyncio.Future] = None   # resolved when the running (re)connect attempt ends
+        self._catalog = None
+        self.server_version: Optional[str] = None   # serverInfo from the last handshake ("name/version")
+        self.on_tools_changed: Optional[Callable[[], None]] = None
+
+    @property
+    def live_sessions(self) -> int:
+        return sum(1 for conn in self._connections if conn.alive)
+
+    async def _open_connection(self) -> MCPConnection:
+        conn = MCPConnection(self.server_name, self.params, self._next_index, on_message=self._on_message)
+        self._next_index += 1
+        await conn.open(settings.MCP_CONNECT_TIMEOUT)
+        if conn.server_info is not None:
+            self.server_version = f"{conn.server_info.name}/{conn.server_info.version}"
+        return conn
+
+    def _on_message(self, message: Any) -> None:
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ToolListChangedNotification
+        ):
+            self._catalog = None
+            if self.on_tools_changed is not None:
+                self.on_tools_changed()
+
+    async def start(self) -> None:
+        """Opens the missing sessions concurrently; fails only if none can be opened."""
+        async with self._lock:
+            self._connections = [conn for conn in self._connections if conn.alive]
+            missing = self.size - len(self._connections)
+            if missing <= 0:
+                return
+            results = await asyncio.gather(
+                *(self._open_connection() for _ in range(missing)), return_exceptions=True
+            )
+            errors = [r for r in results if isinstance(r, BaseException)]
+            self._connections.extend(r for r in results if isinstance(r, MCPConnection))
+            if errors:
+                print(
+                    f"MCP server '{self.server_name}': {len(errors)}/{missing} sessions failed to start: {errors[0]}",
+                    file=sys.stderr,
+                )
+            if not self._connections:
+                raise RuntimeError(f"Could not connect to MCP server {self.server_name}: {errors[0]}")
+
+    def _reconnect(self) -> None:
+        """Starts the background reconnect task unless it is already running."""
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._attempt = asyncio.get_running_loop().create_future()
+            self._reconnect_task = asyncio.create_task(
+                self._reconnect_loop(), name=f"mcp-{self.server_name}-reconnect"
+            )
+
+    async def _reconnect_loop(self) -> None:
+        delay = settings.MCP_RECONNECT_BACKOFF
+        while True:
+            try:
+                await self.start()
+            except Exception as e:
+                print(f"MCP server '{self.server_name}': reconnect failed: {e}", file=sys.stderr)
+            finally:
+                attempt, self._attempt = self._attempt, None
+                if attempt is not None and not attempt.done():
+                    attempt.set_result(None)
+            if self.live_sessions >= self.size:
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.MCP_RECONNECT_BACKOFF_MAX)
+            self._attempt = asyncio.get_running_loop().create_future()
+
+    async def _acquire(self) -> MCPConnection:
+        if self.live_sessions < self.size:
+            self._reconnect()
+            if not self.live_sessions and self._attempt is not None:
+                # First use (lazy pool) or every session died: wait for the attempt in
+                # progress, but not through the backoff between attempts
+                await asyncio.shield(self._attempt)
+        live = [conn for conn in self._connections if conn.alive]
+        if not live:
+            raise MCPServerUnavailableError(
+                f"MCP server '{self.server_name}' is unavailable (no live sessions, reconnecting in the background)."
+            )
+        return min(live, key=lambda conn: conn.in_flight)
+
+    async def _discard(self, conn: MCPConnection) -> None:
+        if conn in self._connections:
+            self._connections.remove(conn)
+        await conn.close()
+        self._reconnect()
+
+    async def _request(self, method: str, *args, retry: bool = False, **kwargs):
+        """Runs a session method on the least-loaded session.
+
+        A dead session is discarded (the next call reconnects). Only idempotent
+        requests (retry=True) are replayed on a fresh session: a tool call may
+        already have had side effects when its session died.
+        """
+        for attempt in range(2 if retry else 1):
+            conn = await self._acquire()
+            conn.in_flight += 1
+            try:
+                return await getattr(conn.session, method)(*args, **kwargs)
+            except Exception as e:
+                if conn.alive and not _is_connection_error(e):
+                    raise
+                print(
+                    f"MCP session {self.server_name}#{conn.index} is dead ({e}), reconnecting",
+                    file=sys.stderr,
+                )
+                await self._discard(conn)
+                if not retry or attempt:
+                    raise
+            finally:
+                conn.in_flight -= 1
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]):
+        return await self._request("call_tool", name, arguments=arguments)
+
+    async def list_tools(self, refresh: bool = False):
+        """Returns the server's tool catalog, cached after the first call."""
+        if self._catalog is None or refresh:
+            self._catalog = await self._request("list_tools", retry=True)
+        return self._catalog
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "live_sessions": self.live_sessions,
+            "in_flight": sum(conn.in_flight for conn in self._connections),
+            "sessions_opened": self._next_index,
+            "reconnecting": self._reconnect_task is not None and not self._reconnect_task.done(),
+        }
+
+    async def close(self) -> None:
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            await asyncio.gather(self._reconnect_task, return_exceptions=True)
+        connections, self._connections = self._connections, []
+        await asyncio.gather(*(conn.close() for conn in connections), return_exceptions=True)
 
 
 class MCPClientManager:
     """
     Manages connections to MCP (Model Context Protocol) servers and registers
     their available tools with the JotaOrchestrator ToolManager.
+
+    Registered catalogs are snapshotted to disk (see mcp_catalog), so that
+    ``start_stdio_server`` can register a server's tools before its handshake.
     """
 
-    def __init__(self):
-        self._sessions: Dict[str, ClientSession] = {}
-        # Keep references to the stdio contexts to keep them alive
-        self._stdio_contexts: Dict[str, Any] = {}
+    def __init__(self, catalog_store: Optional[MCPCatalogStore] = None):
+        self._pools: Dict[str, MCPServerPool] = {}
+        self._catalog_store = catalog_store or MCPCatalogStore(settings.MCP_CATALOG_DIR)
+        # server_name → {"tm", "required_role", "cache_policies", "tools", "version", "server_version"}
+        self._registrations: Dict[str, Dict[str, Any]] = {}
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        self._refresh_pending: Set[str] = set()
+        self._background: Set[asyncio.Task] = set()
 
-    async def connect_stdio_server(self, server_name: str, command: str, args: List[str] = None, env: Dict[str, str] = None) -> None:
+    async def connect_stdio_server(
+        self,
+        server_name: str,
+        command: str,
+        args: List[str] = None,
+        env: Dict[str, str] = None,
+        pool_size: Optional[int] = None,
+        lazy: bool = False,
+    ) -> None:
         """
         Connects to an MCP server using standard input/output (stdio).
+
+        pool_size sessions (child processes, default MCP_POOL_SIZE) are opened
+        concurrently. With lazy=True nothing is spawned until the first call.
         """
-        if server_name in self._sessions:
+        if server_name in self._pools:
             print(f"Warning: Already connected to MCP server '{server_name}'.")
             return
 
@@ -31,82 +299,236 @@ class MCPClientManager:
             args=args or [],
             env=env
         )
+        pool = MCPServerPool(server_name, server_params, pool_size or settings.MCP_POOL_SIZE)
+        pool.on_tools_changed = lambda: self._schedule_refresh(server_name)
+        self._pools[server_name] = pool
+        if lazy:
+            return
 
         try:
-            # We must manage the context managers properly in async code
-            stdio_ctx = stdio_client(server_params)
-            read, write = await stdio_ctx.__aenter__()
-            self._stdio_contexts[server_name] = stdio_ctx
-            
-            session = ClientSession(read, write)
-            await session.__aenter__()
-            self._sessions[server_name] = session
-            
-            # Initialize the connection
-            await session.initialize()
-            print(f"Successfully connected to MCP server '{server_name}' via stdio.")
-
+            await pool.start()
+            print(f"Successfully connected to MCP server '{server_name}' via stdio ({pool.live_sessions} sessions).")
         except Exception as e:
             print(f"Failed to connect to MCP server '{server_name}': {e}", file=sys.stderr)
-            # Cleanup on failure
-            if server_name in self._stdio_contexts:
-                try:
-                    await self._stdio_contexts[server_name].__aexit__(None, None, None)
-                except Exception:
-                    pass
-                del self._stdio_contexts[server_name]
+            del self._pools[server_name]
             raise RuntimeError(f"Could not connect to MCP server {server_name}: {e}")
 
+    async def connect_servers(self, servers: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[Exception]]:
+        """
+        Connects several stdio servers concurrently.
+
+        servers maps server_name to connect_stdio_server keyword arguments
+        (command, args, env, pool_size, lazy). Returns server_name → error (None on success).
+        """
+        names = list(servers)
+        results = await asyncio.gather(
+            *(self.connect_stdio_server(name, **servers[name]) for name in names),
+            return_exceptions=True,
+        )
+        return {name: (r if isinstance(r, Exception) else None) for name, r in zip(names, results)}
+
+    async def start_stdio_server(
+        self,
+        server_name: str,
+        command: str,
+        args: List[str] = None,
+        env: Dict[str, str] = None,
+        pool_size: Optional[int] = None,
+        tm: ToolManager = tool_manager,
+        cache_policies: Optional[Dict[str, CachePolicy]] = None,
+        required_role: str = ROLE_PUBLIC,
+    ) -> bool:
+        """
+        Connects a stdio server and registers its tools, using the catalog snapshot when there is one.
+
+        With a snapshot the tools are registered immediately and the sessions
+        are opened in the background; the catalog is only fetched again if the
+        server reports a different identity in its handshake or sends
+        ``tools/list_changed``. Without one this is connect + register_mcp_tools.
+
+        Returns True when the tools were registered from the snapshot.
+        """
+        snapshot = self._catalog_store.load(server_name)
+        if snapshot is None:
+            await self.connect_stdio_server(server_name, command, args, env, pool_size)
+            await self.register_mcp_tools(server_name, tm, cache_policies, required_role)
+            return False
+
+        await self.connect_stdio_server(server_name, command, args, env, pool_size, lazy=True)
+        self._registrations[server_name] = {
+            "tm": tm,
+            "required_role": required_role,
+            "cache_policies": cache_policies or {},
+            "tools": set(),
+            "version": None,
+            "server_version": snapshot.server_version,
+        }
+        self._apply_catalog(server_name, snapshot.tools)
+        print(f"Registered {len(snapshot.tools)} MCP tools for '{server_name}' from snapshot {snapshot.version}.")
+
+        task = asyncio.create_task(self._revalidate(server_name))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return True
+
+    async def start_servers(self, servers: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[Exception]]:
+        """
+        Starts several stdio servers concurrently (see start_stdio_server).
+
+        servers maps server_name to start_stdio_server keyword arguments
+        (command, args, env, pool_size, required_role). Returns server_name → error (None on success).
+        """
+        names = list(servers)
+        results = await asyncio.gather(
+            *(self.start_stdio_server(name, **servers[name]) for name in names),
+            return_exceptions=True,
+        )
+        return {name: (r if isinstance(r, Exception) else None) for name, r in zip(names, results)}
 
-    async def register_mcp_tools(self, server_name: str, tm: ToolManager = tool_manager) -> None:
+    async def register_mcp_tools(
+        self,
+        server_name: str,
+        tm: ToolManager = tool_manager,
+        cache_policies: Optional[Dict[str, CachePolicy]] = None,
+        required_role: str = ROLE_PUBLIC,
+    ) -> None:
         """
         Queries the MCP server for available tools and registers wrapper functions
         in the provided ToolManager that proxy execution to the server.
+
+        cache_policies maps MCP tool names (as reported by the server, without the
+        server prefix) to a CachePolicy, opting those proxies into result caching.
+        required_role gates every tool of the server, as for decorator tools.
+        The catalog is snapshotted to disk for the next startup.
         """
-        if server_name not in self._sessions:
+        if server_name not in self._pools:
             raise ValueError(f"Not connected to MCP server '{server_name}'.")
 
-        session = self._sessions[server_name]
-        
+        pool = self._pools[server_name]
+
         try:
-            tools_response = await session.list_tools()
+            tools_response = await pool.list_tools()
         except Exception as e:
             print(f"Failed to list tools from MCP server '{server_name}': {e}", file=sys.stderr)
             raise RuntimeError(f"Could not list tools from {server_name}: {e}")
 
-        for mcp_tool in tools_response.tools:
-            # Reconstruct the JSON schema format expected by the Orchestrator
-            tool_name = f"{server_name}_{mcp_tool.name}"
-            description = mcp_tool.description or f"MCP tool from {server_name}"
-            # The MCP tool inputSchema should already be a JSON schema object
-            input_schema = mcp_tool.inputSchema
-            
-            # Create a proxy async function for the ToolManager wrapper
-            # We use a closure factory to capture the values properly
-            proxy_func = self._create_proxy_function(server_name, mcp_tool.name, tool_name, description)
-            
-            # Register manually with the ToolManager to bypass the @tool decorator's inspection
-            # since the function signature doesn't match the dynamic schema
-            tm._tools[tool_name] = proxy_func
-            tm._schemas[tool_name] = {
-                "name": tool_name,
-                "description": description,
-                "parameters": input_schema
-            }
+        tools = tools_from_listing(tools_response)
+        self._registrations[server_name] = {
+            "tm": tm,
+            "required_role": required_role,
+            "cache_policies": cache_policies or {},
+            "tools": set(),
+            "version": None,
+            "server_version": None,
+        }
+        self._apply_catalog(server_name, tools)
+        self._save_snapshot(server_name, tools)
+
+    async def refresh_catalog(self, server_name: str) -> bool:
+        """
+        Fetches the server's catalog again and re-registers its tools if it changed.
+
+        Tools that disappeared from the server are unregistered. Returns True
+        when the catalog version changed.
+        """
+        registration = self._registrations.get(server_name)
+        if registration is None or server_name not in self._pools:
+            raise ValueError(f"No tools registered for MCP server '{server_name}'.")
+
+        pool = self._pools[server_name]
+        tools = tools_from_listing(await pool.list_tools(refresh=True))
+        changed = catalog_version(tools) != registration["version"]
+        if changed:
+            self._apply_catalog(server_name, tools)
+            print(f"MCP catalog of '{server_name}' changed (version {registration['version']}).")
+        if changed or pool.server_version != registration["server_version"]:
+            self._save_snapshot(server_name, tools)
+        return changed
+
+    def _apply_catalog(self, server_name: str, tools: List[Dict[str, Any]]) -> None:
+        """Registers one proxy per catalog entry and drops tools no longer offered."""
+        registration = self._registrations[server_name]
+        tm: ToolManager = registration["tm"]
+        registered = set()
+        for mcp_tool in tools:
+            tool_name = f"{server_name}_{mcp_tool['name']}"
+            description = mcp_tool.get("description") or f"MCP tool from {server_name}"
+            proxy_func = self._create_proxy_function(server_name, mcp_tool["name"], tool_name, description)
+            # The MCP inputSchema is already a JSON schema object: register it as given
+            tm.register_external(
+                tool_name,
+                proxy_func,
+                description,
+                mcp_tool.get("inputSchema"),
+                required_role=registration["required_role"],
+                cache=registration["cache_policies"].get(mcp_tool["name"]),
+            )
+            registered.add(tool_name)
             print(f"Registered MCP tool: {tool_name}")
 
+        for stale in registration["tools"] - registered:
+            tm.unregister(stale)
+            print(f"Unregistered MCP tool: {stale}")
+        registration["tools"] = registered
+        registration["version"] = catalog_version(tools)
+
+    def _save_snapshot(self, server_name: str, tools: List[Dict[str, Any]]) -> None:
+        server_version = self._pools[server_name].server_version
+        try:
+            self._catalog_store.save(CatalogSnapshot(server_name, tools, server_version=server_version))
+            self._registrations[server_name]["server_version"] = server_version
+        except OSError as e:
+            print(f"Could not save MCP catalog snapshot for '{server_name}': {e}", file=sys.stderr)
+
+    async def _revalidate(self, server_name: str) -> None:
+        """Background startup step: opens the sessions and refreshes the catalog only if the server changed."""
+        pool = self._pools.get(server_name)
+        if pool is None:
+            return
+        try:
+            await pool.start()
+            if pool.server_version != self._registrations[server_name]["server_version"]:
+                print(f"MCP server '{server_name}' is now {pool.server_version}, refreshing its catalog.")
+                await self.refresh_catalog(server_name)
+        except Exception as e:
+            print(
+                f"Background connection to MCP server '{server_name}' failed: {e} "
+                f"(serving the snapshot catalog, will retry on first call)",
+                file=sys.stderr,
+            )
+
+    def _schedule_refresh(self, server_name: str) -> None:
+        """Coalesces ``tools/list_changed`` notifications (one per session) into serial refreshes."""
+        if server_name not in self._registrations:
+            return
+        task = self._refresh_tasks.get(server_name)
+        if task is not None and not task.done():
+            self._refresh_pending.add(server_name)
+            return
+        self._refresh_tasks[server_name] = asyncio.create_task(self._refresh_loop(server_name))
+
+    async def _refresh_loop(self, server_name: str) -> None:
+        while True:
+            self._refresh_pending.discard(server_name)
+            try:
+                await self.refresh_catalog(server_name)
+            except Exception as e:
+                print(f"Failed to refresh MCP catalog of '{server_name}': {e}", file=sys.stderr)
+            if server_name not in self._refresh_pending:
+                return
+
     def _create_proxy_function(self, server_name: str, mcp_tool_name: str, registered_name: str, description: str):
         """Creates a proxy function that calls the MCP server tool."""
-        
+
         async def proxy_wrapper(**kwargs):
-            if server_name not in self._sessions:
+            if server_name not in self._pools:
                 raise RuntimeError(f"Connection to MCP server '{server_name}' was lost.")
-            
-            session = self._sessions[server_name]
+
+            pool = self._pools[server_name]
             try:
                 # kwargs represent the tool arguments required by the input_schema
-                result = await session.call_tool(mcp_tool_name, arguments=kwargs)
-                
+                result = await pool.call_tool(mcp_tool_name, arguments=kwargs)
+
                 # Format the result nicely (MCP tools return specific content types)
                 formatted_result = []
                 for content in result.content:
@@ -116,33 +538,40 @@ class MCPClientManager:
                         formatted_result.append(f"[Image Data: {content.mimeType}]") # Basic placeholder
                     else:
                          formatted_result.append(str(content))
-                
+
                 return "\n".join(formatted_result) if formatted_result else "Tool executed successfully (no content returned)."
-                
+
             except Exception as e:
                 raise RuntimeError(f"Execution of MCP tool '{registered_name}' failed: {e}")
-                
+
         # Give it a helpful name internally and docstring
         proxy_wrapper.__name__ = registered_name
         proxy_wrapper.__doc__ = description
         return proxy_wrapper
 
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-server pool size, live sessions, calls in flight and registered catalog version."""
+        return {
+            name: {**pool.get_stats(), "catalog_version": self._registrations.get(name, {}).get("version")}
+            for name, pool in self._pools.items()
+        }
+
     async def close_all(self):
         """Closes all active MCP sessions."""
-        for name, session in list(self._sessions.items()):
+        tasks = [*self._background, *self._refresh_tasks.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refresh_tasks.clear()
+        self._refresh_pending.clear()
+        for name, pool in list(self._pools.items()):
             try:
-                await session.__aexit__(None, None, None)
+                await pool.close()
             except Exception as e:
-                print(f"Error closing session for '{name}': {e}", file=sys.stderr)
-            
-        for name, ctx in list(self._stdio_contexts.items()):
-            try:
-                await ctx.__aexit__(None, None, None)
-            except Exception as e:
-                print(f"Error closing context for '{name}': {e}", file=sys.stderr)
-                
-        self._sessions.clear()
-        self._stdio_contexts.clear()
+                print(f"Error closing sessions for '{name}': {e}", file=sys.stderr)
+
+        self._pools.clear()
+        self._registrations.clear()
 
 # Global instance
 mcp_manager = MCPClientManager()
@@ -5,18 +5,48 @@ MQTTService: connects to Mosquitto broker, subscribes to voice transcription
 topic, routes each message through JotaController (stateless), and publishes
 the response back to a per-client topic.
 
-Message format (subscribe):  {"client_id": "...", "text": "..."}
-Response format (publish):   {"client_id": "...", "text": "..."}
+Message format (subscribe):  {"client_id": "...", "text": "...", "ts": <epoch s, opcional>}
+Response format (publish):   {"client_id": "...", "text": "...", "seq": n, "final": bool}
 Response topic:              {MQTT_RESPONSE_TOPIC_PREFIX}/{client_id}
+
+Con MQTT_STREAM_SENTENCES (por defecto) la respuesta se publica frase a frase
+según se genera (seq 0, 1, ...) para que el dispositivo empiece a hablar con
+la primera frase, y termina con un mensaje {"text": "", "final": true}. Sin él
+se publica un único mensaje con la respuesta completa (seq 0, final true).
+
+Los mensajes no se procesan en tareas sueltas: entran en una cola acotada
+(MQTT_QUEUE_SIZE) que consumen MQTT_WORKERS workers. Los comandos de un mismo
+dispositivo se procesan en orden y de uno en uno; los que llevan más de
+MQTT_MAX_COMMAND_AGE segundos esperando se descartan sin inferencia, y con la
+cola llena se descarta el comando más antiguo.
+
+Varias réplicas del orquestador pueden compartir la entrada de voz:
+  - MQTT_SHARED_GROUP: suscripción compartida ($share/<grupo>/<topic>); el broker
+    reparte cada comando a una sola réplica.
+  - MQTT_REPLICA_COUNT/MQTT_REPLICA_INDEX (afinidad por dispositivo): todas las
+    réplicas reciben todo y cada una atiende solo los dispositivos cuyo
+    crc32(client_id) % count coincide con su índice, así que los comandos de un
+    dispositivo siempre los procesa la misma réplica, en orden.
+El client id de MQTT lleva un sufijo por réplica (MQTT_UNIQUE_CLIENT_ID) para que
+dos instancias no se expulsen mutuamente del broker.
 """
 import asyncio
 import json
 import logging
+import os
+import socket
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Deque, Dict, List, Optional, Set
 from uuid import uuid4
 
 import aiomqtt
 
 from src.core.config import settings
+from src.core.intents import intent_matcher
+from src.utils.sentence_chunker import SentenceChunker
 
 logger = logging.getLogger(__name__)
 
@@ -24,14 +54,74 @@ _RECONNECT_BASE_DELAY = 2.0   # seconds
 _RECONNECT_MAX_DELAY = 60.0   # seconds
 
 
+@dataclass
+class _Command:
+    client_id: str
+    text: str
+    issued_at: float                     # device timestamp if sent, else reception time (epoch s)
+    received_at: float = field(default_factory=time.monotonic)
+
+
+def shared_topic(topic: str, group: Optional[str]) -> str:
+    """Topic filter for a shared subscription (plain topic when no group is set)."""
+    return f"$share/{group}/{topic}" if group else topic
+
+
+def replica_client_id(base: str) -> str:
+    """Per-process MQTT client id: brokers disconnect an existing session that reuses an id."""
+    return f"{base}-{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:6]}"
+
+
 class MQTTService:
-    def __init__(self, inference_client, jota_controller):
+    def __init__(
+        self,
+        inference_client,
+        jota_controller,
+        replica_index: Optional[int] = None,
+        replica_count: Optional[int] = None,
+    ):
         self._inference_client = inference_client
         self._controller = jota_controller
+        self.replica_count = max(1, replica_count or settings.MQTT_REPLICA_COUNT)
+        self.replica_index = (settings.MQTT_REPLICA_INDEX if replica_index is None else replica_index)
+        if not 0 <= self.replica_index < self.replica_count:
+            raise ValueError(f"MQTT replica index {self.replica_index} out of range for {self.replica_count} replicas")
+        self.client_id = (
+            replica_client_id(settings.MQTT_CLIENT_ID) if settings.MQTT_UNIQUE_CLIENT_ID else settings.MQTT_CLIENT_ID
+        )
         self._task: asyncio.Task | None = None
+        self._client: aiomqtt.Client | None = None
+        self._workers: List[asyncio.Task] = []
+        # Per-device FIFO queues; a device id is in _ready while it has work and no active worker
+        self._pending: Dict[str, Deque[_Command]] = {}
+        self._active: Set[str] = set()
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._depth = 0
+        self._stats: Dict[str, float] = {
+            "received": 0, "processed": 0, "failed": 0, "invalid": 0,
+            "expired": 0, "dropped": 0, "max_depth": 0, "not_owned": 0,
+            "wait_ms": 0.0, "processing_ms": 0.0, "max_processing_ms": 0.0, "first_chunk_ms": 0.0,
+        }
+
+    def owns_device(self, client_id: str) -> bool:
+        """Per-device affinity: whether this replica serves the device (always, with one replica)."""
+        if self.replica_count == 1:
+            return True
+        return zlib.crc32(client_id.encode("utf-8")) % self.replica_count == self.replica_index
+
+    def subscription_topic(self) -> str:
+        if settings.MQTT_SHARED_GROUP and self.replica_count > 1:
+            # Affinity needs every replica to see every command; a shared group would split them
+            logger.warning("MQTT: MQTT_SHARED_GROUP ignored because per-device affinity is enabled")
+            return settings.MQTT_SUBSCRIBE_TOPIC
+        return shared_topic(settings.MQTT_SUBSCRIBE_TOPIC, settings.MQTT_SHARED_GROUP)
 
     async def connect(self) -> None:
-        """Start background MQTT listener loop."""
+        """Start the worker pool and the background MQTT listener loop."""
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"mqtt-worker-{i}")
+            for i in range(max(1, settings.MQTT_WORKERS))
+        ]
         self._task = asyncio.create_task(self._listen_loop())
 
     async def _listen_loop(self) -> None:
@@ -44,18 +134,24 @@ class MQTTService:
                     port=settings.MQTT_BROKER_PORT,
                     username=settings.MQTT_USERNAME,
                     password=settings.MQTT_PASSWORD,
-                    identifier=settings.MQTT_CLIENT_ID,
+                    identifier=self.client_id,
                     keepalive=settings.MQTT_KEEPALIVE,
                 ) as client:
+                    self._client = client
                     delay = _RECONNECT_BASE_DELAY  # reset on successful connect
                     logger.info(
-                        f"MQTT connected — broker={settings.MQTT_BROKER_HOST}:{settings.MQTT_BROKER_PORT}"
+                        f"MQTT connected — broker={settings.MQTT_BROKER_HOST}:{settings.MQTT_BROKER_PORT} "
+                        f"client_id={self.client_id!r}"
+                    )
+                    topic = self.subscription_topic()
+                    await client.subscribe(topic, qos=settings.MQTT_QOS)
+                    logger.info(
+                        f"MQTT subscribed to '{topic}' "
+                        f"(replica {self.replica_index + 1}/{self.replica_count})"
                     )
-                    await client.subscribe(settings.MQTT_SUBSCRIBE_TOPIC, qos=settings.MQTT_QOS)
-                    logger.info(f"MQTT subscribed to '{settings.MQTT_SUBSCRIBE_TOPIC}'")
 
                     async for message in client.messages:
-                        asyncio.create_task(self._handle_message(client, message))
+                        self._enqueue_message(message)
 
             except aiomqtt.MqttError as e:
                 logger.warning(f"MQTT disconnected: {e}. Reconnecting in {delay:.0f}s...")
@@ -65,29 +161,163 @@ class MQTTService:
                 logger.info("MQTT listener loop cancelled.")
                 raise
 
-    async def _handle_message(self, client: aiomqtt.Client, message) -> None:
-        """Parse JSON payload, call controller, publish response."""
+    # ------------------------------------------------------------------
+    # Bounded, per-device ordered dispatch
+    # ------------------------------------------------------------------
+    def _enqueue_message(self, message) -> None:
+        """Parses an incoming message and queues it for its device (never blocks the listener)."""
         try:
             data = json.loads(message.payload)
             client_id = data["client_id"]
             text = data["text"]
-        except (json.JSONDecodeError, KeyError, TypeError):
+            issued_at = float(data.get("ts") or time.time())
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            self._stats["invalid"] += 1
             logger.warning(f"MQTT: Invalid message on {message.topic}: {message.payload!r}")
             return
+        if not self.owns_device(client_id):
+            self._stats["not_owned"] += 1
+            return  # another replica serves this device
 
         logger.info(f"MQTT: Received from client_id={client_id!r}: {text!r}")
-        response_text = await self._process(client_id, text)
+        self._stats["received"] += 1
+        if self._depth >= max(1, settings.MQTT_QUEUE_SIZE):
+            self._drop_oldest()
+
+        queue = self._pending.setdefault(client_id, deque())
+        queue.append(_Command(client_id, text, issued_at))
+        self._depth += 1
+        self._stats["max_depth"] = max(self._stats["max_depth"], self._depth)
+        if len(queue) == 1 and client_id not in self._active:
+            self._ready.put_nowait(client_id)
+
+    def _drop_oldest(self) -> None:
+        """Queue full: a voice command that waited longest is the least useful one to keep."""
+        client_id = min(
+            (device for device, queue in self._pending.items() if queue),
+            key=lambda device: self._pending[device][0].received_at,
+            default=None,
+        )
+        if client_id is None:
+            return  # every queued command is already being handled
+        dropped = self._pending[client_id].popleft()
+        self._depth -= 1
+        if not self._pending[client_id] and client_id not in self._active:
+            del self._pending[client_id]
+        self._stats["dropped"] += 1
+        logger.warning(f"MQTT: Queue full, dropped command from {client_id!r}: {dropped.text!r}")
+
+    async def _worker(self) -> None:
+        while True:
+            client_id = await self._ready.get()
+            queue = self._pending.get(client_id)
+            if client_id in self._active or not queue:
+                # Stale ready entry (command dropped, or device already being served)
+                if queue is not None and not queue and client_id not in self._active:
+                    del self._pending[client_id]
+                continue
+            command = queue.popleft()
+            self._depth -= 1
+            self._active.add(client_id)
+            try:
+                await self._run_command(command)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["failed"] += 1
+                logger.error(f"MQTT: Failed to handle command from {client_id!r}: {e}")
+            finally:
+                self._active.discard(client_id)
+                if queue:
+                    self._ready.put_nowait(client_id)
+                elif self._pending.get(client_id) is queue:
+                    del self._pending[client_id]
+
+    async def _run_command(self, command: _Command) -> None:
+        """Drops expired commands; otherwise runs the inference and publishes the response."""
+        self._stats["wait_ms"] += (time.monotonic() - command.received_at) * 1000
+        age = time.time() - command.issued_at
+        if settings.MQTT_MAX_COMMAND_AGE > 0 and age > settings.MQTT_MAX_COMMAND_AGE:
+            self._stats["expired"] += 1
+            logger.warning(f"MQTT: Dropping stale command from {command.client_id!r} ({age:.1f}s old)")
+            return
+
+        start = time.monotonic()
+        first_chunk_ms = None
+        seq = 0
+        streaming = settings.MQTT_STREAM_SENTENCES
+        async for chunk in self._response_chunks(command.client_id, command.text):
+            await self._publish(command.client_id, chunk, seq, final=not streaming)
+            if first_chunk_ms is None:
+                first_chunk_ms = (time.monotonic() - start) * 1000
+            seq += 1
+        if streaming or seq == 0:
+            await self._publish(command.client_id, "", seq, final=True)  # end marker
+        elapsed_ms = (time.monotonic() - start) * 1000
+        self._stats["first_chunk_ms"] += first_chunk_ms if first_chunk_ms is not None else elapsed_ms
+        self._stats["processed"] += 1
+        self._stats["processing_ms"] += elapsed_ms
+        self._stats["max_processing_ms"] = max(self._stats["max_processing_ms"], elapsed_ms)
+
+    async def _response_chunks(self, client_id: str, text: str) -> AsyncGenerator[str, None]:
+        """Speakable sentences as soon as each is complete (or the whole response, if not streaming)."""
+        if not settings.MQTT_STREAM_SENTENCES:
+            response_text = "".join([token async for token in self._process(client_id, text)]).strip()
+            if response_text:
+                yield response_text
+            return
+
+        chunker = SentenceChunker(settings.TTS_CHUNK_MIN_CHARS, settings.TTS_CHUNK_MAX_CHARS, strip_markdown=True)
+        async for token in self._process(client_id, text):
+            for sentence in chunker.feed(token):
+                yield sentence
+        rest = chunker.flush()
+        if rest:
+            yield rest
 
-        response_payload = json.dumps({"client_id": client_id, "text": response_text})
+    async def _publish(self, client_id: str, text: str, seq: int, final: bool) -> None:
+        if self._client is None:
+            raise RuntimeError("MQTT client is not connected")
+        response_payload = json.dumps({"client_id": client_id, "text": text, "seq": seq, "final": final})
         response_topic = f"{settings.MQTT_RESPONSE_TOPIC_PREFIX}/{client_id}"
-        await client.publish(response_topic, response_payload, qos=settings.MQTT_QOS)
-        logger.info(f"MQTT: Published response to '{response_topic}'")
+        await self._client.publish(response_topic, response_payload, qos=settings.MQTT_QOS)
+        logger.debug(f"MQTT: Published response #{seq} to '{response_topic}'")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Profundidad de cola, contadores de descarte y tiempos de espera/procesado (ms)."""
+        done = self._stats["processed"]
+        picked = done + self._stats["failed"] + self._stats["expired"]
+        return {
+            "workers": len(self._workers),
+            "queue_depth": self._depth,
+            "max_queue_depth": self._stats["max_depth"],
+            "in_flight": len(self._active),
+            "received": self._stats["received"],
+            "processed": done,
+            "failed": self._stats["failed"],
+            "invalid": self._stats["invalid"],
+            "expired": self._stats["expired"],
+            "dropped": self._stats["dropped"],
+            "not_owned": self._stats["not_owned"],
+            "replica": f"{self.replica_index + 1}/{self.replica_count}",
+            "avg_wait_ms": self._stats["wait_ms"] / picked if picked else 0.0,
+            "avg_first_chunk_ms": self._stats["first_chunk_ms"] / done if done else 0.0,
+            "avg_processing_ms": self._stats["processing_ms"] / done if done else 0.0,
+            "max_processing_ms": self._stats["max_processing_ms"],
+        }
+
+    async def _process(self, client_id: str, text: str) -> AsyncGenerator[str, None]:
+        """Create ephemeral inference session, run stateless inference, stream the text tokens.
+
+        Known commands are answered by the intent fast path without any inference.
+        """
+        fast_answer = await intent_matcher.try_answer(text, client_id=client_id)
+        if fast_answer is not None:
+            yield fast_answer
+            return
 
-    async def _process(self, client_id: str, text: str) -> str:
-        """Create ephemeral inference session, run stateless inference, collect response."""
         session_id = await self._inference_client.create_session()
         try:
-            tokens = []
             async for token in self._controller.handle_input({
                 "content": text,
                 "session_id": session_id,
@@ -99,18 +329,17 @@ class MQTTService:
                 "system_prompt_override": settings.MQTT_CLIENT_SYSTEM_PROMPT,
             }):
                 if isinstance(token, str):
-                    tokens.append(token)
+                    yield token
                 # Skip status dicts (tool status messages)
-            return "".join(tokens).strip()
         finally:
             await self._inference_client.close_session(session_id)
 
     async def shutdown(self) -> None:
-        """Cancel the background listener task and wait for it to exit."""
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+        """Cancel the listener and the workers and wait for them to exit."""
+        tasks = [t for t in (self._task, *self._workers) if t]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._client = None
         logger.info("MQTT service shut down.")
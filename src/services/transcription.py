@@ -1,16 +1,148 @@
+"""
+transcription.py
+~~~~~~~~~~~~~~~~
+Cliente del servicio de transcripción (STT) con inferencia especulativa.
+
+El STT emite transcripciones parciales (``{"text": ..., "final": false}``)
+mientras el usuario habla y una final al terminar. Cuando una parcial se
+mantiene estable TRANSCRIPTION_STABLE_MS, se arranca ya una sesión en el Engine
+con ese texto. Si la transcripción final coincide (ignorando mayúsculas y
+puntuación) la respuesta especulativa se conserva, y el retardo de
+finalización del STT deja de sumar a la latencia de voz; si no coincide, o la
+parcial cambia, la sesión se aborta y se infiere con el texto final.
+
+Cada transcripción final se publica en el event bus como
+``transcription_input`` con su respuesta en ``response``: la especulativa ya
+en marcha, o una nueva que arranca cuando el worker del suscriptor la consume
+(así el bus sigue limitando las inferencias concurrentes). Si el bus descarta
+el evento, su respuesta se aborta.
+"""
 import asyncio
-import websockets
 import json
 import logging
+import re
+import time
+from typing import Any, AsyncGenerator, Dict, Optional, Set
+from uuid import uuid4
+
+import websockets
+
 from src.core.config import settings
 from src.core.events import event_bus
+from src.core.intents import intent_matcher
 
 logger = logging.getLogger(__name__)
 
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_transcript(text: str) -> str:
+    """Lowercase, no punctuation, single spaces: "¿Qué hora es?" → "qué hora es"."""
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+class ResponseRun:
+    """One response generation for a transcript, running in the background.
+
+    Nothing runs until ``start`` (speculative runs) or the first ``stream``
+    call (the event bus subscriber). Tokens are buffered as they arrive, so a
+    consumer that calls ``stream`` later (once the final transcript confirms a
+    speculative run) still gets the whole response.
+    """
+
+    def __init__(self, text: str, inference_client, jota_controller):
+        self.text = text
+        self.key = normalize_transcript(text)
+        self.started_at = time.monotonic()
+        self.first_token_at: Optional[float] = None
+        self.session_id: Optional[str] = None
+        self._inference_client = inference_client
+        self._controller = jota_controller
+        self._tokens: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._aborted = False
+
+    def start(self) -> None:
+        """Starts generating in the background (no-op if already started or aborted)."""
+        if self._task is None and not self._aborted:
+            self.started_at = time.monotonic()
+            self._task = asyncio.create_task(self._produce())
+
+    async def _produce(self) -> None:
+        try:
+            async for token in self._generate():
+                if self.first_token_at is None:
+                    self.first_token_at = time.monotonic()
+                self._tokens.put_nowait(token)
+        except Exception as e:
+            logger.error(f"Transcription response failed for {self.text!r}: {e}")
+        finally:
+            self._tokens.put_nowait(None)
+
+    async def _generate(self) -> AsyncGenerator[str, None]:
+        fast_answer = await intent_matcher.try_answer(self.text, client_id=settings.TRANSCRIPTION_USER_ID)
+        if fast_answer is not None:
+            yield fast_answer
+            return
+
+        self.session_id = await self._inference_client.create_session()
+        try:
+            async for token in self._controller.handle_input({
+                "content": self.text,
+                "session_id": self.session_id,
+                "conversation_id": str(uuid4()),  # ephemeral — no history loaded
+                "user_id": settings.TRANSCRIPTION_USER_ID,
+                "client_id": settings.TRANSCRIPTION_USER_ID,
+                "model_id": None,
+                "stateless": True,
+            }):
+                if isinstance(token, str):
+                    yield token
+        finally:
+            await self._inference_client.close_session(self.session_id)
+
+    async def stream(self) -> AsyncGenerator[str, None]:
+        """Yields the response tokens, including those generated before the call."""
+        self.start()
+        while True:
+            token = await self._tokens.get()
+            if token is None:
+                return
+            yield token
+
+    async def abort(self) -> None:
+        """Stops generation and frees the engine session (idempotent)."""
+        if self._aborted:
+            return
+        self._aborted = True
+        if self._task is None:
+            self._tokens.put_nowait(None)  # never started: just end any stream
+            return
+        if self.session_id is not None:
+            await self._inference_client.abort_session(self.session_id)
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
 class TranscriptionClient:
-    def __init__(self):
-        self.url = settings.TRANSCRIPTION_SERVICE_URL
+    def __init__(self, inference_client=None, jota_controller=None, url: str = None):
+        self.url = url or settings.TRANSCRIPTION_SERVICE_URL
         self.running = False
+        self._inference_client = inference_client
+        self._controller = jota_controller
+        self._partial = ""                                  # normalised text of the latest partial
+        self._stability_task: Optional[asyncio.Task] = None
+        self._speculation: Optional[ResponseRun] = None
+        self._discarded: Set[asyncio.Task] = set()       # aborts of runs whose event was dropped
+        self._stats = {
+            "partials": 0, "finals": 0, "responses_discarded": 0,
+            "speculations_started": 0, "speculations_kept": 0, "speculations_aborted": 0,
+            "head_start_ms": 0.0,
+        }
+
+    @property
+    def speculation_enabled(self) -> bool:
+        return settings.TRANSCRIPTION_SPECULATION_ENABLED and self._inference_client is not None
 
     async def connect_and_listen(self):
         """
@@ -26,27 +158,111 @@ class TranscriptionClient:
                     async for message in websocket:
                         try:
                             data = json.loads(message)
-                            # Assuming the server sends {"text": "..."} or similar
-                            # Adapting based on raw text or json. 
-                            # If it's just raw string from some servers, handle that too.
-                            # For now assuming JSON structure based on standard practices.
-                            text = data.get("text", "")
-                            if text:
-                                await event_bus.publish({
-                                    "type": "transcription_input",
-                                    "content": text,
-                                    "source": "transcription_service"
-                                })
                         except json.JSONDecodeError:
                             logger.warning(f"Received non-JSON message: {message}")
+                            continue
+                        await self._on_message(data)
             except (websockets.exceptions.ConnectionClosed, ConnectionRefusedError) as e:
                 logger.error(f"Connection to Transcription Service lost: {e}. Retrying in 5s...")
                 await asyncio.sleep(5)
             except Exception as e:
                 logger.error(f"Unexpected error in Transcription Client: {e}")
                 await asyncio.sleep(5)
+            finally:
+                await self._discard_speculation()
+
+    async def _on_message(self, data: Dict[str, Any]) -> None:
+        """Routes a STT message: ``final`` (or ``is_final``) false marks a partial; default is final."""
+        text = data.get("text", "")
+        final = data.get("final", data.get("is_final", data.get("type") != "partial"))
+        if not final:
+            self._on_partial(text)
+            await self._check_speculation()
+        elif text:
+            await self._on_final(text)
+
+    def _on_partial(self, text: str) -> None:
+        self._stats["partials"] += 1
+        key = normalize_transcript(text)
+        if key == self._partial or not self.speculation_enabled:
+            return
+        self._partial = key
+        if self._stability_task is not None:
+            self._stability_task.cancel()
+        if len(key) >= settings.TRANSCRIPTION_SPECULATION_MIN_CHARS:
+            self._stability_task = asyncio.create_task(self._speculate_when_stable(text, key))
+
+    async def _check_speculation(self) -> None:
+        """The user kept talking past the speculated text: free the engine right away."""
+        if self._speculation is not None and self._speculation.key != self._partial:
+            await self._discard_speculation()
+
+    async def _speculate_when_stable(self, text: str, key: str) -> None:
+        await asyncio.sleep(settings.TRANSCRIPTION_STABLE_MS / 1000)
+        if self._partial != key:
+            return
+        await self._discard_speculation()
+        logger.info(f"Partial transcript stable, starting speculative inference: {text!r}")
+        self._speculation = ResponseRun(text, self._inference_client, self._controller)
+        self._speculation.start()
+        self._stats["speculations_started"] += 1
+
+    async def _on_final(self, text: str) -> None:
+        self._stats["finals"] += 1
+        if self._stability_task is not None:
+            self._stability_task.cancel()
+            self._stability_task = None
+        self._partial = ""
+
+        run = self._speculation
+        self._speculation = None
+        if run is not None and run.key == normalize_transcript(text):
+            self._stats["speculations_kept"] += 1
+            self._stats["head_start_ms"] += (time.monotonic() - run.started_at) * 1000
+            logger.info(f"Final transcript matches speculation, keeping it: {text!r}")
+        else:
+            if run is not None:
+                self._stats["speculations_aborted"] += 1
+                await run.abort()
+            run = ResponseRun(text, self._inference_client, self._controller) if self._inference_client else None
+
+        event = {"type": "transcription_input", "content": text, "source": "transcription_service"}
+        if run is None:
+            await event_bus.publish(event)
+            return
+        event["response"] = run
+        event["on_discard"] = lambda: self._abort_discarded(run)
+        try:
+            accepted = await event_bus.publish(event)
+        except Exception:
+            await run.abort()
+            raise
+        if not accepted:
+            await run.abort()  # no subscriber will ever stream it
+
+    def _abort_discarded(self, run: ResponseRun) -> None:
+        """The event bus dropped a transcription event: abort the response it carried."""
+        self._stats["responses_discarded"] += 1
+        logger.warning(f"Transcription event dropped by the event bus, aborting its response: {run.text!r}")
+        task = asyncio.create_task(run.abort())
+        self._discarded.add(task)
+        task.add_done_callback(self._discarded.discard)
+
+    async def _discard_speculation(self) -> None:
+        if self._speculation is not None:
+            run, self._speculation = self._speculation, None
+            self._stats["speculations_aborted"] += 1
+            logger.info(f"Aborting speculative inference for {run.text!r}")
+            await run.abort()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Partial/final counts and speculation outcomes; head start = speculation time saved per kept run."""
+        kept = self._stats["speculations_kept"]
+        stats = {k: v for k, v in self._stats.items() if k != "head_start_ms"}
+        stats["avg_head_start_ms"] = self._stats["head_start_ms"] / kept if kept else 0.0
+        return stats
 
     def stop(self):
         self.running = False
-
-transcription_client = TranscriptionClient()
+        if self._stability_task is not None:
+            self._stability_task.cancel()
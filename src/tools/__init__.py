@@ -1,3 +1,6 @@
 # Import all tool modules here so their @tool decorators fire on startup
 # and register the functions into the global tool_manager.
 from src.tools import tavily  # noqa: F401
+from src.tools import clock  # noqa: F401
+from src.tools import calculator  # noqa: F401
+from src.tools import units  # noqa: F401
@@ -0,0 +1,120 @@
+import ast
+import math
+import operator
+import re
+from typing import Any, Dict
+
+from src.core.tool_manager import tool
+
+# Guards against expressions that would pin the event loop (e.g. 9**9**9)
+_MAX_EXPRESSION_CHARS = 200
+_MAX_EXPONENT = 1000
+_MAX_MAGNITUDE = 1e100
+
+_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+_FUNCTIONS = {
+    "sqrt": math.sqrt,
+    "abs": abs,
+    "round": round,
+    "log": math.log,
+    "log10": math.log10,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+}
+_CONSTANTS = {"pi": math.pi, "e": math.e}
+
+# Spoken / typographic operators the model (or an intent slot) copies from the user
+_REPLACEMENTS = {"×": "*", "÷": "/", "^": "**", "−": "-"}
+_SPOKEN_OPERATORS = [
+    (re.compile(r"\b(?:dividido (?:entre|por)|entre|divided by)\b", re.IGNORECASE), "/"),
+    (re.compile(r"\b(?:multiplicado por|por|times|x)\b", re.IGNORECASE), "*"),
+    (re.compile(r"\b(?:elevado a|to the power of)\b", re.IGNORECASE), "**"),
+    (re.compile(r"(?:\bmás\b|\bmas\b|\bplus\b)", re.IGNORECASE), "+"),
+    (re.compile(r"\b(?:menos|minus)\b", re.IGNORECASE), "-"),
+]
+# A comma is only read as the single decimal separator of a number ("1,5");
+# thousands-grouped numbers ("1,000") are ambiguous and rejected instead of guessed
+_THOUSANDS_GROUPED = re.compile(r"(?<![\d.,])[1-9]\d{0,2}(?:,\d{3})+(?![\d.,])")
+_DECIMAL_COMMA = re.compile(r"(?<![\d.,])(\d+),(\d+)(?![\d.,])")
+
+
+def _eval_node(node: ast.AST) -> float:
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return node.value
+    if isinstance(node, ast.Name) and node.id in _CONSTANTS:
+        return _CONSTANTS[node.id]
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        return _UNARY_OPS[type(node.op)](_eval_node(node.operand))
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        left = _eval_node(node.left)
+        right = _eval_node(node.right)
+        if isinstance(node.op, ast.Pow) and abs(right) > _MAX_EXPONENT:
+            raise ValueError("Exponent too large.")
+        result = _BIN_OPS[type(node.op)](left, right)
+        if isinstance(result, complex) or abs(result) > _MAX_MAGNITUDE:
+            raise ValueError("Result out of range.")
+        return result
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in _FUNCTIONS
+        and not node.keywords
+    ):
+        return _FUNCTIONS[node.func.id](*(_eval_node(arg) for arg in node.args))
+    raise ValueError(f"Unsupported element in expression: {ast.dump(node)[:40]}")
+
+
+def evaluate_expression(expression: str) -> float:
+    """Safely evaluates an arithmetic expression without using eval()."""
+    expr = expression.strip()
+    for src, dst in _REPLACEMENTS.items():
+        expr = expr.replace(src, dst)
+    for pattern, dst in _SPOKEN_OPERATORS:
+        expr = pattern.sub(dst, expr)
+    grouped = _THOUSANDS_GROUPED.search(expr)
+    if grouped:
+        raise ValueError(
+            f"Ambiguous number {grouped.group()!r}: use '.' or ',' only as the decimal separator "
+            f"and no thousands separators."
+        )
+    expr = _DECIMAL_COMMA.sub(r"\1.\2", expr)
+    if not expr:
+        raise ValueError("Empty expression.")
+    if len(expr) > _MAX_EXPRESSION_CHARS:
+        raise ValueError(f"Expression longer than {_MAX_EXPRESSION_CHARS} characters.")
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError:
+        raise ValueError(f"Invalid arithmetic expression: {expression!r}")
+    try:
+        return _eval_node(tree.body)
+    except ZeroDivisionError:
+        raise ValueError("Division by zero.")
+    except OverflowError:
+        raise ValueError("Result out of range.")
+
+
+def format_number(value: float) -> str:
+    """Formats a number for speech: integers without decimals, floats rounded to 6 significant digits."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, int):
+        return str(value)
+    return f"{value:.6g}"
+
+
+@tool(direct_answer=True, answer_template="Son {value}.", execution="inline")
+def calculate(expression: str) -> Dict[str, Any]:
+    """Evaluates an arithmetic expression such as '15 * 37' or 'sqrt(2) + 3^2'."""
+    value = evaluate_expression(expression)
+    return {"expression": expression, "value": format_number(value)}
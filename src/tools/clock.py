@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Dict
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from src.core.config import settings
+from src.core.tool_manager import tool
+
+_WEEKDAYS = ["lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo"]
+_MONTHS = [
+    "enero", "febrero", "marzo", "abril", "mayo", "junio",
+    "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre",
+]
+
+
+@tool(direct_answer=True, answer_template="Son las {time}, {date} ({timezone}).", execution="inline")
+def get_current_time(timezone: str = "") -> Dict[str, str]:
+    """Returns the current local time and date, optionally for an IANA timezone such as 'America/New_York'."""
+    tz_name = timezone.strip() or settings.LOCAL_TIMEZONE
+    try:
+        tz = ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone '{tz_name}'. Use an IANA name like 'Europe/Madrid'.")
+
+    now = datetime.now(tz)
+    return {
+        "time": now.strftime("%H:%M"),
+        "date": f"{_WEEKDAYS[now.weekday()]} {now.day} de {_MONTHS[now.month - 1]} de {now.year}",
+        "iso": now.isoformat(timespec="seconds"),
+        "timezone": tz_name,
+    }
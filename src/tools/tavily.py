@@ -1,29 +1,128 @@
-from typing import Dict, Any, List
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+import httpx
 from tavily import AsyncTavilyClient
+from tavily.errors import TimeoutError as TavilyTimeoutError
 from src.core.config import settings
 from src.core.tool_manager import tool
 
-@tool
+logger = logging.getLogger(__name__)
+
+# Latency samples used to derive the p90 hedge threshold
+_LATENCY_WINDOW = 100
+_MIN_HEDGE_SAMPLES = 20
+_KEEPALIVE_EXPIRY = 60.0  # seconds an idle pooled connection is kept open
+
+# Process-wide pooled client (created lazily, closed on shutdown)
+_http_client: Optional[httpx.AsyncClient] = None
+_client: Optional[AsyncTavilyClient] = None
+_latencies: deque = deque(maxlen=_LATENCY_WINDOW)
+
+
+def _get_client() -> AsyncTavilyClient:
+    """Returns the shared Tavily client, reusing TLS sessions and keep-alive connections."""
+    global _http_client, _client
+    if _client is None:
+        _http_client = httpx.AsyncClient(
+            base_url=settings.TAVILY_API_URL,
+            timeout=settings.TAVILY_TIMEOUT,
+            verify=settings.SSL_VERIFY,
+            limits=httpx.Limits(
+                max_connections=settings.TAVILY_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.TAVILY_MAX_CONNECTIONS,
+                keepalive_expiry=_KEEPALIVE_EXPIRY,
+            ),
+        )
+        _client = AsyncTavilyClient(api_key=settings.TAVILY_API_KEY, client=_http_client)
+    return _client
+
+
+async def close_client() -> None:
+    """Closes the pooled HTTP connections. Called from shutdown_services()."""
+    global _http_client, _client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _client = None
+
+
+def _hedge_delay() -> Optional[float]:
+    """Seconds to wait before sending a hedged duplicate, or None if hedging is off."""
+    if not settings.TAVILY_HEDGE_ENABLED:
+        return None
+    if len(_latencies) < _MIN_HEDGE_SAMPLES:
+        return settings.TAVILY_HEDGE_DELAY
+    ordered = sorted(_latencies)
+    return ordered[int(0.9 * (len(ordered) - 1))]
+
+
+async def _search_once(query: str) -> Dict[str, Any]:
+    start = time.monotonic()
+    try:
+        response = await _get_client().search(
+            query=query,
+            search_depth=settings.TAVILY_SEARCH_DEPTH,
+            max_results=settings.TAVILY_MAX_RESULTS,
+            timeout=settings.TAVILY_TIMEOUT,
+        )
+    except (TavilyTimeoutError, httpx.TimeoutException, asyncio.TimeoutError):
+        # Slow requests must count too, or the p90 hedge threshold is biased low
+        _latencies.append(time.monotonic() - start)
+        raise
+    _latencies.append(time.monotonic() - start)
+    return response
+
+
+async def _hedged_search(query: str) -> Dict[str, Any]:
+    """Runs the search; if it has not answered by the hedge threshold, races a duplicate."""
+    delay = _hedge_delay()
+    if delay is None:
+        return await _search_once(query)
+
+    tasks = {asyncio.create_task(_search_once(query))}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            logger.info(f"Tavily search slower than {delay:.2f}s, sending hedged request")
+            tasks.add(asyncio.create_task(_search_once(query)))
+
+        pending = set(tasks)
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+        raise last_error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+@tool(cache_ttl=settings.TAVILY_CACHE_TTL, cache_max_entries=256, cache_if=bool)
 async def web_search(query: str) -> List[Dict[str, Any]]:
     """Performs a web search using Tavily and returns the top 5 most relevant results."""
     # Check if API key is configured
     if not settings.TAVILY_API_KEY:
         raise ValueError("TAVILY_API_KEY is not set in the configuration.")
 
-    # Initialize the async client
-    client = AsyncTavilyClient(api_key=settings.TAVILY_API_KEY)
-    
-    # Perform the search, limiting to 5 results to avoid saturating context
+    # Hard deadline: an empty result is better than stalling the voice response
     try:
-        response = await client.search(
-            query=query,
-            search_depth=settings.TAVILY_SEARCH_DEPTH,
-            max_results=settings.TAVILY_MAX_RESULTS,
-        )
-        
-        # Extract and return the results
-        # Tavily response usually contains a 'results' list with dicts containing 'title', 'url', 'content'
-        return response.get("results", [])
+        response = await asyncio.wait_for(_hedged_search(query), timeout=settings.TAVILY_TIMEOUT)
+    except asyncio.TimeoutError:
+        # The deadline cancelled the request(s) before the client timed out: record it as a sample
+        _latencies.append(settings.TAVILY_TIMEOUT)
+        logger.warning(f"Tavily search exceeded {settings.TAVILY_TIMEOUT}s deadline, returning no results")
+        return []
     except Exception as e:
         # Re-raise with a clear message or handle depending on JotaOrchestrator's error strategy
         raise RuntimeError(f"Tavily web search failed: {str(e)}")
+
+    # Tavily response usually contains a 'results' list with dicts containing 'title', 'url', 'content'
+    return response.get("results", [])
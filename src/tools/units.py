@@ -0,0 +1,103 @@
+from typing import Dict, Tuple
+
+from src.core.tool_manager import tool
+from src.tools.calculator import format_number
+
+# unit alias → (dimension, factor to the dimension's base unit)
+_LINEAR_UNITS: Dict[str, Tuple[str, float]] = {}
+
+
+def _add(dimension: str, factor: float, *aliases: str) -> None:
+    for alias in aliases:
+        _LINEAR_UNITS[alias] = (dimension, factor)
+
+
+# Length (base: metre)
+_add("length", 1e-3, "mm", "millimeter", "millimetre", "millimeters", "millimetres", "milimetro", "milímetro", "milimetros", "milímetros")
+_add("length", 1e-2, "cm", "centimeter", "centimetre", "centimeters", "centimetres", "centimetro", "centímetro", "centimetros", "centímetros")
+_add("length", 1.0, "m", "meter", "metre", "meters", "metres", "metro", "metros")
+_add("length", 1e3, "km", "kilometer", "kilometre", "kilometers", "kilometres", "kilometro", "kilómetro", "kilometros", "kilómetros")
+_add("length", 0.0254, "in", "inch", "inches", "pulgada", "pulgadas")
+_add("length", 0.3048, "ft", "foot", "feet", "pie", "pies")
+_add("length", 0.9144, "yd", "yard", "yards", "yarda", "yardas")
+_add("length", 1609.344, "mi", "mile", "miles", "milla", "millas")
+# Mass (base: kilogram)
+_add("mass", 1e-3, "g", "gram", "grams", "gramo", "gramos")
+_add("mass", 1.0, "kg", "kilogram", "kilograms", "kilo", "kilos", "kilogramo", "kilogramos")
+_add("mass", 1e3, "t", "tonne", "tonnes", "tonelada", "toneladas")
+_add("mass", 0.45359237, "lb", "lbs", "pound", "pounds", "libra", "libras")
+_add("mass", 0.028349523125, "oz", "ounce", "ounces", "onza", "onzas")
+# Volume (base: litre)
+_add("volume", 1e-3, "ml", "milliliter", "millilitre", "milliliters", "millilitres", "mililitro", "mililitros")
+_add("volume", 1.0, "l", "liter", "litre", "liters", "litres", "litro", "litros")
+_add("volume", 3.785411784, "gal", "gallon", "gallons", "galon", "galón", "galones")
+# Time (base: second)
+_add("time", 1.0, "s", "sec", "second", "seconds", "segundo", "segundos")
+_add("time", 60.0, "min", "minute", "minutes", "minuto", "minutos")
+_add("time", 3600.0, "h", "hour", "hours", "hora", "horas")
+_add("time", 86400.0, "d", "day", "days", "dia", "día", "dias", "días")
+# Speed (base: metre/second)
+_add("speed", 1.0, "m/s", "mps")
+_add("speed", 1 / 3.6, "km/h", "kmh", "kph")
+_add("speed", 0.44704, "mph")
+_add("speed", 0.514444, "kn", "knot", "knots", "nudo", "nudos")
+# Data (base: byte)
+_add("data", 1.0, "b", "byte", "bytes")
+_add("data", 1e3, "kb", "kilobyte", "kilobytes")
+_add("data", 1e6, "mb", "megabyte", "megabytes")
+_add("data", 1e9, "gb", "gigabyte", "gigabytes")
+_add("data", 1e12, "tb", "terabyte", "terabytes")
+
+# Temperature is affine, handled separately: alias → canonical scale
+_TEMPERATURE_UNITS = {
+    "c": "C", "°c": "C", "celsius": "C", "centigrados": "C", "centígrados": "C",
+    "f": "F", "°f": "F", "fahrenheit": "F",
+    "k": "K", "kelvin": "K",
+}
+
+
+def _to_celsius(value: float, scale: str) -> float:
+    if scale == "F":
+        return (value - 32) * 5 / 9
+    if scale == "K":
+        return value - 273.15
+    return value
+
+
+def _from_celsius(value: float, scale: str) -> float:
+    if scale == "F":
+        return value * 9 / 5 + 32
+    if scale == "K":
+        return value + 273.15
+    return value
+
+
+def convert(value: float, from_unit: str, to_unit: str) -> float:
+    """Converts a value between two units of the same dimension."""
+    src = from_unit.strip().lower()
+    dst = to_unit.strip().lower()
+
+    if src in _TEMPERATURE_UNITS and dst in _TEMPERATURE_UNITS:
+        return _from_celsius(_to_celsius(value, _TEMPERATURE_UNITS[src]), _TEMPERATURE_UNITS[dst])
+
+    if src not in _LINEAR_UNITS:
+        raise ValueError(f"Unknown unit '{from_unit}'.")
+    if dst not in _LINEAR_UNITS:
+        raise ValueError(f"Unknown unit '{to_unit}'.")
+
+    src_dim, src_factor = _LINEAR_UNITS[src]
+    dst_dim, dst_factor = _LINEAR_UNITS[dst]
+    if src_dim != dst_dim:
+        raise ValueError(f"Cannot convert {src_dim} ('{from_unit}') to {dst_dim} ('{to_unit}').")
+    return value * src_factor / dst_factor
+
+
+@tool(
+    direct_answer=True,
+    answer_template="{value} {from_unit} son {converted} {to_unit}.",
+    execution="inline",
+)
+def convert_units(value: float, from_unit: str, to_unit: str) -> Dict[str, str]:
+    """Converts a quantity between units of length, mass, volume, time, speed, data or temperature."""
+    converted = convert(float(value), from_unit, to_unit)
+    return {"value": format_number(float(value)), "converted": format_number(converted)}
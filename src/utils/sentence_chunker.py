@@ -0,0 +1,154 @@
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+_TERMINATORS = frozenset(".!?…")
+_CLOSERS = frozenset("\"')]}»”’")
+_CLAUSE_BREAKS = ",;:"
+# Short forms whose trailing dot does not end a sentence (es/en).
+_ABBREVIATIONS = frozenset(
+    "sr sra srta dr dra ud uds etc aprox núm pág av avda ej mr mrs ms vs approx e.g i.e p.ej".split()
+)
+# Markdown that a TTS engine would read aloud.
+_MARKUP_CHARS = frozenset("*`~_|[")
+_LINE_MARKERS = frozenset(" \t#>")
+_BULLETS = frozenset("-*+")
+
+
+class MarkdownStripper:
+    """Removes markdown from a token stream for speech, one char at a time.
+
+    Drops emphasis/code/table markers, heading and quote prefixes, list bullets
+    and link targets (``[texto](url)`` → ``texto``). State carries over between
+    tokens, so markers split across tokens are handled; each char is looked at once.
+    """
+
+    def __init__(self):
+        self._line_start = True
+        self._held = ""        # char whose meaning depends on the next one ("-" bullet, "]" link)
+        self._in_url = False
+
+    def feed(self, text: str) -> str:
+        out: List[str] = []
+        for ch in text:
+            if self._in_url:
+                self._in_url = ch != ")"
+                continue
+            if self._held:
+                held, self._held = self._held, ""
+                if held == "]":
+                    if ch == "(":
+                        self._in_url = True
+                        continue
+                elif ch in " \t":
+                    continue  # "- item": bullet dropped, still at line start
+                elif held != "*":  # "-5 grados" is text; "**negrita**" is emphasis
+                    out.append(held)
+                    self._line_start = False
+            if ch == "\n":
+                out.append(ch)
+                self._line_start = True
+                continue
+            if self._line_start:
+                if ch in _LINE_MARKERS:
+                    continue
+                if ch in _BULLETS:
+                    self._held = ch
+                    continue
+                self._line_start = False
+            if ch == "]":
+                self._held = ch
+            elif ch not in _MARKUP_CHARS:
+                out.append(ch)
+        return "".join(out)
+
+
+class SentenceChunker:
+    """Splits a token stream into speakable units as soon as each one is complete.
+
+    Tokens are appended to a buffer that is scanned once, incrementally: a unit
+    ends at ``.``/``!``/``?``/``…`` followed by whitespace (so "3.5" or "p.ej."
+    are not cut) or at a newline. Units shorter than ``min_chars`` are merged
+    with the next one, and a buffer longer than ``max_chars`` without a sentence
+    end is cut at the last clause break (``,;:``) or space. With
+    ``strip_markdown`` tokens go through a MarkdownStripper on the way in.
+
+    Usage::
+
+        chunker = SentenceChunker()
+        for token in stream:
+            for sentence in chunker.feed(token):
+                speak(sentence)
+        rest = chunker.flush()
+    """
+
+    def __init__(self, min_chars: int = 12, max_chars: int = 200, strip_markdown: bool = False):
+        self.min_chars = min_chars
+        self.max_chars = max(max_chars, min_chars + 1)
+        self._stripper = MarkdownStripper() if strip_markdown else None
+        self._buffer = ""
+        self._scanned = 0   # chars of _buffer already checked for sentence ends
+
+    def feed(self, text: str) -> List[str]:
+        """Adds a token and returns the units it completed (possibly none)."""
+        if self._stripper is not None:
+            text = self._stripper.feed(text)
+        if not text:
+            return []
+        self._buffer += text
+        units: List[str] = []
+        buf = self._buffer
+        start = 0
+        # The last char is only decidable once the next one arrives ("3." vs "3.5")
+        for i in range(self._scanned, len(buf) - 1):
+            if not self._ends_unit(buf, start, i):
+                continue
+            unit = " ".join(buf[start:i + 1].split())
+            if len(unit) >= self.min_chars:
+                units.append(unit)
+                start = i + 1
+        self._buffer = buf[start:]
+        self._scanned = max(0, len(buf) - 1 - start)
+
+        while len(self._buffer) > self.max_chars:
+            units.append(self._cut_clause())
+        return units
+
+    def flush(self) -> Optional[str]:
+        """Returns whatever is left once the stream ends (None if only whitespace)."""
+        rest = " ".join(self._buffer.split())
+        self._buffer = ""
+        self._scanned = 0
+        return rest or None
+
+    def _ends_unit(self, buf: str, start: int, i: int) -> bool:
+        ch = buf[i]
+        if ch == "\n":
+            return True
+        if ch in _CLOSERS and i > start and buf[i - 1] in _TERMINATORS:
+            ch = buf[i - 1]  # '¿Vienes?" Dijo' → the unit ends after the closing quote
+        elif ch not in _TERMINATORS:
+            return False
+        if not buf[i + 1].isspace():
+            return False
+        if ch == ".":
+            word = buf[start:i].rsplit(None, 1)[-1] if buf[start:i].strip() else ""
+            word = word.lstrip("¿¡(\"'").rstrip(".").lower()
+            if word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+                return False
+        return True
+
+    def _cut_clause(self) -> str:
+        window = self._buffer[:self.max_chars]
+        cut = max(window.rfind(sep + " ") for sep in _CLAUSE_BREAKS)
+        if cut >= self.min_chars:
+            cut += 1
+        else:
+            cut = window.rfind(" ")
+            if cut < self.min_chars:
+                cut = self.max_chars
+        unit = " ".join(self._buffer[:cut].split())
+        self._buffer = self._buffer[cut:].lstrip()
+        self._scanned = 0
+        return unit
@@ -0,0 +1,269 @@
+import re
+import json
+import math
+import logging
+from collections import Counter
+from typing import Any, Iterable, List, Optional, Sequence
+
+from src.core.config import settings
+from src.core.constants import TOOL_OUTPUT_TRUNCATED_MARKER
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+_TERM = re.compile(r"\w{3,}")
+_SENTENCE_END = re.compile(r"[.!?…]\s|\n")
+
+# Function words (es/en) that carry no relevance signal.
+_STOPWORDS = frozenset(
+    "que los las del por con una para como pero sus les mas más este esta esto son fue "
+    "muy hay the and for with that this are was from have has not but you your what".split()
+)
+_BM25_K1 = 1.5
+_BM25_B = 0.75
+
+# Below this many free chars a partially-fitting record is not worth shrinking.
+_MIN_PARTIAL_CHARS = 80
+_ELLIPSIS = "…"
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _is_records(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(item, dict) for item in value)
+
+
+def _strip_fields(value: Any, drop: frozenset) -> Any:
+    """Recursively removes low-value keys (urls, raw html...) from dicts."""
+    if isinstance(value, dict):
+        return {k: _strip_fields(v, drop) for k, v in value.items() if k not in drop}
+    if isinstance(value, list):
+        return [_strip_fields(v, drop) for v in value]
+    return value
+
+
+def _record_text(record: dict) -> str:
+    return " ".join(v for v in record.values() if isinstance(v, str))
+
+
+def _rank(records: List[dict]) -> List[dict]:
+    """Most relevant first: by the record's own ``score`` when every record has one."""
+    if all(isinstance(r.get("score"), (int, float)) for r in records):
+        return sorted(records, key=lambda r: r["score"], reverse=True)
+    return list(records)
+
+
+def _dedupe(records: Iterable[dict], threshold: float) -> List[dict]:
+    """Drops records whose text is near-identical (word Jaccard) to an earlier one."""
+    kept: List[dict] = []
+    seen: List[set] = []
+    for record in records:
+        words = set(_WORD.findall(_record_text(record).lower()))
+        if words and any(len(words & other) / len(words | other) >= threshold for other in seen):
+            continue
+        kept.append(record)
+        seen.append(words)
+    return kept
+
+
+def _truncate_text(text: str, limit: int, suffix: str) -> str:
+    """Cuts ``text`` at a word boundary so that ``text + suffix`` fits in ``limit`` chars."""
+    room = limit - len(suffix)
+    if room <= 0:
+        return suffix[:limit]
+    cut = text[:room]
+    space = cut.rfind(" ")
+    if space > room // 2:
+        cut = cut[:space]
+    return cut.rstrip() + suffix
+
+
+def _terms(text: str) -> List[str]:
+    return [w for w in _TERM.findall(text.lower()) if w not in _STOPWORDS]
+
+
+def _split_sentences(text: str) -> List[str]:
+    sentences, start = [], 0
+    for match in _SENTENCE_END.finditer(text):
+        sentences.append(text[start:match.start() + 1].strip())
+        start = match.end()
+    sentences.append(text[start:].strip())
+    return [s for s in sentences if s]
+
+
+def _bm25(docs: Sequence[List[str]], query_terms: set) -> List[float]:
+    """Okapi BM25 score of each tokenised document against the query terms."""
+    if not docs or not query_terms:
+        return [0.0] * len(docs)
+    n = len(docs)
+    avgdl = (sum(len(d) for d in docs) / n) or 1.0
+    doc_sets = [set(d) for d in docs]
+    idf = {}
+    for term in query_terms:
+        df = sum(1 for d in doc_sets if term in d)
+        if df:
+            idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+    scores = []
+    for doc, terms in zip(docs, doc_sets):
+        if not idf or not terms & idf.keys():
+            scores.append(0.0)
+            continue
+        tf = Counter(doc)
+        norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * len(doc) / avgdl)
+        scores.append(sum(w * tf[t] * (_BM25_K1 + 1) / (tf[t] + norm) for t, w in idf.items() if t in tf))
+    return scores
+
+
+def select_relevant_text(text: str, query: Optional[str], limit: int, suffix: str) -> str:
+    """Keeps the sentences of ``text`` most relevant to ``query`` within ``limit`` chars.
+
+    Sentences are scored with BM25 against the query terms and taken best-first
+    while they fit, then emitted in their original order (gaps marked with "…").
+    Falls back to a plain word-boundary cut when there is no usable query or
+    no sentence matches it.
+    """
+    if len(text) <= limit:
+        return text
+    query_terms = set(_terms(query or ""))
+    sentences = _split_sentences(text)
+    if not query_terms or len(sentences) < 2:
+        return _truncate_text(text, limit, suffix)
+
+    scores = _bm25([_terms(s) for s in sentences], query_terms)
+    room = limit - len(suffix)
+    chosen, used = [], 0
+    for i in sorted(range(len(sentences)), key=lambda i: (-scores[i], i)):
+        if scores[i] <= 0:
+            break
+        cost = len(sentences[i]) + 3  # separator / gap marker
+        if used + cost <= room:
+            chosen.append(i)
+            used += cost
+    if not chosen:
+        return _truncate_text(text, limit, suffix)
+
+    pieces, previous = [], None
+    for i in sorted(chosen):
+        if previous is not None and i != previous + 1:
+            pieces.append(_ELLIPSIS)
+        pieces.append(sentences[i])
+        previous = i
+    return " ".join(pieces) + suffix
+
+
+def _rank_by_query(records: List[dict], query: Optional[str]) -> List[dict]:
+    """Stable re-rank of records by BM25 relevance of their text to the query."""
+    query_terms = set(_terms(query or ""))
+    if not query_terms:
+        return records
+    scores = _bm25([_terms(_record_text(r)) for r in records], query_terms)
+    if not any(scores):
+        return records
+    order = sorted(range(len(records)), key=lambda i: -scores[i])
+    return [records[i] for i in order]
+
+
+def _shrink_to_fit(value: Any, budget: int, render, query: Optional[str] = None) -> Optional[Any]:
+    """Shortens the longest string fields of ``value`` until ``render(value)`` fits."""
+    value = json.loads(_dumps(value))  # private copy
+    for _ in range(32):
+        overflow = len(render(value)) - budget
+        if overflow <= 0:
+            return value
+        if not isinstance(value, dict):
+            return None
+        key = max(
+            (k for k, v in value.items() if isinstance(v, str)),
+            key=lambda k: len(value[k]),
+            default=None,
+        )
+        if key is None or len(value[key]) <= len(_ELLIPSIS):
+            return None
+        target = max(0, len(value[key]) - overflow - 2)
+        value[key] = select_relevant_text(value[key], query, target + len(_ELLIPSIS), _ELLIPSIS) if target else ""
+    return None
+
+
+def _fill(records: List[dict], budget: int, render, query: Optional[str] = None) -> List[dict]:
+    """Greedily keeps records in order while ``render(selected)`` fits in the budget."""
+    selected: List[dict] = []
+    for record in records:
+        if len(render(selected + [record])) <= budget:
+            selected.append(record)
+            continue
+        room = budget - len(render(selected))
+        if room >= _MIN_PARTIAL_CHARS:
+            partial = _shrink_to_fit(record, budget, lambda r: render(selected + [r]), query)
+            if partial:
+                selected.append(partial)
+        break
+    return selected
+
+
+def compact_tool_output(
+    result: Any,
+    budget: int,
+    marker: str = TOOL_OUTPUT_TRUNCATED_MARKER,
+    query: Optional[str] = None,
+) -> str:
+    """Compacts a tool result to at most ~``budget`` chars without breaking its structure.
+
+    JSON results (or JSON-serialised strings) are compacted structurally:
+    low-value fields (``TOOL_OUTPUT_DROP_FIELDS``) are removed, near-identical
+    records of a list-of-dicts (e.g. Tavily ``results``) are deduplicated, and
+    the budget is filled with the most relevant records first. The output is
+    always valid JSON. Plain text keeps the sentences most relevant to
+    ``query`` (or the leading text when there is none) plus ``marker``.
+
+    Args:
+        result: Raw tool result, or its serialised string form.
+        budget: Max length in characters of the returned string.
+        marker: Suffix appended when plain text has to be cut.
+        query:  Text the result should answer (user prompt or tool arguments);
+                drives record ranking and sentence selection.
+
+    Returns:
+        The compacted result as a string.
+    """
+    text = result if isinstance(result, str) else _dumps(result)
+    if len(text) <= budget:
+        return text
+
+    data = result
+    if isinstance(result, str):
+        try:
+            data = json.loads(result)
+        except ValueError:
+            return select_relevant_text(text, query, budget, marker)
+    if not isinstance(data, (list, dict)):
+        return select_relevant_text(text, query, budget, marker)
+
+    drop = frozenset(settings.TOOL_OUTPUT_DROP_FIELDS)
+    threshold = settings.TOOL_OUTPUT_DEDUPE_THRESHOLD
+
+    def prepare(records: List[dict]) -> List[dict]:
+        ranked = _dedupe(_rank_by_query(_rank(records), query), threshold)
+        return [r for r in _strip_fields(ranked, drop) if r]
+
+    if _is_records(data):
+        compacted: Any = _fill(prepare(data), budget, _dumps, query)
+    else:
+        compacted = _strip_fields(data, drop)
+        if isinstance(compacted, dict):
+            # The largest list-of-dicts field (e.g. "results") gets the remaining budget
+            record_keys = [k for k, v in data.items() if k in compacted and _is_records(v)]
+            if record_keys:
+                key = max(record_keys, key=lambda k: len(_dumps(data[k])))
+                compacted[key] = _fill(
+                    prepare(data[key]), budget, lambda sel: _dumps({**compacted, key: sel}), query
+                )
+        if len(_dumps(compacted)) > budget:
+            compacted = _shrink_to_fit(compacted, budget, _dumps, query)
+            if compacted is None:
+                return _truncate_text(_dumps(_strip_fields(data, drop)), budget, marker)
+
+    output = _dumps(compacted)
+    logger.debug(f"Tool output compacted: {len(text)} → {len(output)} chars")
+    return output
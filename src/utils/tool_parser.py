@@ -1,26 +1,179 @@
 import re
 import json
 import logging
+from typing import Any, Optional
 
 from src.core.constants import TOOL_CALL_OPEN, TOOL_CALL_CLOSE
 
 logger = logging.getLogger(__name__)
 
 # Permissive pattern: allows any amount of whitespace (including newlines) around the JSON
-# block, so models that insert line breaks inside the tag are handled correctly.
+# block, so models that insert line breaks inside the tag are handled correctly. The
+# closing brace is not required: unbalanced blocks are left to the repair step.
 TOOL_CALL_PATTERN = re.compile(
-    re.escape(TOOL_CALL_OPEN) + r'[\s\n\r]*(\{.*?\})[\s\n\r]*' + re.escape(TOOL_CALL_CLOSE),
+    re.escape(TOOL_CALL_OPEN) + r'[\s\n\r]*(\{.*?)[\s\n\r]*' + re.escape(TOOL_CALL_CLOSE),
     re.DOTALL
 )
 
 _VALID_TOOL_NAME = re.compile(r'^[a-zA-Z0-9_]+$')
 
+# Repair is a single linear pass; longer payloads are not worth guessing at.
+MAX_REPAIR_CHARS = 4096
+_CODE_FENCE = re.compile(r'^```[a-zA-Z]*\s*|\s*```$')
+_BAREWORD = re.compile(r'\w+')  # Unicode-aware: unquoted words like 'año' reach here too
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+_repair_stats = {"parsed": 0, "repaired": 0, "failed": 0}
+
+
+def _repair_json(raw: str) -> str:
+    """Rewrites common model JSON mistakes into strict JSON (best effort, one pass).
+
+    Handles single-quoted strings, Python literals (True/False/None), trailing
+    commas, unclosed strings/braces/brackets and trailing garbage after the
+    top-level object.
+    """
+    text = _CODE_FENCE.sub("", raw.strip())
+    out: list[str] = []
+    closers: list[str] = []
+    quote = None
+    i, n = 0, len(text)
+
+    def drop_trailing_comma():
+        while out and out[-1].isspace():
+            out.pop()
+        if out and out[-1] == ",":
+            out.pop()
+
+    while i < n:
+        ch = text[i]
+        if quote:
+            if ch == "\\" and i + 1 < n:
+                # \' is not a valid JSON escape: emit the bare quote
+                out.append("'" if text[i + 1] == "'" else text[i:i + 2])
+                i += 2
+                continue
+            if ch == quote:
+                out.append('"')
+                quote = None
+            elif ch == '"':
+                out.append('\\"')  # literal double quote inside a single-quoted string
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch in "\"'":
+            quote = ch
+            out.append('"')
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+            out.append(ch)
+        elif ch in "}]":
+            if not closers:
+                break
+            drop_trailing_comma()
+            out.append(closers.pop())
+            if not closers:
+                break  # top-level value complete: ignore anything after it
+        elif ch.isalpha() or ch == "_":
+            word = _BAREWORD.match(text, i).group()
+            out.append(_PY_LITERALS.get(word, word))
+            i += len(word)
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    if quote:
+        out.append('"')
+    while closers:
+        drop_trailing_comma()
+        out.append(closers.pop())
+    return "".join(out)
+
+
+def _check_registered_arguments(name: str, arguments: dict, registered_only: bool) -> Optional[str]:
+    """Checks arguments with the tool's precompiled validator; returns an error or None.
+
+    Unknown tools pass unless ``registered_only`` (availability is checked later
+    by ``validate_tool_call`` / ``execute_tool``).
+    """
+    from src.core.tool_manager import tool_manager, ToolArgumentError  # lazy: avoids import cycle
+
+    if not tool_manager.has_tool(name):
+        return f"tool {name!r} is not registered" if registered_only else None
+    try:
+        tool_manager.validate_arguments(name, arguments)
+    except ToolArgumentError as e:
+        return str(e)
+    return None
+
+
+def parse_tool_call_json(raw: str) -> Optional[dict]:
+    """Parses the JSON body of a tool call, repairing common mistakes when needed.
+
+    Strict JSON is accepted as-is. Otherwise a bounded repair pass is tried
+    (see ``_repair_json``); the repaired call is only accepted if it targets a
+    registered tool and its arguments pass the tool's schema validator.
+    Outcomes are counted in ``get_repair_stats()``.
+
+    Args:
+        raw: Text between the ``<tool_call>`` tags.
+
+    Returns:
+        The parsed call dict, or None if it could not be recovered.
+    """
+    try:
+        data = json.loads(raw)
+        _repair_stats["parsed"] += 1
+        return data
+    except json.JSONDecodeError as e:
+        error = e
+
+    data = None
+    if len(raw) <= MAX_REPAIR_CHARS:
+        try:
+            data = json.loads(_repair_json(raw))
+        except Exception:
+            data = None  # any failure inside the repair means "could not repair"
+    if (
+        isinstance(data, dict)
+        and isinstance(data.get("name"), str)
+        and isinstance(data.get("arguments"), dict)
+        and _check_registered_arguments(data["name"], data["arguments"], registered_only=True) is None
+    ):
+        _repair_stats["repaired"] += 1
+        logger.info(
+            f"tool_parser: repaired malformed tool_call for {data['name']!r} "
+            f"(repair success rate {_repair_rate():.0%}) — raw={raw!r}"
+        )
+        return data
+
+    _repair_stats["failed"] += 1
+    logger.warning(
+        f"tool_parser: failed to parse tool_call JSON: {error} "
+        f"(repair success rate {_repair_rate():.0%}) — raw={raw!r}"
+    )
+    return None
+
+
+def _repair_rate() -> float:
+    attempts = _repair_stats["repaired"] + _repair_stats["failed"]
+    return _repair_stats["repaired"] / attempts if attempts else 0.0
+
+
+def get_repair_stats() -> dict:
+    """Counters for strict parses, successful repairs and unrecoverable tool calls."""
+    return {**_repair_stats, "repair_success_rate": round(_repair_rate(), 3)}
+
 
 def extract_tool_calls(text: str) -> list[dict]:
     """Parse all <tool_call>...</tool_call> blocks from text.
 
-    Each block must contain valid JSON with a "name" (str) and
-    "arguments" (dict) field. Invalid or malformed blocks are skipped
+    Each block must contain JSON with a "name" (str) and "arguments"
+    (dict) field. Slightly malformed JSON is repaired when possible
+    (see ``parse_tool_call_json``); unrecoverable blocks are skipped
     with a warning log.
 
     Args:
@@ -32,11 +185,8 @@ def extract_tool_calls(text: str) -> list[dict]:
     """
     results = []
     for match in TOOL_CALL_PATTERN.finditer(text):
-        raw = match.group(1)
-        try:
-            data = json.loads(raw)
-        except json.JSONDecodeError as e:
-            logger.warning(f"tool_parser: failed to parse tool_call JSON: {e} — raw={raw!r}")
+        data = parse_tool_call_json(match.group(1))
+        if not isinstance(data, dict):
             continue
 
         name = data.get("name")
@@ -54,15 +204,11 @@ def extract_tool_calls(text: str) -> list[dict]:
             logger.warning(f"tool_parser: 'arguments' must be a dict, got {type(arguments).__name__!r} for tool {name!r} — skipping")
             continue
 
-        # Tool-specific argument validation
-        if name == "web_search":
-            query = arguments.get("query")
-            if not isinstance(query, str) or not query.strip():
-                logger.warning(
-                    f"tool_parser: 'web_search' requires a non-empty string 'query' argument, "
-                    f"got {query!r} — skipping"
-                )
-                continue
+        # Schema validation (precompiled per tool at registration)
+        error = _check_registered_arguments(name, arguments, registered_only=False)
+        if error:
+            logger.warning(f"tool_parser: invalid arguments for tool {name!r}: {error} — skipping")
+            continue
 
         results.append({"name": name, "arguments": arguments})
 
@@ -95,6 +241,21 @@ def validate_tool_call(tool_call: dict, available_tools: list[str]) -> tuple[boo
     return True, ""
 
 
+def tag_free_prefix_len(text: str) -> int:
+    """Length of the leading part of ``text`` that can't belong to a <tool_call> tag.
+
+    Stops at the first opening tag, or at a trailing fragment that may still
+    grow into one (e.g. ``"<tool_c"``), so streamed text never leaks a tag.
+    """
+    start = text.find(TOOL_CALL_OPEN)
+    if start != -1:
+        return start
+    last_lt = text.rfind("<")
+    if last_lt != -1 and TOOL_CALL_OPEN.startswith(text[last_lt:]):
+        return last_lt
+    return len(text)
+
+
 def remove_tool_calls_from_text(text: str) -> str:
     """Remove all <tool_call>...</tool_call> blocks from text.
 
@@ -2,6 +2,16 @@ import pytest
 import asyncio
 import os
 
+# Settings without a default: take the placeholders of .env.example, so the
+# suite runs without a local .env (real values, if any, still win).
+_ENV_EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env.example")
+with open(_ENV_EXAMPLE, encoding="utf-8") as _env_file:
+    for _line in _env_file:
+        _line = _line.strip()
+        if _line and not _line.startswith("#") and "=" in _line:
+            _key, _value = _line.split("=", 1)
+            os.environ.setdefault(_key.strip(), _value.strip())
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create an instance of the default event loop for each test case."""
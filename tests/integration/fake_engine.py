@@ -0,0 +1,66 @@
+"""
+In-memory stand-in for the InferenceCenter WebSocket.
+
+Plugged into ``InferenceClient.websocket`` so the real ``_read_loop`` demuxes
+its frames: every ``infer`` request is answered with the scripted tokens as
+``{"op": "token"}`` frames followed by ``{"op": "end"}``. An ``abort`` stops
+that session's generation and is acknowledged with ``{"op": "abort"}``.
+"""
+import asyncio
+import json
+from typing import Dict, List, Optional
+
+
+class FakeEngineSocket:
+    def __init__(self, tokens: List[str], token_delay: float = 0.0):
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self.open = True
+        self.sent: List[dict] = []
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def send(self, message: str) -> None:
+        data = json.loads(message)
+        self.sent.append(data)
+        if data.get("op") == "infer":
+            self._tasks[data["session_id"]] = asyncio.create_task(self._generate(data["session_id"]))
+        elif data.get("op") == "abort":
+            task = self._tasks.pop(data["session_id"], None)
+            if task is not None and not task.done():
+                task.cancel()
+                self._inbox.put_nowait(json.dumps({"op": "abort", "session_id": data["session_id"]}))
+
+    async def _generate(self, session_id: str) -> None:
+        for token in self.tokens:
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            frame = {"op": "token", "session_id": session_id, "content": token}
+            self._inbox.put_nowait(json.dumps(frame, ensure_ascii=False))
+        self._inbox.put_nowait(json.dumps({"op": "end", "session_id": session_id}))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        message: Optional[str] = await self._inbox.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+    async def close(self) -> None:
+        self.open = False
+        for task in self._tasks.values():
+            task.cancel()
+        self._inbox.put_nowait(None)
+
+
+class FakeMemory:
+    def __init__(self):
+        self.saved = []
+
+    async def save_message(self, **kwargs):
+        self.saved.append(kwargs)
+
+    async def mark_conversation_error(self, conversation_id, user_id):
+        pass
@@ -0,0 +1,94 @@
+"""
+Tiny stdio MCP server for tests (newline-delimited JSON-RPC, no SDK needed).
+
+Tools:
+  - echo(text):          returns "<pid>:<text>"
+  - sleep(seconds):      blocks this process, then returns its pid
+  - crash():             exits the process without answering
+  - grow(tool):          adds a tool and sends notifications/tools/list_changed
+
+Env:
+  MOCK_MCP_STARTUP_DELAY  seconds to wait before answering `initialize`.
+  MOCK_MCP_VERSION        serverInfo.version reported by `initialize`.
+  MOCK_MCP_EXTRA_TOOLS    comma-separated names of extra (no-argument) tools.
+"""
+import json
+import os
+import sys
+import time
+
+TOOLS = [
+    {
+        "name": "echo",
+        "description": "Echoes text back",
+        "inputSchema": {"type": "object", "properties": {"text": {"type": "string"}}, "required": ["text"]},
+    },
+    {
+        "name": "sleep",
+        "description": "Sleeps for a while",
+        "inputSchema": {"type": "object", "properties": {"seconds": {"type": "number"}}, "required": ["seconds"]},
+    },
+    {"name": "crash", "description": "Kills the server", "inputSchema": {"type": "object", "properties": {}}},
+    {
+        "name": "grow",
+        "description": "Adds a tool",
+        "inputSchema": {"type": "object", "properties": {"tool": {"type": "string"}}, "required": ["tool"]},
+    },
+]
+
+
+def _simple_tool(name: str) -> dict:
+    return {"name": name, "description": f"Extra tool {name}", "inputSchema": {"type": "object", "properties": {}}}
+
+
+def _send(message: dict) -> None:
+    sys.stdout.write(json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+def _text(request_id, text: str) -> None:
+    _send({"jsonrpc": "2.0", "id": request_id, "result": {"content": [{"type": "text", "text": text}], "isError": False}})
+
+
+def main() -> None:
+    extra = [name for name in os.environ.get("MOCK_MCP_EXTRA_TOOLS", "").split(",") if name]
+    TOOLS.extend(_simple_tool(name) for name in extra)
+    for line in sys.stdin:
+        message = json.loads(line)
+        request_id = message.get("id")
+        method = message.get("method")
+        if request_id is None:
+            continue  # notification
+        if method == "initialize":
+            time.sleep(float(os.environ.get("MOCK_MCP_STARTUP_DELAY", "0")))
+            _send({"jsonrpc": "2.0", "id": request_id, "result": {
+                "protocolVersion": message["params"]["protocolVersion"],
+                "capabilities": {"tools": {"listChanged": True}},
+                "serverInfo": {"name": "mock-mcp", "version": os.environ.get("MOCK_MCP_VERSION", "1.0")},
+            }})
+        elif method == "tools/list":
+            _send({"jsonrpc": "2.0", "id": request_id, "result": {"tools": TOOLS}})
+        elif method == "tools/call":
+            name = message["params"]["name"]
+            arguments = message["params"].get("arguments") or {}
+            if name == "echo":
+                _text(request_id, f"{os.getpid()}:{arguments['text']}")
+            elif name == "sleep":
+                time.sleep(float(arguments["seconds"]))
+                _text(request_id, str(os.getpid()))
+            elif name == "crash":
+                os._exit(1)
+            elif name == "grow":
+                TOOLS.append(_simple_tool(arguments["tool"]))
+                _send({"jsonrpc": "2.0", "method": "notifications/tools/list_changed"})
+                _text(request_id, "grown")
+            else:
+                _text(request_id, str(os.getpid()))
+        elif method == "ping":
+            _send({"jsonrpc": "2.0", "id": request_id, "result": {}})
+        else:
+            _send({"jsonrpc": "2.0", "id": request_id, "error": {"code": -32601, "message": f"Unknown method {method}"}})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Local WebSocket stand-in for the STT service.
+
+Each connection plays a script of ``(delay_seconds, message)`` steps, the way a
+streaming recogniser emits partial transcripts while the user talks and a
+final one after end-of-speech detection.
+"""
+import asyncio
+import json
+from typing import List, Optional, Tuple
+
+import websockets
+
+Script = List[Tuple[float, dict]]
+
+
+def utterance(words: List[str], final_text: str, word_gap: float, finalize_delay: float) -> Script:
+    """Partials growing one word at a time, then the final transcript after ``finalize_delay``."""
+    script: Script = []
+    for i in range(1, len(words) + 1):
+        script.append((word_gap, {"text": " ".join(words[:i]), "final": False}))
+    script.append((finalize_delay, {"text": final_text, "final": True}))
+    return script
+
+
+class MockSTTServer:
+    def __init__(self, script: Script):
+        self.script = script
+        self.port: Optional[int] = None
+        self.done = asyncio.Event()
+        self._server = None
+
+    async def start(self) -> str:
+        self._server = await websockets.serve(self._handler, "127.0.0.1", 0)
+        self.port = next(iter(self._server.sockets)).getsockname()[1]
+        return f"ws://127.0.0.1:{self.port}"
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handler(self, websocket):
+        for delay, message in self.script:
+            await asyncio.sleep(delay)
+            await websocket.send(json.dumps(message))
+        self.done.set()
+        await websocket.wait_closed()
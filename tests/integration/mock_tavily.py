@@ -0,0 +1,74 @@
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MockTavilyServer:
+    """Minimal HTTP/1.1 keep-alive stand-in for the Tavily /search endpoint.
+
+    `delays` is consumed one entry per request (seconds to wait before
+    answering); once exhausted, requests are answered immediately.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self.server = None
+        self.delays = []
+        self.requests = []
+        self.connections = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handler, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f"Mock Tavily started on {self.url}")
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def handler(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                payload = json.loads(body or b"{}")
+                self.requests.append(payload)
+
+                delay = self.delays.pop(0) if self.delays else 0
+                if delay:
+                    await asyncio.sleep(delay)
+
+                response = json.dumps({
+                    "query": payload.get("query"),
+                    "results": [
+                        {"title": f"Result for {payload.get('query')}", "url": "http://example.com", "content": "ok"}
+                    ],
+                }).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(response)}\r\n\r\n".encode()
+                    + response
+                )
+                await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,179 @@
+"""
+Minimal in-process MQTT 3.1.1 broker for tests (no external broker needed).
+
+Supports CONNECT, SUBSCRIBE/UNSUBSCRIBE (with + and # wildcards and
+$share/<group>/<filter> shared subscriptions, delivered round-robin),
+PUBLISH QoS 0/1 (delivered to subscribers at QoS 0), PINGREQ and DISCONNECT.
+Like a real broker, a CONNECT reusing a connected client id takes over the
+session and disconnects the previous connection.
+"""
+import asyncio
+import itertools
+import struct
+from typing import Dict, List, Optional, Tuple
+
+CONNECT, CONNACK, PUBLISH, PUBACK = 1, 2, 3, 4
+SUBSCRIBE, SUBACK, UNSUBSCRIBE, UNSUBACK = 8, 9, 10, 11
+PINGREQ, PINGRESP, DISCONNECT = 12, 13, 14
+
+
+def _encode_length(length: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte, length = length % 128, length // 128
+        out.append(byte | (0x80 if length else 0))
+        if not length:
+            return bytes(out)
+
+
+def _packet(packet_type: int, flags: int, body: bytes) -> bytes:
+    return bytes([(packet_type << 4) | flags]) + _encode_length(len(body)) + body
+
+
+def _string(value: str) -> bytes:
+    raw = value.encode("utf-8")
+    return struct.pack("!H", len(raw)) + raw
+
+
+def _read_string(data: bytes, pos: int) -> Tuple[str, int]:
+    (length,) = struct.unpack_from("!H", data, pos)
+    return data[pos + 2:pos + 2 + length].decode("utf-8"), pos + 2 + length
+
+
+def topic_matches(topic_filter: str, topic: str) -> bool:
+    filter_parts, topic_parts = topic_filter.split("/"), topic.split("/")
+    for i, part in enumerate(filter_parts):
+        if part == "#":
+            return True
+        if i >= len(topic_parts) or (part != "+" and part != topic_parts[i]):
+            return False
+    return len(filter_parts) == len(topic_parts)
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.client_id: Optional[str] = None
+        self.filters: List[str] = []
+
+    def send(self, data: bytes) -> None:
+        if not self.writer.is_closing():
+            self.writer.write(data)
+
+    def close(self) -> None:
+        if not self.writer.is_closing():
+            self.writer.close()
+
+
+class MQTTBroker:
+    def __init__(self):
+        self.port: Optional[int] = None
+        self.connects: List[str] = []              # client ids, in CONNECT order
+        self.takeovers = 0                         # sessions kicked out by a reused client id
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Dict[str, _Connection] = {}
+        self._round_robin: Dict[Tuple[str, str], "itertools.count"] = {}
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        for conn in list(self._clients.values()):
+            conn.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _read_packet(self, reader: asyncio.StreamReader) -> Tuple[int, int, bytes]:
+        header = (await reader.readexactly(1))[0]
+        length, multiplier = 0, 1
+        while True:
+            byte = (await reader.readexactly(1))[0]
+            length += (byte & 0x7F) * multiplier
+            multiplier *= 128
+            if not byte & 0x80:
+                break
+        return header >> 4, header & 0x0F, await reader.readexactly(length)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        conn = _Connection(reader, writer)
+        try:
+            while True:
+                packet_type, flags, body = await self._read_packet(reader)
+                if packet_type == CONNECT:
+                    self._on_connect(conn, body)
+                elif packet_type == SUBSCRIBE:
+                    self._on_subscribe(conn, body)
+                elif packet_type == UNSUBSCRIBE:
+                    (packet_id,) = struct.unpack_from("!H", body, 0)
+                    pos = 2
+                    while pos < len(body):
+                        topic_filter, pos = _read_string(body, pos)
+                        if topic_filter in conn.filters:
+                            conn.filters.remove(topic_filter)
+                    conn.send(_packet(UNSUBACK, 0, struct.pack("!H", packet_id)))
+                elif packet_type == PUBLISH:
+                    self._on_publish(conn, flags, body)
+                elif packet_type == PINGREQ:
+                    conn.send(_packet(PINGRESP, 0, b""))
+                elif packet_type == DISCONNECT:
+                    break
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if conn.client_id is not None and self._clients.get(conn.client_id) is conn:
+                del self._clients[conn.client_id]
+            conn.close()
+
+    def _on_connect(self, conn: _Connection, body: bytes) -> None:
+        _, pos = _read_string(body, 0)            # protocol name
+        pos += 4                                   # level, flags, keepalive
+        client_id, _ = _read_string(body, pos)
+        previous = self._clients.get(client_id)
+        if previous is not None:
+            self.takeovers += 1
+            previous.close()
+        conn.client_id = client_id
+        self._clients[client_id] = conn
+        self.connects.append(client_id)
+        conn.send(_packet(CONNACK, 0, b"\x00\x00"))
+
+    def _on_subscribe(self, conn: _Connection, body: bytes) -> None:
+        (packet_id,) = struct.unpack_from("!H", body, 0)
+        pos, granted = 2, bytearray()
+        while pos < len(body):
+            topic_filter, pos = _read_string(body, pos)
+            qos = body[pos] & 0x03
+            pos += 1
+            conn.filters.append(topic_filter)
+            granted.append(min(qos, 1))
+        conn.send(_packet(SUBACK, 0, struct.pack("!H", packet_id) + bytes(granted)))
+
+    def _on_publish(self, conn: _Connection, flags: int, body: bytes) -> None:
+        qos = (flags >> 1) & 0x03
+        topic, pos = _read_string(body, 0)
+        if qos:
+            (packet_id,) = struct.unpack_from("!H", body, pos)
+            pos += 2
+            conn.send(_packet(PUBACK, 0, struct.pack("!H", packet_id)))
+        self.publish(topic, body[pos:])
+
+    def publish(self, topic: str, payload: bytes) -> None:
+        """Delivers to every plain subscriber and to one member of each shared group."""
+        message = _packet(PUBLISH, 0, _string(topic) + payload)
+        groups: Dict[Tuple[str, str], List[_Connection]] = {}
+        for client in list(self._clients.values()):
+            for topic_filter in client.filters:
+                if topic_filter.startswith("$share/"):
+                    _, group, inner = topic_filter.split("/", 2)
+                    if topic_matches(inner, topic):
+                        groups.setdefault((group, inner), []).append(client)
+                elif topic_matches(topic_filter, topic):
+                    client.send(message)
+        for key, members in groups.items():
+            counter = self._round_robin.setdefault(key, itertools.count())
+            members[next(counter) % len(members)].send(message)
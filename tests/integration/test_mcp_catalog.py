@@ -0,0 +1,113 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+from src.core.tool_manager import ROLE_USER, ToolManager
+from src.services.mcp_catalog import MCPCatalogStore
+from src.services.mcp_client import MCPClientManager
+
+MOCK_SERVER = os.path.join(os.path.dirname(__file__), "mock_mcp_server.py")
+
+
+def _server(**env) -> dict:
+    return {"command": sys.executable, "args": [MOCK_SERVER], "env": {**os.environ, **env}, "pool_size": 1}
+
+
+async def _restart(store: MCPCatalogStore, tm: ToolManager, **env):
+    """Simulates an orchestrator restart: a fresh manager over the same snapshot directory."""
+    manager = MCPClientManager(catalog_store=store)
+    from_snapshot = await manager.start_stdio_server("home", tm=tm, **_server(**env))
+    return manager, from_snapshot
+
+
+async def _wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.05)
+
+
+@pytest.mark.asyncio
+async def test_cold_start_writes_snapshot(tmp_path):
+    store = MCPCatalogStore(str(tmp_path))
+    tm = ToolManager()
+    manager, from_snapshot = await _restart(store, tm)
+    try:
+        assert not from_snapshot
+        assert tm.get_tool_schema("home_echo")["required_role"] == "public"
+        with open(store.path("home"), encoding="utf-8") as f:
+            data = json.load(f)
+        assert data["server_version"] == "mock-mcp/1.0"
+        assert {t["name"] for t in data["tools"]} == {"echo", "sleep", "crash", "grow"}
+        assert manager.get_stats()["home"]["catalog_version"] == data["version"]
+    finally:
+        await manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_warm_start_registers_before_handshake(tmp_path):
+    store = MCPCatalogStore(str(tmp_path))
+    manager, _ = await _restart(store, ToolManager())
+    await manager.close_all()
+
+    tm = ToolManager()
+    start = time.perf_counter()
+    manager, from_snapshot = await _restart(store, tm, MOCK_MCP_STARTUP_DELAY="1.0")
+    elapsed = time.perf_counter() - start
+    try:
+        assert from_snapshot
+        assert elapsed < 0.5  # the 1 s handshake happens in the background
+        assert tm.has_tool("home_echo")
+
+        await asyncio.gather(*manager._background)
+        assert manager._pools["home"]._catalog is None  # same server identity: catalog not fetched
+        assert (await tm.execute_tool("home_echo", text="hola")).endswith(":hola")
+    finally:
+        await manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_changed_server_refreshes_catalog(tmp_path):
+    store = MCPCatalogStore(str(tmp_path))
+    manager, _ = await _restart(store, ToolManager())
+    await manager.close_all()
+
+    tm = ToolManager()
+    manager, from_snapshot = await _restart(store, tm, MOCK_MCP_VERSION="2.0", MOCK_MCP_EXTRA_TOOLS="dim")
+    try:
+        assert from_snapshot and not tm.has_tool("home_dim")
+        await asyncio.gather(*manager._background)
+
+        assert tm.has_tool("home_dim")
+        snapshot = store.load("home")
+        assert snapshot.server_version == "mock-mcp/2.0"
+        assert "dim" in {t["name"] for t in snapshot.tools}
+    finally:
+        await manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_list_changed_notification_registers_new_tools(tmp_path):
+    store = MCPCatalogStore(str(tmp_path))
+    tm = ToolManager()
+    manager = MCPClientManager(catalog_store=store)
+    try:
+        await manager.start_stdio_server("home", tm=tm, required_role=ROLE_USER, **_server())
+        await tm.execute_tool("home_grow", tool="blinds")
+
+        await _wait_for(lambda: tm.has_tool("home_blinds"))
+        assert tm.get_tool_schema("home_blinds")["required_role"] == ROLE_USER
+        assert "blinds" in {t["name"] for t in store.load("home").tools}
+    finally:
+        await manager.close_all()
+
+
+def test_corrupt_snapshot_is_ignored(tmp_path):
+    store = MCPCatalogStore(str(tmp_path))
+    with open(store.path("home"), "w", encoding="utf-8") as f:
+        f.write("{not json")
+    assert store.load("home") is None
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+import pytest_asyncio
+
+from src.core.tool_manager import ToolManager
+from src.services.mcp_client import MCPClientManager
+
+MOCK_SERVER = os.path.join(os.path.dirname(__file__), "mock_mcp_server.py")
+
+
+def _server(**env) -> dict:
+    return {"command": sys.executable, "args": [MOCK_SERVER], "env": {**os.environ, **env}}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def manager():
+    mcp = MCPClientManager()
+    yield mcp
+    await mcp.close_all()
+
+
+@pytest.mark.asyncio
+async def test_calls_are_balanced_across_sessions(manager):
+    """Two slow calls run in parallel on two child processes instead of queueing on one pipe."""
+    await manager.connect_stdio_server("mock", pool_size=2, **_server())
+    tm = ToolManager()
+    await manager.register_mcp_tools("mock", tm)
+
+    start = time.perf_counter()
+    pids = await asyncio.gather(*(tm.execute_tool("mock_sleep", seconds=0.5) for _ in range(2)))
+    elapsed = time.perf_counter() - start
+
+    assert len(set(pids)) == 2
+    assert elapsed < 0.9
+    assert manager.get_stats()["mock"]["live_sessions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_servers_connect_concurrently(manager):
+    servers = {f"slow{i}": _server(MOCK_MCP_STARTUP_DELAY="0.5") for i in range(3)}
+    for config in servers.values():
+        config["pool_size"] = 1
+
+    start = time.perf_counter()
+    errors = await manager.connect_servers(servers)
+    elapsed = time.perf_counter() - start
+
+    assert errors == {name: None for name in servers}
+    assert elapsed < 1.2  # sequential startup would take >= 1.5 s
+
+
+@pytest.mark.asyncio
+async def test_lazy_connect_and_cached_catalog(manager):
+    await manager.connect_stdio_server("lazy", pool_size=1, lazy=True, **_server())
+    assert manager.get_stats()["lazy"]["live_sessions"] == 0
+
+    tm = ToolManager()
+    await manager.register_mcp_tools("lazy", tm)
+    assert manager.get_stats()["lazy"]["live_sessions"] == 1
+
+    pool = manager._pools["lazy"]
+    assert await pool.list_tools() is await pool.list_tools()
+    assert (await tm.execute_tool("lazy_echo", text="hola")).endswith(":hola")
+
+
+@pytest.mark.asyncio
+async def test_dead_session_is_reconnected(manager):
+    await manager.connect_stdio_server("fragile", pool_size=1, **_server())
+    tm = ToolManager()
+    await manager.register_mcp_tools("fragile", tm)
+
+    first_pid = (await tm.execute_tool("fragile_echo", text="a")).split(":")[0]
+    with pytest.raises(RuntimeError):
+        await tm.execute_tool("fragile_crash")
+
+    second_pid = (await tm.execute_tool("fragile_echo", text="b")).split(":")[0]
+    assert second_pid != first_pid
+    assert manager.get_stats()["fragile"]["sessions_opened"] == 2
+
+
+@pytest.mark.asyncio
+async def test_calls_go_to_live_sessions_while_one_reconnects(manager):
+    await manager.connect_stdio_server("pair", pool_size=2, **_server())
+    tm = ToolManager()
+    await manager.register_mcp_tools("pair", tm)
+
+    with pytest.raises(RuntimeError):
+        await tm.execute_tool("pair_crash")
+    pool = manager._pools["pair"]
+    assert pool.live_sessions == 1
+
+    start = time.perf_counter()
+    await tm.execute_tool("pair_echo", text="a")
+    assert time.perf_counter() - start < 0.5
+
+    while pool.live_sessions < 2:
+        await asyncio.sleep(0.05)
+    assert manager.get_stats()["pair"]["sessions_opened"] == 3
+
+
+@pytest.mark.asyncio
+async def test_unreachable_server_fails_fast_with_backoff(manager, monkeypatch):
+    from src.core.config import settings
+    from src.services.mcp_client import MCPServerUnavailableError
+
+    monkeypatch.setattr(settings, "MCP_RECONNECT_BACKOFF", 60.0)
+    await manager.connect_stdio_server("gone", pool_size=2, lazy=True, command="/nonexistent/mcp-server")
+    pool = manager._pools["gone"]
+
+    with pytest.raises(MCPServerUnavailableError, match="unavailable"):
+        await pool.call_tool("echo", {"text": "a"})
+    opened = pool.get_stats()["sessions_opened"]
+
+    # In backoff: no respawn attempt per call, just the clear error
+    with pytest.raises(MCPServerUnavailableError):
+        await asyncio.wait_for(pool.call_tool("echo", {"text": "b"}), 0.1)
+    assert pool.get_stats()["sessions_opened"] == opened
+    assert pool.get_stats()["reconnecting"]
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import time
+
+import aiomqtt
+import pytest
+import pytest_asyncio
+
+from src.core.config import settings
+from src.services.mqtt import MQTTService
+from tests.integration.mqtt_broker import MQTTBroker
+
+
+@pytest_asyncio.fixture(scope="function")
+async def broker(monkeypatch):
+    broker = MQTTBroker()
+    port = await broker.start()
+    monkeypatch.setattr(settings, "MQTT_BROKER_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "MQTT_BROKER_PORT", port)
+    monkeypatch.setattr(settings, "MQTT_SHARED_GROUP", None)
+    monkeypatch.setattr(settings, "MQTT_UNIQUE_CLIENT_ID", True)
+    yield broker
+    await broker.stop()
+
+
+def _replica(name: str, handled: list, **kwargs) -> MQTTService:
+    """MQTTService whose inference step answers "<name> ok." and records what it handled."""
+    service = MQTTService(inference_client=None, jota_controller=None, **kwargs)
+
+    async def fake_process(client_id, text):
+        handled.append((name, client_id, text))
+        await asyncio.sleep(0.01)
+        yield f"{name} ok."
+
+    service._process = fake_process
+    return service
+
+
+async def _wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.02)
+
+
+async def _run_devices(broker: MQTTBroker, replicas, commands) -> list:
+    """Starts the replicas, sends (device, text) commands and returns the final response markers."""
+    subscribers = len(replicas)
+    for replica in replicas:
+        await replica.connect()
+    await _wait_for(lambda: sum(bool(c.filters) for c in broker._clients.values()) == subscribers)
+
+    finals = []
+    async with aiomqtt.Client("127.0.0.1", port=broker.port, identifier="devices") as devices:
+        await devices.subscribe(f"{settings.MQTT_RESPONSE_TOPIC_PREFIX}/#")
+        for device, text in commands:
+            payload = json.dumps({"client_id": device, "text": text})
+            await devices.publish(settings.MQTT_SUBSCRIBE_TOPIC, payload, qos=1)
+
+        async def collect():
+            async for message in devices.messages:
+                data = json.loads(message.payload)
+                if data["final"]:
+                    finals.append(data)
+                    if len(finals) == len(commands):
+                        return
+
+        await asyncio.wait_for(collect(), timeout=5.0)
+    for replica in replicas:
+        await replica.shutdown()
+    return finals
+
+
+@pytest.mark.asyncio
+async def test_shared_subscription_spreads_commands(broker, monkeypatch):
+    monkeypatch.setattr(settings, "MQTT_SHARED_GROUP", "jota")
+    handled = []
+    replicas = [_replica("a", handled), _replica("b", handled)]
+    commands = [(f"device-{i}", "hola") for i in range(10)]
+
+    finals = await _run_devices(broker, replicas, commands)
+
+    assert len(finals) == 10
+    assert len(handled) == 10  # every command processed exactly once
+    assert {name for name, _, _ in handled} == {"a", "b"}
+    assert len(set(broker.connects)) == len(broker.connects)
+    assert broker.takeovers == 0
+
+
+@pytest.mark.asyncio
+async def test_device_affinity_pins_each_device_to_one_replica(broker):
+    handled = []
+    replicas = [
+        _replica("a", handled, replica_index=0, replica_count=2),
+        _replica("b", handled, replica_index=1, replica_count=2),
+    ]
+    commands = [(f"device-{i}", text) for text in ("uno", "dos", "tres") for i in range(6)]
+
+    finals = await _run_devices(broker, replicas, commands)
+
+    assert len(finals) == len(commands)
+    assert len(handled) == len(commands)
+    owners = {}
+    for name, device, _ in handled:
+        owners.setdefault(device, set()).add(name)
+    assert all(len(names) == 1 for names in owners.values())
+    assert {name for names in owners.values() for name in names} == {"a", "b"}
+    for device in owners:  # per-device order preserved
+        assert [text for _, d, text in handled if d == device] == ["uno", "dos", "tres"]
+
+
+@pytest.mark.asyncio
+async def test_fixed_client_id_collides(broker, monkeypatch):
+    monkeypatch.setattr(settings, "MQTT_UNIQUE_CLIENT_ID", False)
+    replicas = [_replica("a", []), _replica("b", [])]
+    for replica in replicas:
+        await replica.connect()
+    try:
+        await _wait_for(lambda: broker.takeovers >= 1)
+    finally:
+        for replica in replicas:
+            await replica.shutdown()
+
+
+def test_replica_index_validated():
+    with pytest.raises(ValueError):
+        MQTTService(inference_client=None, jota_controller=None, replica_index=2, replica_count=2)
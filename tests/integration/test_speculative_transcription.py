@@ -0,0 +1,184 @@
+"""
+Speculative inference on stable partial transcripts, against a local
+WebSocket stand-in for the STT stream (tests/integration/mock_stt_server.py).
+"""
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+from src.core.config import settings
+from src.services import transcription
+from src.services.transcription import TranscriptionClient, normalize_transcript
+from tests.integration.mock_stt_server import MockSTTServer, utterance
+
+FIRST_TOKEN_DELAY = 0.15   # engine time to first token
+FINALIZE_DELAY = 0.4       # STT end-of-speech detection after the last word
+
+
+class FakeInferenceClient:
+    def __init__(self):
+        self.created = []
+        self.aborted = []
+        self.closed = []
+
+    async def create_session(self):
+        session_id = f"s{len(self.created)}"
+        self.created.append(session_id)
+        return session_id
+
+    async def abort_session(self, session_id):
+        self.aborted.append(session_id)
+
+    async def close_session(self, session_id):
+        self.closed.append(session_id)
+
+
+class FakeController:
+    """Answers "<prompt>: ok." after FIRST_TOKEN_DELAY."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def handle_input(self, payload):
+        self.prompts.append(payload["content"])
+        await asyncio.sleep(FIRST_TOKEN_DELAY)
+        yield payload["content"]
+        yield ": ok."
+
+
+class FakeBus:
+    def __init__(self):
+        self.events = []
+
+    async def publish(self, event):
+        event["published_at"] = time.monotonic()
+        self.events.append(event)
+        return 1
+
+
+@pytest_asyncio.fixture
+async def bus(monkeypatch):
+    bus = FakeBus()
+    monkeypatch.setattr(transcription, "event_bus", bus)
+    monkeypatch.setattr(settings, "TRANSCRIPTION_STABLE_MS", 100)
+    monkeypatch.setattr(settings, "TRANSCRIPTION_SPECULATION_MIN_CHARS", 8)
+    return bus
+
+
+async def _listen(script, bus):
+    """Streams the script through a TranscriptionClient; returns (client, inference, first token delay after final)."""
+    server = MockSTTServer(script)
+    url = await server.start()
+    inference = FakeInferenceClient()
+    client = TranscriptionClient(inference_client=inference, jota_controller=FakeController(), url=url)
+    task = asyncio.create_task(client.connect_and_listen())
+    try:
+        await asyncio.wait_for(server.done.wait(), 5)
+        for _ in range(100):
+            if bus.events:
+                break
+            await asyncio.sleep(0.01)
+        event = bus.events[-1]
+        tokens = [token async for token in event["response"].stream()]
+        first_token_delay = event["response"].first_token_at - event["published_at"]
+        return client, inference, tokens, max(0.0, first_token_delay)
+    finally:
+        client.stop()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await server.stop()
+
+
+WORDS = ["cuéntame", "algo", "sobre", "los", "volcanes"]
+
+
+class TestSpeculation:
+    @pytest.mark.asyncio
+    async def test_matching_final_keeps_speculative_session(self, bus):
+        script = utterance(WORDS, "Cuéntame algo sobre los volcanes.", word_gap=0.03, finalize_delay=FINALIZE_DELAY)
+        client, inference, tokens, first_token_delay = await _listen(script, bus)
+
+        assert inference.created == ["s0"]
+        assert inference.aborted == []
+        assert "".join(tokens) == "cuéntame algo sobre los volcanes: ok."
+        # The engine answered while the STT was still finalising
+        assert first_token_delay < FIRST_TOKEN_DELAY / 2
+        stats = client.get_stats()
+        assert stats["speculations_kept"] == 1
+        assert stats["avg_head_start_ms"] > 0
+
+    @pytest.mark.asyncio
+    async def test_mismatched_final_aborts_and_restarts(self, bus):
+        script = utterance(WORDS, "Cuéntame algo sobre los volcanes de Canarias.", word_gap=0.03, finalize_delay=FINALIZE_DELAY)
+        client, inference, tokens, first_token_delay = await _listen(script, bus)
+
+        assert inference.created == ["s0", "s1"]
+        assert inference.aborted == ["s0"]
+        assert "".join(tokens) == "Cuéntame algo sobre los volcanes de Canarias.: ok."
+        assert first_token_delay >= FIRST_TOKEN_DELAY * 0.8
+        assert client.get_stats()["speculations_aborted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_partial_change_aborts_running_speculation(self, bus):
+        # A pause long enough to speculate on "cuéntame algo sobre", then the user keeps talking
+        script = utterance(WORDS[:3], "", word_gap=0.03, finalize_delay=0)[:-1]
+        script.append((0.3, {"text": "cuéntame algo sobre los volcanes", "final": False}))
+        script.append((FINALIZE_DELAY, {"text": "cuéntame algo sobre los volcanes", "final": True}))
+        client, inference, tokens, _ = await _listen(script, bus)
+
+        assert inference.aborted == ["s0"]
+        assert inference.created == ["s0", "s1"]
+        assert "".join(tokens) == "cuéntame algo sobre los volcanes: ok."
+        stats = client.get_stats()
+        assert stats["speculations_started"] == 2
+        assert stats["speculations_kept"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_speculation_infers_on_final_only(self, bus, monkeypatch):
+        monkeypatch.setattr(settings, "TRANSCRIPTION_SPECULATION_ENABLED", False)
+        script = utterance(WORDS, "Cuéntame algo sobre los volcanes.", word_gap=0.03, finalize_delay=FINALIZE_DELAY)
+        client, inference, tokens, _ = await _listen(script, bus)
+
+        assert inference.created == ["s0"]
+        assert client.get_stats()["speculations_started"] == 0
+        assert "".join(tokens) == "Cuéntame algo sobre los volcanes.: ok."
+
+
+class TestEventDelivery:
+    @pytest.mark.asyncio
+    async def test_runs_start_in_the_subscriber_and_dropped_ones_are_aborted(self, monkeypatch):
+        from src.core.events import EventBus
+
+        bus = EventBus()
+        monkeypatch.setattr(transcription, "event_bus", bus)
+        monkeypatch.setattr(settings, "TRANSCRIPTION_SPECULATION_ENABLED", False)
+        gate = asyncio.Event()
+        answers = []
+
+        async def consume(event):
+            await gate.wait()
+            answers.append("".join([token async for token in event["response"].stream()]))
+
+        bus.subscribe(consume, topic="transcription_input", workers=1, queue_size=1, overflow="drop_oldest")
+        inference = FakeInferenceClient()
+        controller = FakeController()
+        client = TranscriptionClient(inference_client=inference, jota_controller=controller, url="ws://unused")
+
+        await client._on_final("uno")
+        await asyncio.sleep(0)
+        await client._on_final("dos")
+        await client._on_final("tres")   # drops "dos" from the full queue
+        assert inference.created == []   # nothing runs before a worker streams it
+
+        gate.set()
+        assert await bus.shutdown(timeout=2)
+        assert answers == ["uno: ok.", "tres: ok."]
+        assert controller.prompts == ["uno", "tres"]
+        assert client.get_stats()["responses_discarded"] == 1
+
+
+def test_normalize_transcript():
+    assert normalize_transcript("¿Qué hora es?") == "qué hora es"
+    assert normalize_transcript("  Hola,   Jota. ") == "hola jota"
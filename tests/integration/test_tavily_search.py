@@ -0,0 +1,63 @@
+import pytest
+import pytest_asyncio
+
+from src.core.config import settings
+from src.tools import tavily
+from tests.integration.mock_tavily import MockTavilyServer
+
+
+@pytest_asyncio.fixture(scope="function")
+async def mock_tavily(monkeypatch):
+    server = MockTavilyServer()
+    await server.start()
+    monkeypatch.setattr(settings, "TAVILY_API_URL", server.url)
+    monkeypatch.setattr(settings, "TAVILY_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "TAVILY_TIMEOUT", 1.0)
+    monkeypatch.setattr(settings, "TAVILY_HEDGE_ENABLED", False)
+    await tavily.close_client()
+    tavily._latencies.clear()
+    yield server
+    await tavily.close_client()
+    await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused(mock_tavily):
+    """Sequential searches share one pooled keep-alive connection."""
+    for query in ("a", "b", "c"):
+        results = await tavily.web_search(query)
+        assert results[0]["title"] == f"Result for {query}"
+    assert len(mock_tavily.requests) == 3
+    assert mock_tavily.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_returns_empty_result(mock_tavily, monkeypatch):
+    monkeypatch.setattr(settings, "TAVILY_TIMEOUT", 0.2)
+    mock_tavily.delays = [2.0]
+    assert await tavily.web_search("slow") == []
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_wins_when_first_is_slow(mock_tavily, monkeypatch):
+    monkeypatch.setattr(settings, "TAVILY_HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "TAVILY_HEDGE_DELAY", 0.05)
+    mock_tavily.delays = [2.0, 0]
+    results = await tavily.web_search("hedge me")
+    assert results[0]["title"] == "Result for hedge me"
+    assert len(mock_tavily.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_api_key(mock_tavily, monkeypatch):
+    monkeypatch.setattr(settings, "TAVILY_API_KEY", None)
+    with pytest.raises(ValueError):
+        await tavily.web_search("x")
+
+
+@pytest.mark.asyncio
+async def test_timeouts_are_latency_samples(mock_tavily, monkeypatch):
+    monkeypatch.setattr(settings, "TAVILY_TIMEOUT", 0.2)
+    mock_tavily.delays = [2.0]
+    await tavily.web_search("slow")
+    assert list(tavily._latencies) == [0.2]
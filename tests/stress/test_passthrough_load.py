@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pytest
+
+from src.api.chat.outbound import OutboundWriter
+from src.core.config import settings
+from src.core.controller.input import JotaInputMixin
+from src.core.tool_manager import tool_manager
+from src.services.inference import InferenceClient
+from tests.integration.fake_engine import FakeEngineSocket, FakeMemory
+
+SESSIONS = 10
+TOKENS = [f" palabra{i % 50}" for i in range(3000)]
+
+
+class Controller(JotaInputMixin):
+    def __init__(self, inference_client, memory_manager):
+        self.inference_client = inference_client
+        self.memory_manager = memory_manager
+
+
+async def _session(controller: Controller, session_id: str, raw: bool):
+    """Streams one response into a coalescing writer; returns seconds to the first frame."""
+    started = time.perf_counter()
+    first_frame = None
+
+    async def send_text(frame: str):
+        nonlocal first_frame
+        if first_frame is None:
+            first_frame = time.perf_counter() - started
+
+    writer = OutboundWriter(send_text, window_ms=10, max_bytes=256)
+    payload = {
+        "content": "hola", "session_id": session_id, "conversation_id": f"c-{session_id}",
+        "user_id": "u", "client_id": "tool-free", "stateless": True,
+    }
+    if raw:
+        async for body in controller.handle_input_raw(payload):
+            await writer.token_json(body)
+    else:
+        async for token in controller.handle_input(payload):
+            if isinstance(token, dict):
+                await writer.send(token)
+            else:
+                await writer.token(token)
+    await writer.close()
+    return first_frame
+
+
+async def _run(raw: bool):
+    client = InferenceClient(memory_manager=FakeMemory())
+    client.websocket = FakeEngineSocket(TOKENS)
+    reader = asyncio.create_task(client._read_loop())
+    controller = Controller(client, client.memory_manager)
+    try:
+        wall, cpu = time.perf_counter(), time.process_time()
+        first_frames = await asyncio.gather(*(_session(controller, f"s{i}", raw) for i in range(SESSIONS)))
+        return time.perf_counter() - wall, time.process_time() - cpu, max(first_frames)
+    finally:
+        await client.websocket.close()
+        await asyncio.gather(reader, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_raw_passthrough_beats_full_path(monkeypatch):
+    """
+    10 concurrent tool-free responses of 3000 tokens: full path (tag scan in infer
+    and handle_input, re-encoding per token) vs. raw pass-through.
+    """
+    monkeypatch.setattr(tool_manager, "get_tool_schemas", lambda client_id=None: [])
+    # The fake engine emits each response at once: room for all of it, not an overflow test
+    monkeypatch.setattr(settings, "INFERENCE_SESSION_QUEUE_SIZE", 2 * len(TOKENS))
+    monkeypatch.setattr(tool_manager, "get_system_prompt_addition", lambda client_id=None: "")
+
+    results = {"full": await _run(raw=False), "raw": await _run(raw=True)}
+
+    print(f"\n--- {SESSIONS} sessions x {len(TOKENS)} tokens (tool-free client) ---")
+    for mode, (wall, cpu, first_frame) in results.items():
+        print(f"  {mode:<5} tokens/s={SESSIONS * len(TOKENS) / wall:>9.0f}  cpu={cpu * 1000:8.1f} ms  "
+              f"worst first frame={first_frame * 1000:7.1f} ms")
+
+    # The full path no longer joins a buffered pass at the end, so the gap narrowed
+    assert results["raw"][1] < results["full"][1] / 1.5
+    # handle_input streams each pass: its first frame does not wait for the whole answer
+    assert results["full"][2] < results["full"][0] / 2
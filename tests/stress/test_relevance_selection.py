@@ -0,0 +1,37 @@
+import json
+import time
+
+from src.utils.tool_output import compact_tool_output, select_relevant_text
+
+SENTENCES = [
+    "The city council approved the new budget for public transport on Monday.",
+    "Ticket prices for the metro will remain frozen until the end of the year.",
+    "Average temperatures in Madrid reached 31 degrees during the afternoon.",
+    "The regional government announced three new hospitals in the north.",
+    "Local football clubs are preparing for the start of the season next week.",
+    "Tourism figures grew by twelve percent compared with the previous summer.",
+]
+
+
+def _bench(fn, runs: int = 500) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs
+
+
+def test_relevance_selection_under_a_millisecond():
+    """Sentence selection over a typical ~4 KB tool result stays well under 1 ms."""
+    text = " ".join(SENTENCES * 9)  # ~4 KB, 54 sentences
+    records = [{"title": f"Result {i}", "content": " ".join(SENTENCES[i:] + SENTENCES[:i])} for i in range(6)]
+    query = "what temperature did Madrid reach this afternoon"
+
+    text_ms = _bench(lambda: select_relevant_text(text, query, 1000, "")) * 1000
+    records_ms = _bench(lambda: compact_tool_output(json.dumps(records), 1000, query=query)) * 1000
+
+    print("\n--- Query-relevance selection latency ---")
+    print(f"  plain text ({len(text)} chars)   {text_ms:.3f} ms")
+    print(f"  records    ({len(json.dumps(records))} chars)   {records_ms:.3f} ms")
+
+    assert "31 degrees" in select_relevant_text(text, query, 300, "")
+    assert text_ms < 1.0
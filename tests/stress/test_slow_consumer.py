@@ -0,0 +1,79 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.api.chat.outbound import OutboundWriter, SlowConsumerError
+
+TOKENS = 200
+TOKEN_INTERVAL = 0.001    # engine produces 1000 tokens/s
+PHONE_WRITE = 0.01        # a slow phone takes 10 ms per frame
+
+
+async def _engine():
+    for i in range(TOKENS):
+        await asyncio.sleep(TOKEN_INTERVAL)
+        yield f"tok{i} "
+
+
+class Phone:
+    def __init__(self, write_time: float):
+        self.write_time = write_time
+        self.text = []
+
+    async def send_text(self, frame: str):
+        await asyncio.sleep(self.write_time)
+        self.text.append(json.loads(frame)["content"])
+
+    async def close(self, code=1000, reason=""):
+        pass
+
+
+async def _drain_direct(phone: Phone) -> float:
+    """Old behaviour: every token awaits the client write before the next one is read."""
+    started = time.perf_counter()
+    async for token in _engine():
+        await phone.send_text(json.dumps({"type": "token", "content": token}))
+    return time.perf_counter() - started
+
+
+async def _drain_buffered(phone: Phone, **kwargs):
+    writer = OutboundWriter(phone.send_text, window_ms=10, max_bytes=256, close=phone.close, **kwargs)
+    started = time.perf_counter()
+    try:
+        async for token in _engine():
+            await writer.token(token)
+        await writer.flush()
+    except SlowConsumerError:
+        pass
+    drained = time.perf_counter() - started
+    await writer.close(timeout=10)
+    return drained, writer.get_stats()
+
+
+@pytest.mark.asyncio
+async def test_slow_phone_does_not_hold_the_engine_stream():
+    """
+    200 tokens at 1000 tok/s to a phone that needs 10 ms per frame: time until the
+    engine session is fully drained, writing inline vs. through the send buffer.
+    """
+    direct_phone, buffered_phone = Phone(PHONE_WRITE), Phone(PHONE_WRITE)
+    direct = await _drain_direct(direct_phone)
+    buffered, stats = await _drain_buffered(buffered_phone)
+
+    print("\n--- Engine drain time with a slow phone (10 ms/frame) ---")
+    print(f"  inline writes  {direct * 1000:8.1f} ms")
+    print(f"  send buffer    {buffered * 1000:8.1f} ms  frames={stats['frames']}  "
+          f"high-water={stats['buffer_high_water_bytes']} B / {stats['buffer_high_water_frames']} frames")
+
+    assert "".join(buffered_phone.text) == "".join(direct_phone.text)
+    assert buffered < direct / 5
+
+
+@pytest.mark.asyncio
+async def test_stuck_phone_is_dropped_without_stalling_the_engine():
+    phone = Phone(write_time=3600)
+    drained, stats = await _drain_buffered(phone, buffer_bytes=1024)
+    assert stats["slow_consumer"]
+    assert drained < TOKENS * TOKEN_INTERVAL * 3
@@ -0,0 +1,26 @@
+import time
+
+from src.core.tool_manager import ToolManager
+
+
+def convert(value: float, from_unit: str, to_unit: str, precision: int = 2) -> str:
+    """Converts units."""
+    return ""
+
+
+def test_validation_cost_per_call():
+    """Precompiled schema validation adds only microseconds per tool call."""
+    tm = ToolManager()
+    tm.register(convert)
+    arguments = {"value": "12.5", "from_unit": "km", "to_unit": "mi", "precision": 3}
+
+    runs = 20_000
+    start = time.perf_counter()
+    for _ in range(runs):
+        tm.validate_arguments("convert", arguments)
+    per_call_us = (time.perf_counter() - start) / runs * 1e6
+
+    print("\n--- Tool argument validation cost ---")
+    print(f"  {per_call_us:.2f} µs per call ({len(arguments)} arguments)")
+
+    assert per_call_us < 50
@@ -0,0 +1,76 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+from src.api.chat.outbound import OutboundWriter
+
+CONNECTIONS = 20
+TOKENS = 2000
+TOKEN = "tok "
+
+
+class SocketSink:
+    """send_text over a real socketpair (one write syscall per frame), drained by a thread."""
+
+    def __init__(self):
+        self.writer_sock, self.reader_sock = socket.socketpair()
+        self.frames = 0
+        self._reader = threading.Thread(target=self._drain, daemon=True)
+        self._reader.start()
+
+    def _drain(self):
+        while self.reader_sock.recv(65536):
+            pass
+
+    async def send_text(self, text: str) -> None:
+        self.writer_sock.sendall(text.encode("utf-8"))
+        self.frames += 1
+
+    def close(self):
+        self.writer_sock.close()
+        self._reader.join(timeout=1)
+        self.reader_sock.close()
+
+
+async def _stream(writer: OutboundWriter) -> None:
+    """A fast engine: one token per event-loop turn."""
+    for _ in range(TOKENS):
+        await writer.token(TOKEN)
+        await asyncio.sleep(0)
+    await writer.close()
+
+
+async def _run(window_ms: float, max_bytes: int):
+    sinks = [SocketSink() for _ in range(CONNECTIONS)]
+    writers = [OutboundWriter(s.send_text, window_ms=window_ms, max_bytes=max_bytes) for s in sinks]
+    wall, cpu = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(_stream(w) for w in writers))
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    frames = sum(s.frames for s in sinks)
+    for sink in sinks:
+        sink.close()
+    return frames, wall, cpu
+
+
+@pytest.mark.asyncio
+async def test_coalescing_cuts_frames_and_cpu():
+    """
+    20 connections × 2000 tokens: one frame per token vs. 10 ms / 256 byte coalescing.
+    """
+    results = {
+        "per-token": await _run(window_ms=0, max_bytes=1),
+        "coalesced": await _run(window_ms=10, max_bytes=256),
+    }
+
+    print(f"\n--- {CONNECTIONS} connections x {TOKENS} tokens ---")
+    for mode, (frames, wall, cpu) in results.items():
+        print(f"  {mode:<10} frames={frames:>6}  frames/s={frames / wall:>9.0f}  "
+              f"tokens/s={CONNECTIONS * TOKENS / wall:>9.0f}  cpu={cpu * 1000:7.1f} ms")
+
+    per_token, coalesced = results["per-token"], results["coalesced"]
+    assert per_token[0] == CONNECTIONS * TOKENS
+    assert coalesced[0] < per_token[0] / 10
+    assert coalesced[2] < per_token[2]
@@ -0,0 +1,213 @@
+"""
+test_agent_loop.py
+~~~~~~~~~~~~~~~~~~
+Unit tests for the bounded multi-step tool loop in
+src/core/controller/input.py (JotaInputMixin.handle_input).
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.core.config import settings
+from src.core.controller.input import JotaInputMixin
+from src.core.tool_manager import tool_manager
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class FakeInferenceClient:
+    """Replays one scripted pass per infer() call and records the prompts."""
+
+    current_engine_model = "test-model"
+
+    def __init__(self, passes):
+        self.passes = list(passes)
+        self.prompts = []
+        self.set_context = AsyncMock()
+
+    async def infer(self, session_id, prompt, **kwargs):
+        self.prompts.append(prompt)
+        for token in self.passes.pop(0):
+            yield token
+
+
+def _call(name: str, **arguments) -> dict:
+    return {"type": "tool_call", "payload": {"name": name, "arguments": arguments}}
+
+
+def _controller(passes) -> JotaInputMixin:
+    controller = JotaInputMixin()
+    controller.inference_client = FakeInferenceClient(passes)
+    controller.memory_manager = MagicMock(save_message=AsyncMock())
+    controller._ensure_model_loaded = AsyncMock()
+    return controller
+
+
+def _unregister(name: str):
+    for registry in (tool_manager._tools, tool_manager._schemas, tool_manager._validators):
+        registry.pop(name, None)
+
+
+async def _run(controller) -> list:
+    payload = {
+        "content": "¿Qué tiempo hace en la capital de Francia?",
+        "session_id": "s1",
+        "conversation_id": "c1",
+        "user_id": "u1",
+        "client_id": None,
+    }
+    return [token async for token in controller.handle_input(payload)]
+
+
+@pytest.fixture
+def lookup_tool():
+    calls = []
+
+    async def agent_test_lookup(query: str) -> str:
+        """Looks something up."""
+        calls.append(query)
+        return f"result for {query}"
+
+    tool_manager.register(agent_test_lookup)
+    yield calls
+    _unregister("agent_test_lookup")
+
+
+# ---------------------------------------------------------------------------
+# handle_input — multi-step loop
+# ---------------------------------------------------------------------------
+
+class TestAgentLoop:
+    @pytest.mark.asyncio
+    async def test_multi_hop_appends_only_tool_results(self, lookup_tool):
+        controller = _controller([
+            [_call("agent_test_lookup", query="capital de Francia")],
+            [_call("agent_test_lookup", query="tiempo en París")],
+            ["Hace sol ", "en París."],
+        ])
+        out = await _run(controller)
+
+        assert lookup_tool == ["capital de Francia", "tiempo en París"]
+        assert "".join(t for t in out if isinstance(t, str)) == "Hace sol en París."
+        assert {t["step"] for t in out if isinstance(t, dict)} == {1, 2}
+
+        prompts = controller.inference_client.prompts
+        assert "result for tiempo en París" in prompts[2]
+        assert "result for capital de Francia" not in prompts[2]
+        controller.inference_client.set_context.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_max_steps_forces_final_answer(self, lookup_tool, monkeypatch):
+        monkeypatch.setattr(settings, "AGENT_MAX_STEPS", 1)
+        controller = _controller([
+            [_call("agent_test_lookup", query="uno")],
+            [_call("agent_test_lookup", query="dos"), "Respuesta final."],
+        ])
+        out = await _run(controller)
+
+        assert lookup_tool == ["uno"]
+        assert controller.inference_client.prompts[1].endswith(settings.TOOL_FINAL_PROMPT)
+        assert out[-1] == "Respuesta final."
+
+    @pytest.mark.asyncio
+    async def test_tool_time_budget_stops_slow_tool(self, monkeypatch):
+        monkeypatch.setattr(settings, "AGENT_MAX_TOOL_TIME", 0.05)
+
+        async def agent_test_slow(query: str) -> str:
+            """Too slow."""
+            await asyncio.sleep(1)
+            return "late"
+
+        tool_manager.register(agent_test_slow)
+        try:
+            controller = _controller([
+                [_call("agent_test_slow", query="x")],
+                ["Sin datos."],
+            ])
+            out = await _run(controller)
+        finally:
+            _unregister("agent_test_slow")
+
+        assert any(isinstance(t, dict) and "Error" in t["content"] for t in out)
+        assert "time budget" in controller.inference_client.prompts[1]
+        assert controller.inference_client.prompts[1].endswith(settings.TOOL_FINAL_PROMPT)
+        assert out[-1] == "Sin datos."
+
+    @pytest.mark.asyncio
+    async def test_ignored_tool_call_text_is_not_leaked(self, monkeypatch):
+        monkeypatch.setattr(settings, "AGENT_MAX_STEPS", 0)
+        controller = _controller([
+            ['Vale. <tool_call>{"name": "web_search", "arguments": {"query": "x"}}</tool_call>'],
+        ])
+        out = await _run(controller)
+        assert "".join(out).strip() == "Vale."
+
+    @pytest.mark.asyncio
+    async def test_bad_tool_block_is_parsed_once(self):
+        from src.utils.tool_parser import get_repair_stats
+
+        before = get_repair_stats()["failed"]
+        controller = _controller([
+            ["Veamos ", "<tool_call>{name: año}</tool_call>", *[f" t{i}" for i in range(20)]],
+        ])
+        out = await _run(controller)
+        assert get_repair_stats()["failed"] == before + 1
+        assert "".join(out).endswith(" t19")
+
+    @pytest.mark.asyncio
+    async def test_text_streams_before_the_pass_ends_without_tools(self, monkeypatch):
+        monkeypatch.setattr(tool_manager, "get_system_prompt_addition", lambda client_id=None: "")
+        yielded = []
+
+        class SlowClient(FakeInferenceClient):
+            async def infer(self, session_id, prompt, **kwargs):
+                for token in ["Hola", ", ", "¿qué", " tal?"]:
+                    yield token
+                    await asyncio.sleep(0)
+                assert yielded, "nothing reached the client before the pass ended"
+
+        controller = _controller([])
+        controller.inference_client = SlowClient([])
+        async for token in controller.handle_input({
+            "content": "hola", "session_id": "s1", "conversation_id": "c1",
+            "user_id": "u1", "client_id": None,
+        }):
+            yielded.append(token)
+        assert "".join(yielded) == "Hola, ¿qué tal?"
+
+    @pytest.mark.asyncio
+    async def test_pre_tool_text_is_not_shown(self, lookup_tool):
+        controller = _controller([
+            ["Miro ", "<tool", "_call>", '{"name": "agent_test_lookup", "arguments": {"query": "x"}}', "</tool_call>"],
+            ["Lis", "to."],
+        ])
+        out = await _run(controller)
+        text = [t for t in out if isinstance(t, str)]
+        assert text == ["Listo."]
+        assert lookup_tool == ["x"]
+        saved = controller.memory_manager.save_message.call_args_list[0].kwargs
+        assert saved["content"] == "Miro" and saved["metadata"]["thinking"]
+
+    @pytest.mark.asyncio
+    async def test_stream_pre_tool_text_holds_back_only_a_possible_tag(self, lookup_tool, monkeypatch):
+        monkeypatch.setattr(settings, "AGENT_STREAM_PRE_TOOL_TEXT", True)
+        controller = _controller([
+            ["Miro ", "<tool", "_call>", '{"name": "agent_test_lookup", "arguments": {"query": "x"}}', "</tool_call>"],
+            ["Listo."],
+        ])
+        out = await _run(controller)
+        text = [t for t in out if isinstance(t, str)]
+        assert text == ["Miro ", "Listo."]
+        assert lookup_tool == ["x"]
+
+    @pytest.mark.asyncio
+    async def test_text_after_an_ignored_call_keeps_streaming(self, monkeypatch):
+        monkeypatch.setattr(settings, "AGENT_MAX_STEPS", 0)
+        controller = _controller([
+            ["A ", '<tool_call>{"name": "web_search", "arguments": {}}</tool_call>', " b", " <", " 3"],
+        ])
+        out = await _run(controller)
+        assert out == ["A ", " b", " ", "< 3"]
@@ -0,0 +1,261 @@
+"""
+test_barge_in.py
+~~~~~~~~~~~~~~~~
+Unit tests for cancelling an answer in flight: InferenceClient.interrupt_session
+and the chat WebSocket receive loop running while the answer streams.
+"""
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+
+import src.api.chat.websocket as ws_module
+from src.core.config import settings
+from src.core.constants import INTERRUPTED_MARKER
+from src.core.controller.input import JotaInputMixin
+from src.core.tool_manager import tool_manager
+from src.services.inference import InferenceClient, InferenceInterruptedError
+from tests.integration.fake_engine import FakeEngineSocket, FakeMemory
+
+TOKENS = [f"t{i} " for i in range(200)]
+TOKEN_DELAY = 0.005
+
+
+class Memory(FakeMemory):
+    def __init__(self):
+        super().__init__()
+        self.errors = []
+
+    async def mark_conversation_error(self, conversation_id, user_id):
+        self.errors.append(conversation_id)
+
+    async def validate_client_key(self, key):
+        return {"id": "tool-free", "client_type": "chat"}
+
+    async def get_conversation_messages(self, conversation_id, client_id):
+        return []
+
+
+class Controller(JotaInputMixin):
+    def __init__(self, inference_client, memory_manager):
+        self.inference_client = inference_client
+        self.memory_manager = memory_manager
+
+    async def _ensure_model_loaded(self, conversation_id, client_id):
+        pass
+
+    async def switch_model(self, conversation_id, client_id, model_id):
+        self.switched_while_streaming = bool(self.inference_client._response_queues)
+
+
+@pytest_asyncio.fixture
+async def engine():
+    memory = Memory()
+    client = InferenceClient(memory_manager=memory)
+    client.websocket = FakeEngineSocket(TOKENS, token_delay=TOKEN_DELAY)
+    reader = asyncio.create_task(client._read_loop())
+    yield client, memory
+    await client.websocket.close()
+    await asyncio.gather(reader, return_exceptions=True)
+
+
+# ---------------------------------------------------------------------------
+# InferenceClient.interrupt_session
+# ---------------------------------------------------------------------------
+
+class TestInterruptSession:
+    @pytest.mark.asyncio
+    async def test_interrupt_saves_partial_without_marking_error(self, engine):
+        client, memory = engine
+        stream = client.infer("s1", "hola", "c1", "u1")
+        received = [await stream.__anext__() for _ in range(3)]
+
+        assert await client.interrupt_session("s1")
+        with pytest.raises(InferenceInterruptedError):
+            async for token in stream:
+                received.append(token)
+
+        assert {"op": "abort", "session_id": "s1"} in client.websocket.sent
+        saved = memory.saved[-1]
+        assert saved["content"] == "".join(received) + INTERRUPTED_MARKER
+        assert saved["metadata"] == {"interrupted": True}
+        assert memory.errors == []
+
+    @pytest.mark.asyncio
+    async def test_interrupt_after_end_does_not_stall_the_next_answer(self, engine, monkeypatch):
+        client, memory = engine
+        monkeypatch.setattr(settings, "INFERENCE_ABORT_SETTLE_TIMEOUT", 2.0)
+        client.websocket.tokens, client.websocket.token_delay = ["a ", "b "], 0
+        stream = client.infer_raw("s1", "hola", "c1", "u1")
+        await stream.__anext__()
+        while client._response_queues["s1"].qsize() < 2:   # "b " and end already queued
+            await asyncio.sleep(0.001)
+
+        assert await client.interrupt_session("s1")
+        assert [body async for body in stream] == ["b "]   # the answer had ended: no interruption
+        assert client._aborting == {}
+
+        started = asyncio.get_running_loop().time()
+        assert [body async for body in client.infer_raw("s1", "otra", "c1", "u1")] == ["a ", "b "]
+        assert asyncio.get_running_loop().time() - started < 1.0
+
+    @pytest.mark.asyncio
+    async def test_close_session_forgets_its_abort_state(self, engine):
+        client, _ = engine
+        client._mark_aborting("s9")
+        client._queue_high_water["s9"] = 3
+        await client.close_session("s9")
+        assert "s9" not in client._aborting
+        assert "s9" not in client._queue_high_water
+
+    @pytest.mark.asyncio
+    async def test_nothing_in_flight(self, engine):
+        client, _ = engine
+        assert not await client.interrupt_session("s1")
+
+    @pytest.mark.asyncio
+    async def test_session_is_reused_without_late_frames(self, engine):
+        client, memory = engine
+        stream = client.infer_raw("s1", "hola", "c1", "u1")
+        await stream.__anext__()
+        await client.interrupt_session("s1")
+        with pytest.raises(InferenceInterruptedError):
+            async for _ in stream:
+                pass
+
+        answer = [body async for body in client.infer_raw("s1", "otra", "c1", "u1")]
+        assert answer == TOKENS
+        assert memory.saved[-1]["content"] == "".join(TOKENS)
+        assert client.get_queue_stats() == {"sessions": {}, "overflow_aborts": 0}
+
+
+# ---------------------------------------------------------------------------
+# Chat WebSocket
+# ---------------------------------------------------------------------------
+
+class FakeWebSocket:
+    """Client side of the chat socket: scripted inbox, decoded outbox."""
+
+    def __init__(self):
+        self.headers = {"x-client-key": "key"}
+        self.query_params = {"conversation_id": "c1", "coalesce_ms": "0"}
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.frames = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.frames.append(json.loads(text))
+
+    async def receive_text(self):
+        message = await self.inbox.get()
+        if message is None:
+            raise ws_module.WebSocketDisconnect()
+        return message
+
+    async def close(self, code=1000, reason=""):
+        pass
+
+    async def wait_for(self, frame_type, timeout=5.0):
+        async def seen():
+            while not any(f["type"] == frame_type for f in self.frames):
+                await asyncio.sleep(0.005)
+        await asyncio.wait_for(seen(), timeout)
+
+    def tokens(self):
+        return "".join(f["content"] for f in self.frames if f["type"] == "token")
+
+
+@pytest_asyncio.fixture
+async def chat(engine, monkeypatch):
+    client, memory = engine
+
+    async def ensure_session(user_id):
+        return "s1"
+
+    async def set_context(session_id, messages):
+        pass
+
+    monkeypatch.setattr(client, "ensure_session", ensure_session)
+    monkeypatch.setattr(client, "set_context", set_context)
+    monkeypatch.setattr(tool_manager, "get_tool_schemas", lambda client_id=None: [])
+    monkeypatch.setattr(ws_module, "inference_client", client)
+    monkeypatch.setattr(ws_module, "memory_manager", memory)
+    monkeypatch.setattr(ws_module, "jota_controller", Controller(client, memory))
+
+    socket = FakeWebSocket()
+    endpoint = asyncio.create_task(ws_module.websocket_endpoint(socket, "u1"))
+    yield socket, client, memory
+    socket.inbox.put_nowait(None)
+    await asyncio.wait_for(endpoint, 5)
+
+
+class TestWebSocketCancel:
+    @pytest.mark.asyncio
+    async def test_cancel_stops_the_answer_and_keeps_the_partial(self, chat):
+        socket, client, memory = chat
+        socket.inbox.put_nowait("cuéntame algo largo")
+        await socket.wait_for("token")
+
+        started = asyncio.get_running_loop().time()
+        socket.inbox.put_nowait(json.dumps({"type": "cancel"}))
+        await socket.wait_for("cancelled")
+        assert asyncio.get_running_loop().time() - started < len(TOKENS) * TOKEN_DELAY / 4
+
+        assert socket.frames[-1] == {"type": "cancelled", "interrupted": True}
+        assert {"op": "abort", "session_id": "s1"} in client.websocket.sent
+        partial = memory.saved[-1]
+        assert partial["role"] == "assistant"
+        assert partial["content"] == socket.tokens() + INTERRUPTED_MARKER
+        assert len(socket.tokens()) < len("".join(TOKENS))
+
+    @pytest.mark.asyncio
+    async def test_new_prompt_interrupts_and_is_answered(self, chat):
+        socket, client, memory = chat
+        socket.inbox.put_nowait("primera")
+        await socket.wait_for("token")
+        socket.inbox.put_nowait("segunda")
+        await socket.wait_for("cancelled")
+        cut = len(socket.frames)
+
+        while memory.saved[-1]["content"] != "".join(TOKENS):
+            await asyncio.sleep(0.01)
+        answer = "".join(f["content"] for f in socket.frames[cut:] if f["type"] == "token")
+        assert answer == "".join(TOKENS)
+        # the cut answer is saved before the prompt that interrupted it
+        assert [m["role"] for m in memory.saved] == ["user", "assistant", "user", "assistant"]
+        assert memory.saved[1]["content"].endswith(INTERRUPTED_MARKER)
+
+    @pytest.mark.asyncio
+    async def test_cancel_when_idle_is_acknowledged(self, chat):
+        socket, _, memory = chat
+        socket.inbox.put_nowait(json.dumps({"type": "cancel"}))
+        await socket.wait_for("cancelled")
+        assert socket.frames == [{"type": "cancelled", "interrupted": False}]
+        assert memory.saved == []
+
+    @pytest.mark.asyncio
+    async def test_disconnect_mid_answer_aborts_the_engine(self, chat):
+        socket, client, memory = chat
+        socket.inbox.put_nowait("hola")
+        await socket.wait_for("token")
+        socket.inbox.put_nowait(None)
+        while not memory.saved or memory.saved[-1]["role"] != "assistant":
+            await asyncio.sleep(0.01)
+        assert memory.saved[-1]["content"].endswith(INTERRUPTED_MARKER)
+        assert {"op": "abort", "session_id": "s1"} in client.websocket.sent
+
+    @pytest.mark.asyncio
+    async def test_switch_model_mid_answer_cancels_it_first(self, chat):
+        socket, client, memory = chat
+        socket.inbox.put_nowait("cuéntame algo largo")
+        await socket.wait_for("token")
+        socket.inbox.put_nowait(json.dumps({"type": "switch_model", "model_id": "otro"}))
+        await socket.wait_for("model_switched")
+
+        types = [f["type"] for f in socket.frames]
+        assert types.index("cancelled") < types.index("model_switched")
+        assert ws_module.jota_controller.switched_while_streaming is False
+        assert memory.saved[-1]["content"].endswith(INTERRUPTED_MARKER)
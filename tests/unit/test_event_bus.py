@@ -0,0 +1,214 @@
+"""
+test_event_bus.py
+~~~~~~~~~~~~~~~~~
+Unit tests for the bounded per-subscriber queues, worker limits, overflow
+policies, drain on shutdown and stats of src/core/events.py (EventBus).
+"""
+import asyncio
+
+import pytest
+
+from src.core.events import EventBus, EventBusClosedError
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class Recorder:
+    """Subscriber that records events and blocks on a gate until released."""
+
+    def __init__(self, gated: bool = False):
+        self.events = []
+        self.active = 0
+        self.max_active = 0
+        self.gate = asyncio.Event()
+        if not gated:
+            self.gate.set()
+
+    async def __call__(self, event: dict):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await self.gate.wait()
+            self.events.append(event["n"])
+        finally:
+            self.active -= 1
+
+
+def _event(n: int, topic: str = "transcription_input") -> dict:
+    return {"type": topic, "n": n}
+
+
+# ---------------------------------------------------------------------------
+# Workers and overflow
+# ---------------------------------------------------------------------------
+
+class TestBackpressure:
+    @pytest.mark.asyncio
+    async def test_worker_count_bounds_concurrency(self):
+        bus = EventBus()
+        recorder = Recorder(gated=True)
+        bus.subscribe(recorder, workers=2, queue_size=10)
+        for n in range(6):
+            await bus.publish(_event(n))
+        await asyncio.sleep(0.01)
+        assert recorder.max_active == 2
+        recorder.gate.set()
+        assert await bus.shutdown(timeout=1)
+        assert sorted(recorder.events) == list(range(6))
+
+    @pytest.mark.asyncio
+    async def test_block_policy_waits_for_room(self):
+        bus = EventBus()
+        recorder = Recorder(gated=True)
+        bus.subscribe(recorder, workers=1, queue_size=1, overflow="block")
+        await bus.publish(_event(0))   # taken by the worker
+        await asyncio.sleep(0)
+        await bus.publish(_event(1))   # fills the queue
+        blocked = asyncio.create_task(bus.publish(_event(2)))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        recorder.gate.set()
+        assert await asyncio.wait_for(blocked, 1) == 1
+        await bus.shutdown(timeout=1)
+        assert recorder.events == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_policy(self):
+        bus = EventBus()
+        recorder = Recorder(gated=True)
+        bus.subscribe(recorder, workers=1, queue_size=2, overflow="drop_oldest")
+        await bus.publish(_event(0))
+        await asyncio.sleep(0)
+        for n in range(1, 5):
+            assert await bus.publish(_event(n)) == 1
+        recorder.gate.set()
+        await bus.shutdown(timeout=1)
+        assert recorder.events == [0, 3, 4]
+        assert bus.get_stats()["topics"]["transcription_input"]["dropped"] == 2
+
+    @pytest.mark.asyncio
+    async def test_reject_policy(self):
+        bus = EventBus()
+        recorder = Recorder(gated=True)
+        bus.subscribe(recorder, workers=1, queue_size=1, overflow="reject")
+        await bus.publish(_event(0))
+        await asyncio.sleep(0)
+        assert await bus.publish(_event(1)) == 1
+        assert await bus.publish(_event(2)) == 0
+        recorder.gate.set()
+        await bus.shutdown(timeout=1)
+        assert recorder.events == [0, 1]
+        assert bus.get_stats()["topics"]["transcription_input"]["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_discarded_events_call_on_discard(self):
+        bus = EventBus()
+        recorder = Recorder(gated=True)
+        bus.subscribe(recorder, workers=1, queue_size=1, overflow="drop_oldest")
+        discarded = []
+        for n in range(3):
+            await bus.publish({**_event(n), "on_discard": lambda n=n: discarded.append(n)})
+            await asyncio.sleep(0)
+        assert discarded == [1]
+        assert not await bus.shutdown(timeout=0.05)
+        assert discarded == [1, 2]
+
+    def test_invalid_policy(self):
+        with pytest.raises(ValueError):
+            EventBus().subscribe(Recorder(), overflow="explode")
+
+
+# ---------------------------------------------------------------------------
+# Topics, errors, shutdown
+# ---------------------------------------------------------------------------
+
+class TestDeliveryAndShutdown:
+    @pytest.mark.asyncio
+    async def test_topic_filter(self):
+        bus = EventBus()
+        everything, only_a = Recorder(), Recorder()
+        bus.subscribe(everything)
+        bus.subscribe(only_a, topic="a")
+        await bus.publish(_event(1, "a"))
+        await bus.publish(_event(2, "b"))
+        await bus.shutdown(timeout=1)
+        assert sorted(everything.events) == [1, 2]
+        assert only_a.events == [1]
+
+    @pytest.mark.asyncio
+    async def test_subscriber_error_is_counted_and_worker_survives(self):
+        bus = EventBus()
+        seen = []
+
+        async def flaky(event):
+            if event["n"] == 0:
+                raise RuntimeError("boom")
+            seen.append(event["n"])
+
+        bus.subscribe(flaky, workers=1)
+        await bus.publish(_event(0))
+        await bus.publish(_event(1))
+        await bus.shutdown(timeout=1)
+        assert seen == [1]
+        stats = bus.get_stats()["topics"]["transcription_input"]
+        assert stats["errors"] == 1
+        assert stats["handled"] == 2
+
+    @pytest.mark.asyncio
+    async def test_shutdown_drains_then_rejects_publish(self):
+        bus = EventBus()
+        recorder = Recorder()
+
+        async def slow(event):
+            await asyncio.sleep(0.01)
+            await recorder(event)
+
+        bus.subscribe(slow, workers=1, queue_size=10)
+        for n in range(5):
+            await bus.publish(_event(n))
+        assert await bus.shutdown(timeout=1)
+        assert recorder.events == list(range(5))
+        with pytest.raises(EventBusClosedError):
+            await bus.publish(_event(9))
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_keeps_the_stop_task_until_it_ends(self):
+        bus = EventBus()
+        subscription = bus.subscribe(Recorder(), workers=2)
+        await bus.publish(_event(0))
+        workers = list(subscription._tasks)
+
+        bus.unsubscribe(subscription)
+        assert len(bus._stopping) == 1
+        await bus.shutdown(timeout=1)
+        assert bus._stopping == set()
+        assert all(task.done() for task in workers)
+
+    @pytest.mark.asyncio
+    async def test_shutdown_timeout(self):
+        bus = EventBus()
+        recorder = Recorder(gated=True)
+        bus.subscribe(recorder, workers=1)
+        await bus.publish(_event(0))
+        assert await bus.shutdown(timeout=0.05) is False
+        assert recorder.events == []
+
+    @pytest.mark.asyncio
+    async def test_stats_report_queue_depth_and_latency(self):
+        bus = EventBus()
+        recorder = Recorder(gated=True)
+        bus.subscribe(recorder, workers=1, queue_size=5)
+        for n in range(3):
+            await bus.publish(_event(n))
+        await asyncio.sleep(0)
+        subscriber = bus.get_stats()["subscribers"][0]
+        assert subscriber["queue_depth"] == 2
+        assert subscriber["queue_size"] == 5
+        recorder.gate.set()
+        await bus.shutdown(timeout=1)
+        topic = bus.get_stats()["topics"]["transcription_input"]
+        assert topic["published"] == 3
+        assert topic["handled"] == 3
+        assert topic["avg_wait_ms"] > 0
@@ -0,0 +1,104 @@
+"""
+test_intents.py
+~~~~~~~~~~~~~~~
+Unit tests for src/core/intents.py: table loading, slot extraction,
+fallback behaviour and hit-rate metrics.
+"""
+import json
+
+import pytest
+
+from src.core.intents import IntentMatcher, normalize_utterance
+from src.core.tool_manager import ToolManager
+
+
+def _matcher() -> IntentMatcher:
+    tm = ToolManager()
+
+    def set_light(room: str, state: str) -> str:
+        """Sets a light."""
+        return "ok"
+
+    def double(value: float) -> dict:
+        """Doubles a number."""
+        return {"doubled": value * 2}
+
+    def admin_only() -> str:
+        """Restricted."""
+        return "secret"
+
+    tm.register(set_light)
+    tm.register(double, direct_answer=True, answer_template="Resultado {doubled:g}.")
+    tm.register(admin_only, required_role="admin")
+
+    matcher = IntentMatcher(tm)
+    matcher.load_table({"intents": [
+        {
+            "name": "light_on",
+            "patterns": ["enciende la luz del (?P<room>\\w+)"],
+            "tool": "set_light",
+            "arguments": {"state": "on"},
+            "answer_template": "Luz del {room} encendida.",
+        },
+        {
+            "name": "double",
+            "patterns": ["doble de (?P<value>[\\d.,]+)"],
+            "tool": "double",
+            "slots": {"value": "number"},
+        },
+        {"name": "restricted", "patterns": ["secreto"], "tool": "admin_only"},
+        {"name": "missing_tool", "patterns": ["fantasma"], "tool": "not_registered"},
+    ]})
+    return matcher
+
+
+class TestIntentMatcher:
+    def test_normalize_strips_punctuation_and_case(self):
+        assert normalize_utterance("  ¿Qué   HORA es?  ") == "qué hora es"
+
+    @pytest.mark.asyncio
+    async def test_hit_uses_intent_template_and_fixed_arguments(self):
+        matcher = _matcher()
+        match = matcher.match("Enciende la luz del salón.")
+        assert match.arguments == {"state": "on", "room": "salón"}
+        assert await matcher.try_answer("Enciende la luz del salón.") == "Luz del salón encendida."
+
+    @pytest.mark.asyncio
+    async def test_hit_falls_back_to_tool_direct_answer(self):
+        matcher = _matcher()
+        assert await matcher.try_answer("doble de 2,5") == "Resultado 5."
+
+    def test_thousands_grouped_slot_is_not_a_match(self):
+        assert _matcher().match("doble de 1,000") is None
+
+    @pytest.mark.asyncio
+    async def test_partial_match_is_not_confident(self):
+        matcher = _matcher()
+        assert await matcher.try_answer("enciende la luz del salón y pon música") is None
+
+    @pytest.mark.asyncio
+    async def test_permission_denied_falls_back(self):
+        matcher = _matcher()
+        assert await matcher.try_answer("secreto", client_id="guest") is None
+
+    def test_unregistered_tool_is_skipped(self):
+        assert _matcher().match("fantasma") is None
+
+    @pytest.mark.asyncio
+    async def test_stats_report_hit_rate(self):
+        matcher = _matcher()
+        await matcher.try_answer("doble de 3")
+        await matcher.try_answer("cuéntame un chiste")
+        stats = matcher.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_invalid_file_disables_fast_path(self, tmp_path):
+        bad = tmp_path / "intents.json"
+        bad.write_text(json.dumps({"intents": [{"name": "x", "patterns": ["("], "tool": "t"}]}))
+        matcher = _matcher()
+        assert matcher.load(str(bad)) == 0
+
+    def test_bundled_table_loads(self):
+        assert IntentMatcher(ToolManager()).load() > 0
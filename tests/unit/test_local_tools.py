@@ -0,0 +1,105 @@
+"""
+test_local_tools.py
+~~~~~~~~~~~~~~~~~~~
+Unit tests for the in-process tools in src/tools (clock, calculator, units).
+"""
+import pytest
+
+from src.tools.calculator import calculate, evaluate_expression
+from src.tools.clock import get_current_time
+from src.tools.units import convert, convert_units
+
+
+# ---------------------------------------------------------------------------
+# calculator
+# ---------------------------------------------------------------------------
+
+class TestCalculator:
+    def test_basic_arithmetic(self):
+        assert evaluate_expression("15 * 37") == 555
+        assert evaluate_expression("(2 + 3) * 4 - 1") == 19
+
+    def test_typographic_operators(self):
+        assert evaluate_expression("6 × 7") == 42
+        assert evaluate_expression("2^10") == 1024
+
+    def test_functions_and_constants(self):
+        assert evaluate_expression("sqrt(16) + abs(-2)") == 6
+        assert round(evaluate_expression("pi"), 4) == 3.1416
+
+    def test_decimal_comma(self):
+        assert evaluate_expression("1,5 más 2") == 3.5
+        assert evaluate_expression("round(3.14159, 2)") == 3.14
+
+    @pytest.mark.parametrize("expr", ["1,000 por 2", "1,000,000 / 4"])
+    def test_thousands_separators_are_ambiguous(self, expr):
+        with pytest.raises(ValueError, match="Ambiguous number"):
+            evaluate_expression(expr)
+
+    def test_tool_formats_value(self):
+        assert calculate("10 / 4") == {"expression": "10 / 4", "value": "2.5"}
+        assert calculate("10 / 2")["value"] == "5"
+
+    @pytest.mark.parametrize("expr", [
+        "__import__('os').system('ls')",
+        "open('x')",
+        "a + 1",
+        "9 ** 9 ** 9",
+        "1 / 0",
+        "10.0 ** 400",
+        "",
+    ])
+    def test_rejects_unsafe_or_invalid(self, expr):
+        with pytest.raises(ValueError):
+            evaluate_expression(expr)
+
+
+# ---------------------------------------------------------------------------
+# units
+# ---------------------------------------------------------------------------
+
+class TestUnits:
+    def test_length(self):
+        assert convert(1, "km", "m") == 1000
+        assert round(convert(10, "km", "millas"), 3) == 6.214
+
+    @pytest.mark.parametrize("unit, metres", [
+        ("millimeters", 1e-3), ("millimetres", 1e-3), ("centimeters", 1e-2),
+        ("centimetres", 1e-2), ("kilometres", 1e3),
+    ])
+    def test_english_plurals(self, unit, metres):
+        assert convert(1, unit, "m") == metres
+
+    def test_volume_plurals(self):
+        assert convert(1000, "milliliters", "l") == 1
+        assert convert(1000, "millilitres", "liters") == 1
+
+    def test_temperature(self):
+        assert convert(100, "C", "F") == 212
+        assert round(convert(0, "celsius", "kelvin"), 2) == 273.15
+
+    def test_incompatible_dimensions(self):
+        with pytest.raises(ValueError):
+            convert(1, "kg", "m")
+
+    def test_unknown_unit(self):
+        with pytest.raises(ValueError):
+            convert(1, "parsec", "m")
+
+    def test_tool_output(self):
+        assert convert_units(2, "kg", "g") == {"value": "2", "converted": "2000"}
+
+
+# ---------------------------------------------------------------------------
+# clock
+# ---------------------------------------------------------------------------
+
+class TestClock:
+    def test_explicit_timezone(self):
+        result = get_current_time("America/New_York")
+        assert result["timezone"] == "America/New_York"
+        assert len(result["time"]) == 5
+
+    def test_unknown_timezone(self):
+        with pytest.raises(ValueError):
+            get_current_time("Mars/Olympus")
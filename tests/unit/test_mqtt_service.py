@@ -0,0 +1,247 @@
+"""
+test_mqtt_service.py
+~~~~~~~~~~~~~~~~~~~~
+Unit tests for the bounded, per-device ordered command dispatch and the
+sentence-streamed responses of src/services/mqtt.py (MQTTService), without
+a broker.
+"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.config import settings
+from src.core.controller.input import JotaInputMixin
+from src.core.tool_manager import tool_manager
+from src.services.mqtt import MQTTService, _Command
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class FakeClient:
+    """Records published (topic, payload) pairs."""
+
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, topic, payload, qos=0):
+        self.published.append((topic, json.loads(payload)))
+
+
+def _message(client_id: str, text: str, **extra):
+    payload = json.dumps({"client_id": client_id, "text": text, **extra})
+    return SimpleNamespace(topic="jota/stt", payload=payload.encode())
+
+
+def _service(process_delay: float = 0.0):
+    """MQTTService whose inference step just echoes the text (one token), tracking concurrency per device."""
+    service = MQTTService(inference_client=None, jota_controller=None)
+    service._client = service.fake_client = FakeClient()
+    service.running = {}
+    service.overlaps = 0
+
+    async def fake_process(client_id, text):
+        service.running[client_id] = service.running.get(client_id, 0) + 1
+        if service.running[client_id] > 1:
+            service.overlaps += 1
+        await asyncio.sleep(process_delay)
+        service.running[client_id] -= 1
+        yield text.upper()
+
+    service._process = fake_process
+    return service
+
+
+async def _drain(service: MQTTService, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while service._depth or service._active:
+        assert time.monotonic() < deadline, "queue not drained in time"
+        await asyncio.sleep(0.01)
+
+
+# ---------------------------------------------------------------------------
+# Dispatch
+# ---------------------------------------------------------------------------
+
+class TestCommandDispatch:
+    @pytest.mark.asyncio
+    async def test_per_device_order_and_parallel_devices(self, monkeypatch):
+        monkeypatch.setattr(settings, "MQTT_WORKERS", 3)
+        service = _service(process_delay=0.05)
+        service._workers = [asyncio.create_task(service._worker()) for _ in range(settings.MQTT_WORKERS)]
+        try:
+            start = time.perf_counter()
+            for text in ("uno", "dos", "tres"):
+                service._enqueue_message(_message("kitchen", text))
+            service._enqueue_message(_message("bedroom", "luz"))
+            await _drain(service)
+            elapsed = time.perf_counter() - start
+        finally:
+            await service.shutdown()
+
+        kitchen = [p["text"] for t, p in service.fake_client.published if t.endswith("/kitchen") and not p["final"]]
+        assert kitchen == ["UNO", "DOS", "TRES"]
+        assert service.overlaps == 0
+        assert elapsed < 0.3  # bedroom did not wait behind kitchen
+        assert service.get_stats()["processed"] == 4
+
+    def test_full_queue_drops_oldest(self, monkeypatch):
+        monkeypatch.setattr(settings, "MQTT_QUEUE_SIZE", 2)
+        service = _service()
+        for text in ("a", "b", "c"):
+            service._enqueue_message(_message("kitchen", text))
+
+        stats = service.get_stats()
+        assert stats["queue_depth"] == 2
+        assert stats["dropped"] == 1
+        assert [c.text for c in service._pending["kitchen"]] == ["b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_stale_command_is_not_processed(self, monkeypatch):
+        monkeypatch.setattr(settings, "MQTT_MAX_COMMAND_AGE", 5.0)
+        service = _service()
+        service._workers = [asyncio.create_task(service._worker())]
+        try:
+            service._enqueue_message(_message("kitchen", "old", ts=time.time() - 60))
+            service._enqueue_message(_message("kitchen", "new"))
+            await _drain(service)
+        finally:
+            await service.shutdown()
+
+        assert [p["text"] for _, p in service.fake_client.published] == ["NEW", ""]
+        assert service.get_stats()["expired"] == 1
+
+    @pytest.mark.asyncio
+    async def test_idle_devices_leave_no_pending_entry(self, monkeypatch):
+        monkeypatch.setattr(settings, "MQTT_QUEUE_SIZE", 1)
+        service = _service()
+        service._enqueue_message(_message("kitchen", "a"))
+        service._enqueue_message(_message("bedroom", "b"))  # drops kitchen's only command
+        assert "kitchen" not in service._pending
+
+        service._workers = [asyncio.create_task(service._worker())]
+        try:
+            await _drain(service)
+            await asyncio.sleep(0.01)
+        finally:
+            await service.shutdown()
+        assert service._pending == {}
+
+    @pytest.mark.parametrize("size", [0, -5])
+    def test_non_positive_queue_size_keeps_one_command(self, monkeypatch, size):
+        monkeypatch.setattr(settings, "MQTT_QUEUE_SIZE", size)
+        service = _service()
+        for text in ("a", "b"):
+            service._enqueue_message(_message("kitchen", text))
+        assert [c.text for c in service._pending["kitchen"]] == ["b"]
+        assert service.get_stats()["dropped"] == 1
+
+    def test_drop_oldest_with_nothing_pending(self):
+        service = _service()
+        service._depth = 1   # the only command is already out with a worker
+        service._drop_oldest()
+        assert service.get_stats()["dropped"] == 0
+
+    def test_invalid_payload_counted(self):
+        service = _service()
+        service._enqueue_message(SimpleNamespace(topic="jota/stt", payload=b"not json"))
+        assert service.get_stats()["invalid"] == 1
+        assert service.get_stats()["queue_depth"] == 0
+
+
+# ---------------------------------------------------------------------------
+# Sentence-streamed responses
+# ---------------------------------------------------------------------------
+
+class TestSentenceStreaming:
+    @staticmethod
+    def _streaming_service(tokens, token_delay):
+        service = _service()
+
+        async def fake_process(client_id, text):
+            for token in tokens:
+                await asyncio.sleep(token_delay)
+                yield token
+
+        service._process = fake_process
+        return service
+
+    @pytest.mark.asyncio
+    async def test_sentences_published_before_generation_ends(self):
+        tokens = ["Son las ", "cinco y ", "diez. ", "Hace sol ", "en Madrid ", "todo el día."]
+        service = self._streaming_service(tokens, token_delay=0.05)
+        published_at = []
+        publish = service.fake_client.publish
+
+        async def timed_publish(topic, payload, qos=0):
+            published_at.append(time.perf_counter())
+            await publish(topic, payload, qos)
+
+        service.fake_client.publish = timed_publish
+        start = time.perf_counter()
+        await service._run_command(_Command("kitchen", "hora y tiempo", time.time()))
+
+        messages = [p for _, p in service.fake_client.published]
+        assert [m["text"] for m in messages] == ["Son las cinco y diez.", "Hace sol en Madrid todo el día.", ""]
+        assert [m["seq"] for m in messages] == [0, 1, 2]
+        assert [m["final"] for m in messages] == [False, False, True]
+        assert published_at[0] - start < 0.2  # first sentence after 3 tokens, not after all 6
+        assert service.get_stats()["avg_first_chunk_ms"] < service.get_stats()["avg_processing_ms"]
+
+    @pytest.mark.asyncio
+    async def test_real_controller_streams_the_first_sentence(self, monkeypatch):
+        """Through JotaInputMixin.handle_input: the first sentence is spoken while the engine still generates.
+
+        The device has no tools, so no tool call can follow and the text is not held back.
+        """
+        monkeypatch.setattr(tool_manager, "get_system_prompt_addition", lambda client_id=None: "")
+        tokens = ["Son las ", "cinco y ", "diez. ", "Hace sol ", "en Madrid ", "todo el día."]
+        generation = {}
+
+        class Engine:
+            current_engine_model = "test-model"
+
+            async def create_session(self):
+                return "s1"
+
+            async def close_session(self, session_id):
+                pass
+
+            async def infer(self, session_id, prompt, **kwargs):
+                for token in tokens:
+                    await asyncio.sleep(0.05)
+                    yield token
+                generation["ended"] = time.perf_counter()
+
+        controller = JotaInputMixin()
+        controller.inference_client = Engine()
+        service = MQTTService(inference_client=controller.inference_client, jota_controller=controller)
+        service._client = FakeClient()
+        published_at = []
+        publish = service._client.publish
+
+        async def timed_publish(topic, payload, qos=0):
+            published_at.append(time.perf_counter())
+            await publish(topic, payload, qos)
+
+        service._client.publish = timed_publish
+        await service._run_command(_Command("kitchen", "zzz dime algo", time.time()))
+
+        messages = [p for _, p in service._client.published]
+        assert [m["text"] for m in messages] == ["Son las cinco y diez.", "Hace sol en Madrid todo el día.", ""]
+        assert published_at[0] < generation["ended"] - 0.1
+
+    @pytest.mark.asyncio
+    async def test_single_message_mode(self, monkeypatch):
+        monkeypatch.setattr(settings, "MQTT_STREAM_SENTENCES", False)
+        service = self._streaming_service(["Luz ", "encendida. ", "Algo más."], token_delay=0)
+        await service._run_command(_Command("kitchen", "luz", time.time()))
+
+        messages = [p for _, p in service.fake_client.published]
+        assert messages == [
+            {"client_id": "kitchen", "text": "Luz encendida. Algo más.", "seq": 0, "final": True},
+        ]
@@ -0,0 +1,82 @@
+"""
+test_quick_chunking.py
+~~~~~~~~~~~~~~~~~~~~~~
+Unit tests for the NDJSON output modes of /api/quick
+(src/api/quick.py): one line per token vs. one line per spoken sentence.
+"""
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.api import quick
+
+
+class FakeInferenceClient:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.close_session = AsyncMock()
+
+    async def infer(self, **kwargs):
+        for token in self.tokens:
+            yield token
+
+
+TOKENS = ["**Hoy** ", "hace sol ", "en Madrid. ", "La máxima ", "será de ", "25 grados."]
+
+
+async def _lines(monkeypatch, sentences: bool) -> list:
+    monkeypatch.setattr(quick, "inference_client", FakeInferenceClient(TOKENS))
+    generator = quick._quick_stream_generator(
+        client_id=1, user_id="u", session_id="s", text="tiempo", model_id=None, sentences=sentences,
+    )
+    return [json.loads(line) for chunk in [c async for c in generator] for line in chunk.splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_token_mode_is_unchanged(monkeypatch):
+    lines = await _lines(monkeypatch, sentences=False)
+    assert [line["content"] for line in lines] == TOKENS
+    assert all(line["type"] == "token" for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_sentence_mode_emits_clean_sentences(monkeypatch):
+    lines = await _lines(monkeypatch, sentences=True)
+    assert lines == [
+        {"type": "sentence", "content": "Hoy hace sol en Madrid.", "seq": 0},
+        {"type": "sentence", "content": "La máxima será de 25 grados.", "seq": 1},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fast_path_sentence_mode():
+    lines = [line async for line in quick._quick_fast_path_generator("Son las 10:30.", sentences=True)]
+    assert json.loads(lines[0]) == {"type": "sentence", "content": "Son las 10:30.", "seq": 0}
+
+
+@pytest.mark.asyncio
+async def test_only_first_tool_call_of_a_pass_runs(monkeypatch):
+    calls = [
+        {"type": "tool_call", "payload": {"name": "get_time", "arguments": {}}},
+        {"type": "tool_call", "payload": {"name": "web_search", "arguments": {"query": "x"}}},
+    ]
+    executed = []
+
+    async def execute_tool(name, client_id=None, **kwargs):
+        executed.append(name)
+        return "10:30"
+
+    monkeypatch.setattr(quick, "inference_client", FakeInferenceClient(calls))
+    monkeypatch.setattr(quick.tool_manager, "execute_tool", execute_tool)
+    monkeypatch.setattr(
+        quick.tool_manager, "render_direct_answer",
+        lambda name, result, args=None: f"Son las {result}." if name == "get_time" else None,
+    )
+    generator = quick._quick_stream_generator(
+        client_id=1, user_id="u", session_id="s", text="hora", model_id=None,
+    )
+    lines = [json.loads(line) for chunk in [c async for c in generator] for line in chunk.splitlines()]
+
+    assert executed == ["get_time"]
+    assert [line["content"] for line in lines if line["type"] == "token"] == ["Son las 10:30."]
@@ -0,0 +1,100 @@
+"""
+test_raw_passthrough.py
+~~~~~~~~~~~~~~~~~~~~~~~
+Unit tests for the tool-free fast path: InferenceClient.infer_raw,
+JotaInputMixin.handle_input_raw and OutboundWriter.token_json.
+"""
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+
+from src.api.chat.outbound import OutboundWriter
+from src.core.controller.input import JotaInputMixin
+from src.core.tool_manager import tool_manager
+from src.services.inference import InferenceClient
+from src.services.inference.client import content_literal
+from tests.integration.fake_engine import FakeEngineSocket, FakeMemory
+
+TOKENS = ["Hola", ", ", "¿qué", " tal?", ' "citas"', " y \\ barras", "\n", "😀"]
+
+
+class Controller(JotaInputMixin):
+    def __init__(self, inference_client, memory_manager):
+        self.inference_client = inference_client
+        self.memory_manager = memory_manager
+
+
+@pytest_asyncio.fixture
+async def engine():
+    memory = FakeMemory()
+    client = InferenceClient(memory_manager=memory)
+    client.websocket = FakeEngineSocket(TOKENS)
+    reader = asyncio.create_task(client._read_loop())
+    yield client, memory
+    await client.websocket.close()
+    await asyncio.gather(reader, return_exceptions=True)
+
+
+def _payload():
+    return {
+        "content": "hola", "session_id": "s1", "conversation_id": "c1",
+        "user_id": "u1", "client_id": "tool-free", "stateless": True,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Payload reuse
+# ---------------------------------------------------------------------------
+
+class TestContentLiteral:
+    def test_slices_escaped_content_from_raw_frame(self):
+        raw = '{"op": "token", "session_id": "s", "content": "dijo \\"hola\\"\\n"}'
+        assert content_literal(raw, 'dijo "hola"\n') == 'dijo \\"hola\\"\\n'
+
+    def test_falls_back_to_encoding(self):
+        assert content_literal(None, 'a"b') == 'a\\"b'
+        assert content_literal('{"op": "token"}', "x") == "x"
+
+
+# ---------------------------------------------------------------------------
+# Fast path
+# ---------------------------------------------------------------------------
+
+class TestRawPassThrough:
+    @pytest.mark.asyncio
+    async def test_infer_raw_frames_decode_to_the_same_text(self, engine):
+        client, memory = engine
+        frames = []
+
+        async def send_text(frame):
+            frames.append(json.loads(frame))
+
+        writer = OutboundWriter(send_text, window_ms=0)
+        async for body in client.infer_raw("s1", "hola", "c1", "u1"):
+            await writer.token_json(body)
+
+        assert [f["content"] for f in frames] == TOKENS
+        assert memory.saved[-1]["content"] == "".join(TOKENS)
+
+    @pytest.mark.asyncio
+    async def test_handle_input_raw_matches_full_path(self, engine, monkeypatch):
+        client, _ = engine
+        monkeypatch.setattr(tool_manager, "get_tool_schemas", lambda client_id=None: [])
+        monkeypatch.setattr(tool_manager, "get_system_prompt_addition", lambda client_id=None: "")
+        controller = Controller(client, client.memory_manager)
+        assert controller.is_tool_free("tool-free")
+
+        full = [t async for t in controller.handle_input(_payload()) if isinstance(t, str)]
+        raw = [json.loads(f'"{b}"') async for b in controller.handle_input_raw(_payload())]
+        assert "".join(raw) == "".join(full) == "".join(TOKENS)
+        assert client.websocket.sent[-1]["params"] == client.websocket.sent[-2]["params"]
+
+    @pytest.mark.asyncio
+    async def test_errors_are_escaped(self, engine):
+        client, _ = engine
+        controller = Controller(client, client.memory_manager)
+        client.websocket.open = False
+        bodies = [b async for b in controller.handle_input_raw(_payload())]
+        assert json.loads(f'"{"".join(bodies)}"') == " [Error: Inference Engine Unavailable]"
@@ -0,0 +1,65 @@
+"""
+test_sentence_chunker.py
+~~~~~~~~~~~~~~~~~~~~~~~~
+Unit tests for src/utils/sentence_chunker.py: incremental splitting of a
+token stream into speakable units.
+"""
+from src.utils.sentence_chunker import MarkdownStripper, SentenceChunker
+
+
+def _chunk(text: str, step: int = 3, **options) -> list:
+    """Feeds text in step-sized tokens and returns every emitted unit, flush included."""
+    chunker = SentenceChunker(**options)
+    units = []
+    for i in range(0, len(text), step):
+        units += chunker.feed(text[i:i + step])
+    rest = chunker.flush()
+    return units + ([rest] if rest else [])
+
+
+class TestSentenceChunker:
+    def test_splits_on_sentence_ends(self):
+        text = "Son las cinco en Madrid. ¿Quieres algo más? ¡Perfecto, hasta luego!"
+        assert _chunk(text) == ["Son las cinco en Madrid.", "¿Quieres algo más?", "¡Perfecto, hasta luego!"]
+
+    def test_unit_emitted_as_soon_as_complete(self):
+        chunker = SentenceChunker()
+        assert chunker.feed("Luz del salón encendida.") == []  # could still be "encendida.5"
+        assert chunker.feed(" Algo") == ["Luz del salón encendida."]
+
+    def test_decimals_and_abbreviations_do_not_split(self):
+        text = "El Sr. García mide 1.85 metros de alto. Vive en la Avda. Castellana desde hace años."
+        assert _chunk(text) == ["El Sr. García mide 1.85 metros de alto.", "Vive en la Avda. Castellana desde hace años."]
+
+    def test_short_sentences_merged(self):
+        assert _chunk("Sí. Son las cinco y diez.", min_chars=12) == ["Sí. Son las cinco y diez."]
+
+    def test_long_run_cut_at_clause(self):
+        text = "uno, dos, tres, cuatro, cinco, seis, siete, ocho, nueve, diez"
+        units = _chunk(text, max_chars=30)
+        assert all(len(u) <= 30 for u in units)
+        assert units[0].endswith(",")
+        assert " ".join(units) == text
+
+    def test_newline_is_a_boundary(self):
+        assert _chunk("Primer paso del proceso\nSegundo paso del proceso") == [
+            "Primer paso del proceso", "Segundo paso del proceso",
+        ]
+
+    def test_flush_returns_none_when_empty(self):
+        chunker = SentenceChunker()
+        chunker.feed("   ")
+        assert chunker.flush() is None
+
+
+class TestMarkdownStripping:
+    def test_markdown_removed_across_tokens(self):
+        text = "## Tiempo hoy\n- **Madrid**: soleado, -5 grados.\n- Ver [AEMET](https://aemet.es/x_y) para `más` info."
+        assert _chunk(text, step=2, strip_markdown=True) == [
+            "Tiempo hoy Madrid: soleado, -5 grados.",
+            "Ver AEMET para más info.",
+        ]
+
+    def test_stripper_keeps_plain_text(self):
+        stripper = MarkdownStripper()
+        assert stripper.feed("Son 5 - 3 = 2 (dos).") == "Son 5 - 3 = 2 (dos)."
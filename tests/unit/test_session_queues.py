@@ -0,0 +1,75 @@
+"""
+test_session_queues.py
+~~~~~~~~~~~~~~~~~~~~~~
+Unit tests for the bounded per-session queues fed by InferenceClient._read_loop:
+non-blocking demux, abort on overflow and queue-depth stats.
+"""
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from src.core.config import settings
+from src.core.constants import INTERRUPTED_MARKER
+from src.services.inference import InferenceClient
+from tests.integration.fake_engine import FakeEngineSocket, FakeMemory
+
+TOKENS = [f"t{i} " for i in range(100)]
+
+
+@pytest_asyncio.fixture
+async def client(monkeypatch):
+    monkeypatch.setattr(settings, "INFERENCE_SESSION_QUEUE_SIZE", 16)
+    client = InferenceClient(memory_manager=FakeMemory())
+    client.websocket = FakeEngineSocket(TOKENS)
+    reader = asyncio.create_task(client._read_loop())
+    yield client
+    await client.websocket.close()
+    await asyncio.gather(reader, return_exceptions=True)
+
+
+async def _settle():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+# ---------------------------------------------------------------------------
+# Overflow
+# ---------------------------------------------------------------------------
+
+class TestSessionQueues:
+    @pytest.mark.asyncio
+    async def test_stalled_session_is_aborted_without_blocking_others(self, client):
+        client.websocket.token_delay = 0.001
+        slow = client.infer("slow", "hola", "c-slow", "u1")
+        assert await slow.__anext__() == TOKENS[0]     # then the consumer stops reading
+
+        fast = [t async for t in client.infer("fast", "hola", "c-fast", "u2")]
+        assert "".join(fast) == "".join(TOKENS)
+
+        await _settle()
+        assert {"op": "abort", "session_id": "slow"} in client.websocket.sent
+        assert client.get_queue_stats()["overflow_aborts"] == 1
+
+        with pytest.raises(Exception, match="queue overflow"):
+            async for _ in slow:
+                pass
+        saved = client.memory_manager.saved[-1]
+        assert saved["conversation_id"] == "c-slow"
+        assert saved["content"].endswith(INTERRUPTED_MARKER)
+        assert "slow" not in client.get_queue_stats()["sessions"]
+
+    @pytest.mark.asyncio
+    async def test_queue_stats_report_depth_and_high_water(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "INFERENCE_SESSION_QUEUE_SIZE", 1000)
+        stream = client.infer_raw("s1", "hola", "c1", "u1")
+        await stream.__anext__()
+        await _settle()
+
+        stats = client.get_queue_stats()["sessions"]["s1"]
+        # 99 tokens + "end" left; all 100 tokens + "end" were queued before the first read
+        assert stats == {"depth": len(TOKENS), "high_water": len(TOKENS) + 1, "capacity": 1000, "aborting": False}
+
+        rest = [body async for body in stream]
+        assert len(rest) == len(TOKENS) - 1
+        assert client.get_queue_stats() == {"sessions": {}, "overflow_aborts": 0}
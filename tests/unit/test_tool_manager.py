@@ -0,0 +1,466 @@
+"""
+test_tool_manager.py
+~~~~~~~~~~~~~~~~~~~~
+Unit tests for src/core/tool_manager.py covering registration options
+and tool execution behaviour.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.core.config import settings
+from src.core.tool_cache import CachePolicy
+from src.core.tool_manager import (
+    ROLE_ADMIN,
+    ToolArgumentError,
+    ToolManager,
+    ToolPermissionError,
+    ToolTimeoutError,
+    ToolUnavailableError,
+)
+
+
+# ---------------------------------------------------------------------------
+# Direct-answer tools
+# ---------------------------------------------------------------------------
+
+class TestDirectAnswer:
+    def test_regular_tool_has_no_direct_answer(self):
+        tm = ToolManager()
+
+        def lookup(query: str) -> str:
+            """Looks something up."""
+            return "x"
+
+        tm.register(lookup)
+        assert not tm.is_direct_answer("lookup")
+        assert tm.render_direct_answer("lookup", "x") is None
+
+    def test_raw_output_returned_without_template(self):
+        tm = ToolManager()
+
+        def toggle_light(room: str) -> str:
+            """Toggles a light."""
+            return "Luz encendida."
+
+        tm.register(toggle_light, direct_answer=True)
+        assert tm.is_direct_answer("toggle_light")
+        assert tm.render_direct_answer("toggle_light", "Luz encendida.", {"room": "salón"}) == "Luz encendida."
+
+    def test_template_receives_arguments_and_dict_fields(self):
+        tm = ToolManager()
+
+        def multiply(a: int, b: int) -> dict:
+            """Multiplies two numbers."""
+            return {"value": a * b}
+
+        tm.register(multiply, answer_template="{a} por {b} son {value}.")
+        answer = tm.render_direct_answer("multiply", {"value": 555}, {"a": 15, "b": 37})
+        assert answer == "15 por 37 son 555."
+
+    def test_broken_template_falls_back_to_raw_output(self):
+        tm = ToolManager()
+
+        def now() -> str:
+            """Returns the time."""
+            return "12:00"
+
+        tm.register(now, answer_template="Son las {missing}.")
+        assert tm.render_direct_answer("now", "12:00") == "12:00"
+
+    @pytest.mark.asyncio
+    async def test_execute_tool_unchanged_for_direct_answer(self):
+        tm = ToolManager()
+
+        async def ping() -> str:
+            """Pings."""
+            return "pong"
+
+        tm.register(ping, direct_answer=True)
+        assert await tm.execute_tool("ping") == "pong"
+
+
+# ---------------------------------------------------------------------------
+# Result caching
+# ---------------------------------------------------------------------------
+
+class TestResultCache:
+    def _counting_manager(self, **policy):
+        tm = ToolManager()
+        calls = []
+
+        async def search(query: str) -> str:
+            """Searches."""
+            calls.append(query)
+            await asyncio.sleep(0.01)
+            return f"results for {query}"
+
+        tm.register(search, cache=CachePolicy(**policy))
+        return tm, calls
+
+    @pytest.mark.asyncio
+    async def test_normalised_arguments_hit_cache(self):
+        tm, calls = self._counting_manager(ttl=60)
+        first = await tm.execute_tool("search", query="Madrid weather")
+        second = await tm.execute_tool("search", query="  madrid   WEATHER ")
+        assert first == second
+        assert len(calls) == 1
+        assert tm.get_tool_stats()["search"]["cache"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_are_coalesced(self):
+        tm, calls = self._counting_manager(ttl=60)
+        results = await asyncio.gather(*(tm.execute_tool("search", query="news") for _ in range(5)))
+        assert len(set(results)) == 1
+        assert len(calls) == 1
+        assert tm.get_tool_stats()["search"]["cache"]["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_refreshed(self):
+        tm, calls = self._counting_manager(ttl=0.001)
+        await tm.execute_tool("search", query="a")
+        await asyncio.sleep(0.01)
+        await tm.execute_tool("search", query="a")
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_lru_evicts_oldest(self):
+        tm, calls = self._counting_manager(ttl=60, max_entries=1)
+        await tm.execute_tool("search", query="a")
+        await tm.execute_tool("search", query="b")
+        await tm.execute_tool("search", query="a")
+        assert calls == ["a", "b", "a"]
+
+    @pytest.mark.asyncio
+    async def test_errors_not_cached_by_default(self):
+        tm = ToolManager()
+        calls = []
+
+        async def flaky() -> str:
+            """Fails."""
+            calls.append(1)
+            raise RuntimeError("boom")
+
+        tm.register(flaky, cache=CachePolicy(ttl=60))
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await tm.execute_tool("flaky")
+        assert len(calls) == 2
+
+        tm.enable_cache("flaky", CachePolicy(ttl=60, cache_errors=True))
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await tm.execute_tool("flaky")
+        assert len(calls) == 3
+
+
+# ---------------------------------------------------------------------------
+# Execution modes
+# ---------------------------------------------------------------------------
+
+class TestExecutionModes:
+    @pytest.mark.asyncio
+    async def test_sync_tools_default_to_thread_pool(self):
+        tm = ToolManager()
+
+        def where() -> str:
+            """Reports the executing thread."""
+            return threading.current_thread().name
+
+        tm.register(where)
+        try:
+            assert (await tm.execute_tool("where")).startswith("jota-tool")
+        finally:
+            tm.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_inline_runs_on_loop_thread(self):
+        tm = ToolManager()
+
+        def where() -> str:
+            """Reports the executing thread."""
+            return threading.current_thread().name
+
+        tm.register(where, execution="inline")
+        assert await tm.execute_tool("where") == threading.current_thread().name
+
+    @pytest.mark.asyncio
+    async def test_timeout_raises_tool_timeout(self):
+        tm = ToolManager()
+
+        def slow() -> str:
+            """Sleeps."""
+            time.sleep(0.2)
+            return "late"
+
+        tm.register(slow, timeout=0.05)
+        try:
+            with pytest.raises(ToolTimeoutError):
+                await tm.execute_tool("slow")
+            assert tm.get_tool_stats()["slow"]["errors"] == 1
+        finally:
+            tm.shutdown()
+
+    def test_coroutine_cannot_use_pools(self):
+        tm = ToolManager()
+
+        async def coro() -> str:
+            """Async."""
+            return "x"
+
+        with pytest.raises(ValueError):
+            tm.register(coro, execution="thread")
+
+    def test_invalid_mode_rejected(self):
+        tm = ToolManager()
+
+        def f() -> str:
+            """Sync."""
+            return "x"
+
+        with pytest.raises(ValueError):
+            tm.register(f, execution="gpu")
+
+
+class TestGuards:
+    @pytest.mark.asyncio
+    async def test_saturated_tool_rejects_fast(self, monkeypatch):
+        monkeypatch.setattr(settings, "TOOL_CONCURRENCY_WAIT", 0.05)
+        tm = ToolManager()
+        release = asyncio.Event()
+
+        async def busy() -> str:
+            """Waits until released."""
+            await release.wait()
+            return "done"
+
+        tm.register(busy, max_concurrency=1)
+        first = asyncio.create_task(tm.execute_tool("busy"))
+        await asyncio.sleep(0)
+        with pytest.raises(ToolUnavailableError):
+            await tm.execute_tool("busy")
+        release.set()
+        assert await first == "done"
+
+        stats = tm.get_tool_stats()["busy"]
+        assert stats["rejections"] == 1
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_breaker_opens_after_consecutive_failures(self, monkeypatch):
+        monkeypatch.setattr(settings, "TOOL_BREAKER_FAILURE_THRESHOLD", 2)
+        monkeypatch.setattr(settings, "TOOL_BREAKER_RESET_TIMEOUT", 60.0)
+        tm = ToolManager()
+        calls = []
+
+        async def flaky() -> str:
+            """Always fails."""
+            calls.append(1)
+            raise RuntimeError("backend down")
+
+        tm.register(flaky)
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await tm.execute_tool("flaky")
+        with pytest.raises(ToolUnavailableError):
+            await tm.execute_tool("flaky")
+
+        assert len(calls) == 2
+        stats = tm.get_tool_stats()["flaky"]
+        assert stats["short_circuited"] == 1
+        assert stats["breaker"]["state"] == "open"
+
+    @pytest.mark.asyncio
+    async def test_breaker_half_open_trial_closes_on_success(self, monkeypatch):
+        monkeypatch.setattr(settings, "TOOL_BREAKER_FAILURE_THRESHOLD", 1)
+        monkeypatch.setattr(settings, "TOOL_BREAKER_RESET_TIMEOUT", 0.05)
+        tm = ToolManager()
+        outcomes = [RuntimeError("down"), "ok"]
+
+        async def recovering() -> str:
+            """Fails once, then recovers."""
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        tm.register(recovering)
+        with pytest.raises(RuntimeError):
+            await tm.execute_tool("recovering")
+        with pytest.raises(ToolUnavailableError):
+            await tm.execute_tool("recovering")
+        await asyncio.sleep(0.06)
+        assert await tm.execute_tool("recovering") == "ok"
+        assert tm.get_tool_stats()["recovering"]["breaker"]["state"] == "closed"
+
+    @pytest.mark.asyncio
+    async def test_bad_input_errors_do_not_open_the_breaker(self, monkeypatch):
+        monkeypatch.setattr(settings, "TOOL_BREAKER_FAILURE_THRESHOLD", 2)
+        tm = ToolManager()
+
+        async def divide(a: int, b: int) -> float:
+            """Divides."""
+            if b == 0:
+                raise ValueError("Division by zero.")
+            return a / b
+
+        tm.register(divide)
+        for _ in range(5):
+            with pytest.raises(ValueError):
+                await tm.execute_tool("divide", a=1, b=0)
+        assert await tm.execute_tool("divide", a=4, b=2) == 2
+        stats = tm.get_tool_stats()["divide"]
+        assert stats["errors"] == 5
+        assert stats["breaker"]["consecutive_failures"] == 0
+
+    @pytest.mark.asyncio
+    async def test_timed_out_thread_call_keeps_its_slot(self, monkeypatch):
+        monkeypatch.setattr(settings, "TOOL_CONCURRENCY_WAIT", 0.05)
+        tm = ToolManager()
+
+        def slow() -> str:
+            """Blocks its worker thread."""
+            time.sleep(0.3)
+            return "late"
+
+        tm.register(slow, timeout=0.05, max_concurrency=1)
+        try:
+            with pytest.raises(ToolTimeoutError):
+                await tm.execute_tool("slow")
+            # The thread is still running: the tool is still saturated
+            assert tm.get_tool_stats()["slow"]["in_flight"] == 1
+            with pytest.raises(ToolUnavailableError):
+                await tm.execute_tool("slow")
+            await asyncio.sleep(0.35)
+            assert tm.get_tool_stats()["slow"]["in_flight"] == 0
+        finally:
+            tm.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_default_deadline_applies(self, monkeypatch):
+        monkeypatch.setattr(settings, "TOOL_DEFAULT_TIMEOUT", 0.05)
+        tm = ToolManager()
+
+        async def hangs() -> str:
+            """Never returns in time."""
+            await asyncio.sleep(1)
+            return "late"
+
+        tm.register(hangs)
+        with pytest.raises(ToolTimeoutError):
+            await tm.execute_tool("hangs")
+        assert tm.get_tool_stats()["hangs"]["timeouts"] == 1
+
+
+class TestArgumentValidation:
+    @pytest.mark.asyncio
+    async def test_invalid_call_never_reaches_tool(self):
+        tm = ToolManager()
+        calls = []
+
+        async def lookup(query: str, limit: int = 5) -> str:
+            """Looks something up."""
+            calls.append(query)
+            return query
+
+        tm.register(lookup)
+        for bad in ({}, {"query": "   "}, {"query": None}, {"query": "x", "limit": "many"}, {"query": "x", "q": 1}):
+            with pytest.raises(ToolArgumentError):
+                await tm.execute_tool("lookup", **bad)
+        assert calls == []
+        assert tm.get_tool_stats()["lookup"]["invalid"] == 5
+
+    @pytest.mark.asyncio
+    async def test_numeric_strings_coerced(self):
+        tm = ToolManager()
+
+        def double(value: float) -> float:
+            """Doubles a value."""
+            return value * 2
+
+        tm.register(double, execution="inline")
+        assert await tm.execute_tool("double", value="2,5") == 5.0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("value", ["1,000", "12,500,000", "1.000,5"])
+    async def test_thousands_grouped_strings_rejected(self, value):
+        tm = ToolManager()
+
+        def double(value: float) -> float:
+            """Doubles a value."""
+            return value * 2
+
+        tm.register(double, execution="inline")
+        with pytest.raises(ToolArgumentError):
+            await tm.execute_tool("double", value=value)
+
+    def test_external_schema_enum_and_nested(self):
+        tm = ToolManager()
+
+        async def proxy(**kwargs):
+            return kwargs
+
+        tm.register_external("mcp_set_light", proxy, "Sets a light", {
+            "type": "object",
+            "properties": {
+                "room": {"type": "string", "enum": ["salon", "cocina"]},
+                "color": {
+                    "type": "object",
+                    "properties": {"r": {"type": "integer"}},
+                    "required": ["r"],
+                },
+            },
+            "required": ["room"],
+        })
+
+        assert tm.validate_arguments("mcp_set_light", {"room": "salon", "color": {"r": "255"}}) == {
+            "room": "salon", "color": {"r": 255},
+        }
+        with pytest.raises(ToolArgumentError, match="one of"):
+            tm.validate_arguments("mcp_set_light", {"room": "garaje"})
+        with pytest.raises(ToolArgumentError, match="color.r"):
+            tm.validate_arguments("mcp_set_light", {"room": "salon", "color": {"r": "rojo"}})
+
+
+# ---------------------------------------------------------------------------
+# External registration (MCP proxies)
+# ---------------------------------------------------------------------------
+
+class TestExternalRegistration:
+    @pytest.mark.asyncio
+    async def test_external_tool_is_role_gated(self):
+        tm = ToolManager()
+
+        async def proxy(**kwargs):
+            return "ok"
+
+        tm.register_external("mcp_unlock", proxy, "Unlocks the door", None, required_role=ROLE_ADMIN)
+        assert tm.get_tool_schema("mcp_unlock")["required_role"] == ROLE_ADMIN
+        assert tm.get_tool_schemas(client_id="guest") == []
+
+        with pytest.raises(ToolPermissionError):
+            await tm.execute_tool("mcp_unlock", client_id="guest")
+        tm.set_client_role("owner", ROLE_ADMIN)
+        assert await tm.execute_tool("mcp_unlock", client_id="owner") == "ok"
+
+    def test_sync_function_rejected(self):
+        tm = ToolManager()
+        with pytest.raises(ValueError, match="coroutine"):
+            tm.register_external("mcp_sync", lambda: None, "Sync", None)
+
+    @pytest.mark.asyncio
+    async def test_unregister_removes_tool(self):
+        tm = ToolManager()
+
+        async def proxy(**kwargs):
+            return "ok"
+
+        tm.register_external("mcp_gone", proxy, "Temporary", None, cache=CachePolicy(ttl=60))
+        tm.unregister("mcp_gone")
+
+        assert not tm.has_tool("mcp_gone")
+        assert tm.get_tool_schema("mcp_gone") is None
+        with pytest.raises(ValueError, match="not found"):
+            await tm.execute_tool("mcp_gone")
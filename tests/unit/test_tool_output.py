@@ -0,0 +1,123 @@
+"""
+test_tool_output.py
+~~~~~~~~~~~~~~~~~~~
+Unit tests for src/utils/tool_output.py covering structure-aware compaction
+of tool results (field dropping, deduplication, budget filling) and
+query-relevance sentence selection.
+"""
+import json
+
+from src.core.constants import TOOL_OUTPUT_TRUNCATED_MARKER
+from src.utils.tool_output import compact_tool_output, select_relevant_text
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _result(title: str, content: str, score: float) -> dict:
+    return {
+        "title": title,
+        "url": f"https://example.com/{title.replace(' ', '-')}",
+        "content": content,
+        "raw_content": "<html>" + "x" * 500 + "</html>",
+        "score": score,
+    }
+
+
+TAVILY_RESULTS = [
+    _result("Madrid weather", "Sunny in Madrid today with highs of 25 degrees and light wind.", 0.71),
+    _result("Madrid forecast", "Sunny in Madrid today with highs of 25 degrees and a light wind.", 0.69),
+    _result("Spain climate", "Spain has a varied climate with hot summers in the interior regions.", 0.93),
+    _result("Tourism", "Madrid is the capital of Spain and receives millions of visitors each year.", 0.42),
+]
+
+
+# ---------------------------------------------------------------------------
+# compact_tool_output
+# ---------------------------------------------------------------------------
+
+class TestCompactToolOutput:
+    def test_small_output_untouched(self):
+        assert compact_tool_output({"a": 1}, 100) == '{"a": 1}'
+
+    def test_records_drop_fields_dedupe_and_rank(self):
+        out = compact_tool_output(TAVILY_RESULTS, 1000)
+        records = json.loads(out)
+        assert len(out) <= 1000
+        assert [r["title"] for r in records] == ["Spain climate", "Madrid weather", "Tourism"]
+        assert all(set(r) == {"title", "content"} for r in records)
+
+    def test_budget_keeps_most_relevant_first(self):
+        out = compact_tool_output(TAVILY_RESULTS, 120)
+        records = json.loads(out)
+        assert len(out) <= 120
+        assert records[0]["title"] == "Spain climate"
+
+    def test_serialised_string_input(self):
+        out = compact_tool_output(json.dumps(TAVILY_RESULTS), 300)
+        assert len(out) <= 300
+        json.loads(out)
+
+    def test_wrapper_dict_with_results(self):
+        response = {"query": "madrid", "images": ["a.png"], "results": TAVILY_RESULTS}
+        out = compact_tool_output(response, 250)
+        data = json.loads(out)
+        assert len(out) <= 250
+        assert data["query"] == "madrid"
+        assert "images" not in data
+        assert data["results"][0]["title"] == "Spain climate"
+
+    def test_long_dict_fields_are_shortened(self):
+        out = compact_tool_output({"summary": "word " * 400, "source": "x"}, 200)
+        data = json.loads(out)
+        assert len(out) <= 200
+        assert data["source"] == "x"
+        assert data["summary"].endswith("…")
+
+    def test_plain_text_cut_at_word_boundary(self):
+        out = compact_tool_output("lorem ipsum " * 100, 100)
+        assert len(out) <= 100
+        assert out.endswith(TOOL_OUTPUT_TRUNCATED_MARKER)
+        assert out[: -len(TOOL_OUTPUT_TRUNCATED_MARKER)].split()[-1] in ("lorem", "ipsum")
+
+
+# ---------------------------------------------------------------------------
+# Query-relevance selection
+# ---------------------------------------------------------------------------
+
+ARTICLE = (
+    "El Real Madrid fue fundado en 1902. "
+    "El club juega sus partidos en el estadio Santiago Bernabéu. "
+    "La capacidad del estadio Santiago Bernabéu es de unos 83.000 espectadores. "
+    "El equipo ha ganado numerosas Copas de Europa. "
+    "Su himno oficial se estrenó en el año 1952. "
+) * 3
+
+
+class TestRelevanceSelection:
+    def test_keeps_answer_bearing_sentence(self):
+        out = select_relevant_text(ARTICLE, "¿Qué capacidad tiene el Bernabéu?", 200, TOOL_OUTPUT_TRUNCATED_MARKER)
+        assert len(out) <= 200
+        assert "83.000 espectadores" in out
+        assert out.endswith(TOOL_OUTPUT_TRUNCATED_MARKER)
+
+    def test_without_query_keeps_leading_text(self):
+        out = select_relevant_text(ARTICLE, None, 120, "")
+        assert ARTICLE.startswith(out)
+
+    def test_no_matching_terms_falls_back_to_prefix(self):
+        out = select_relevant_text(ARTICLE, "zxqw plmo", 120, "")
+        assert ARTICLE.startswith(out)
+
+    def test_compact_plain_text_uses_query(self):
+        out = compact_tool_output(ARTICLE, 150, query="himno oficial")
+        assert "1952" in out
+
+    def test_records_ranked_by_query(self):
+        records = [
+            {"title": "Historia", "content": "El club fue fundado en 1902 por aficionados."},
+            {"title": "Estadio", "content": "El Bernabéu tiene capacidad para 83.000 espectadores."},
+        ] * 5
+        out = compact_tool_output(records, 200, query="capacidad Bernabéu")
+        assert json.loads(out)[0]["title"] == "Estadio"
@@ -2,12 +2,16 @@
 test_tool_parser.py
 ~~~~~~~~~~~~~~~~~~~
 Unit tests for src/utils/tool_parser.py covering the updated regex pattern,
-web_search argument validation, and XML-removal helper.
+web_search argument validation, lenient JSON repair and XML-removal helper.
 """
 import pytest
+import src.tools  # noqa: F401  (registers web_search, used by the repair schema check)
 from src.utils.tool_parser import (
     extract_tool_calls,
+    get_repair_stats,
+    parse_tool_call_json,
     remove_tool_calls_from_text,
+    MAX_REPAIR_CHARS,
     TOOL_CALL_PATTERN,
 )
 
@@ -143,6 +147,45 @@ class TestExtractToolCallsMalformed:
         assert calls == []
 
 
+# ---------------------------------------------------------------------------
+# extract_tool_calls — lenient repair
+# ---------------------------------------------------------------------------
+
+class TestExtractToolCallsRepair:
+    def test_trailing_commas_repaired(self):
+        calls = extract_tool_calls(_wrap('{"name":"web_search","arguments":{"query":"test",},}'))
+        assert calls == [{"name": "web_search", "arguments": {"query": "test"}}]
+
+    def test_single_quotes_repaired(self):
+        calls = extract_tool_calls(_wrap("{'name': 'web_search', 'arguments': {'query': 'it\\'s'}}"))
+        assert calls == [{"name": "web_search", "arguments": {"query": "it's"}}]
+
+    def test_unclosed_braces_repaired(self):
+        calls = extract_tool_calls(_wrap('{"name":"web_search","arguments":{"query":"test"'))
+        assert calls == [{"name": "web_search", "arguments": {"query": "test"}}]
+
+    def test_repaired_call_must_match_registered_schema(self):
+        # Unknown tool and unknown argument are not accepted after repair
+        assert extract_tool_calls(_wrap("{'name': 'no_such_tool', 'arguments': {}}")) == []
+        assert extract_tool_calls(_wrap("{'name': 'web_search', 'arguments': {'q': 'x'}}")) == []
+
+    def test_repair_stats_counted(self):
+        before = get_repair_stats()
+        parse_tool_call_json("{'name': 'web_search', 'arguments': {'query': 'x'}}")
+        parse_tool_call_json("{garbage")
+        after = get_repair_stats()
+        assert after["repaired"] == before["repaired"] + 1
+        assert after["failed"] == before["failed"] + 1
+
+    def test_unquoted_non_ascii_word_is_not_a_crash(self):
+        assert parse_tool_call_json('{"name":"calculate","arguments":{"expression": é}}') is None
+        assert extract_tool_calls(_wrap("{name: año}")) == []
+
+    def test_oversized_payload_not_repaired(self):
+        raw = "{'name': 'web_search', 'arguments': {'query': '" + "x" * MAX_REPAIR_CHARS + "'}}"
+        assert parse_tool_call_json(raw) is None
+
+
 # ---------------------------------------------------------------------------
 # remove_tool_calls_from_text
 # ---------------------------------------------------------------------------
@@ -0,0 +1,186 @@
+"""
+test_ws_outbound.py
+~~~~~~~~~~~~~~~~~~~
+Unit tests for token coalescing and the bounded send buffer in
+src/api/chat/outbound.py (OutboundWriter).
+"""
+import asyncio
+import json
+
+import pytest
+
+from src.api.chat.outbound import (
+    SLOW_CONSUMER_CLOSE_CODE,
+    OutboundWriter,
+    SlowConsumerError,
+    get_outbound_stats,
+)
+
+
+class FakeSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_text(self, text):
+        self.frames.append(json.loads(text))
+
+
+# ---------------------------------------------------------------------------
+# Coalescing
+# ---------------------------------------------------------------------------
+
+class TestCoalescing:
+    @pytest.mark.asyncio
+    async def test_tokens_within_window_share_a_frame(self):
+        ws = FakeSocket()
+        writer = OutboundWriter(ws.send_text, window_ms=20, max_bytes=1000)
+        for token in ["Hola", ", ", "¿qué", " tal?"]:
+            await writer.token(token)
+        assert ws.frames == []
+        await asyncio.sleep(0.05)
+        assert ws.frames == [{"type": "token", "content": "Hola, ¿qué tal?"}]
+        assert writer.get_stats()["tokens_per_frame"] == 4
+
+    @pytest.mark.asyncio
+    async def test_size_limit_flushes_immediately(self):
+        ws = FakeSocket()
+        writer = OutboundWriter(ws.send_text, window_ms=1000, max_bytes=8)
+        await writer.token("abcd")
+        await writer.token("efgh")
+        await asyncio.sleep(0)
+        assert ws.frames == [{"type": "token", "content": "abcdefgh"}]
+
+    @pytest.mark.asyncio
+    async def test_structured_message_flushes_pending_tokens_first(self):
+        ws = FakeSocket()
+        writer = OutboundWriter(ws.send_text, window_ms=1000, max_bytes=1000)
+        await writer.token("Voy a buscar")
+        await writer.send({"type": "status", "content": "Buscando..."})
+        await asyncio.sleep(0)
+        assert [f["type"] for f in ws.frames] == ["token", "status"]
+        assert ws.frames[0]["content"] == "Voy a buscar"
+
+    @pytest.mark.asyncio
+    async def test_flush_at_end_of_response_and_cancels_timer(self):
+        ws = FakeSocket()
+        writer = OutboundWriter(ws.send_text, window_ms=30, max_bytes=1000)
+        await writer.token("fin")
+        await writer.flush()
+        await asyncio.sleep(0.05)
+        assert ws.frames == [{"type": "token", "content": "fin"}]
+
+    @pytest.mark.asyncio
+    async def test_zero_window_sends_every_token(self):
+        ws = FakeSocket()
+        writer = OutboundWriter(ws.send_text, window_ms=0)
+        for token in ["a", "b", "c"]:
+            await writer.token(token)
+            await asyncio.sleep(0)
+        assert [f["content"] for f in ws.frames] == ["a", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_close_swallows_send_errors(self):
+        async def broken(text):
+            raise RuntimeError("socket closed")
+
+        writer = OutboundWriter(broken, window_ms=1000)
+        await writer.token("x")
+        await writer.close()
+
+
+# ---------------------------------------------------------------------------
+# Send buffer and slow consumers
+# ---------------------------------------------------------------------------
+
+class SlowSocket(FakeSocket):
+    """Each write takes ``delay`` seconds (or blocks forever with delay=None)."""
+
+    def __init__(self, delay=0.05):
+        super().__init__()
+        self.delay = delay
+        self.closed = None
+
+    async def send_text(self, text):
+        if self.delay is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.delay)
+        await super().send_text(text)
+
+    async def close(self, code=1000, reason=""):
+        self.closed = code
+
+
+class TestSlowConsumer:
+    @pytest.mark.asyncio
+    async def test_producer_never_waits_and_lagging_tokens_are_merged(self):
+        ws = SlowSocket(delay=0.05)
+        writer = OutboundWriter(ws.send_text, window_ms=0, buffer_bytes=10_000)
+        started = asyncio.get_running_loop().time()
+        for i in range(100):
+            await writer.token(f"t{i} ")
+            await asyncio.sleep(0)
+        assert asyncio.get_running_loop().time() - started < 0.05
+        await writer.close()
+        assert "".join(f["content"] for f in ws.frames) == "".join(f"t{i} " for i in range(100))
+        stats = writer.get_stats()
+        assert stats["frames"] == 2          # the first token, then everything that piled up behind it
+        assert stats["merged_tokens"] == 98
+        assert stats["buffer_high_water_bytes"] > 0
+
+    @pytest.mark.asyncio
+    async def test_buffer_over_limit_disconnects(self):
+        ws = SlowSocket(delay=None)
+        writer = OutboundWriter(ws.send_text, window_ms=0, buffer_bytes=50, close=ws.close)
+        with pytest.raises(SlowConsumerError):
+            for _ in range(100):
+                await writer.token("0123456789")
+                await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert ws.closed == SLOW_CONSUMER_CLOSE_CODE
+        assert writer.slow_consumer
+        with pytest.raises(SlowConsumerError):
+            await writer.send({"type": "status"})
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_close_awaits_the_slow_consumer_disconnect(self):
+        ws = SlowSocket(delay=None)
+        closing = asyncio.Event()
+
+        async def slow_close(code=1000, reason=""):
+            await closing.wait()
+            ws.closed = code
+
+        writer = OutboundWriter(ws.send_text, window_ms=0, buffer_bytes=1, close=slow_close)
+        await writer.token("a")
+        with pytest.raises(SlowConsumerError):
+            await writer.token("bb")
+        finished = asyncio.create_task(writer.close())
+        await asyncio.sleep(0.01)
+        assert not finished.done()          # still waiting for the socket to close
+        closing.set()
+        await asyncio.wait_for(finished, 1)
+        assert ws.closed == SLOW_CONSUMER_CLOSE_CODE
+
+    @pytest.mark.asyncio
+    async def test_stalled_write_disconnects(self):
+        ws = SlowSocket(delay=None)
+        writer = OutboundWriter(ws.send_text, window_ms=0, stall_timeout=0.05, close=ws.close)
+        await writer.token("a")
+        await asyncio.sleep(0.1)
+        with pytest.raises(SlowConsumerError):
+            await writer.token("b")
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_totals_track_disconnects(self):
+        before = get_outbound_stats()
+        ws = SlowSocket(delay=None)
+        writer = OutboundWriter(ws.send_text, window_ms=0, buffer_bytes=1, close=ws.close)
+        await writer.token("a")
+        with pytest.raises(SlowConsumerError):
+            await writer.token("bb")
+        await writer.close()
+        after = get_outbound_stats()
+        assert after["slow_consumer_disconnects"] == before["slow_consumer_disconnects"] + 1
+        assert after["active"] == before["active"]